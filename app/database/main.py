@@ -1,20 +1,98 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from decouple import config
 
+from app.database.pool_metrics import PoolMetrics, instrumented_pool
+
 string_connection = "mysql+mysqldb://"
+async_string_connection = "mysql+aiomysql://"
 database_user = f"{config('DATABASE_USER')}:{config('DATABASE_PASSWORD')}@"
 database_hostname = f"{config('DATABASE_HOSTNAME')}:{config('DATABASE_PORT')}/"
 database_name = f"{config('DATABASE_NAME')}"
 
-SQLALCHEMY_DATABASE_URL = (
-    string_connection + database_user + database_hostname + database_name
+# DATABASE_URL y DATABASE_ASYNC_URL permiten sobreescribir la conexion,
+# por ejemplo con sqlite:// y sqlite+aiosqlite:// para pruebas locales.
+SQLALCHEMY_DATABASE_URL = config(
+    "DATABASE_URL",
+    default=string_connection + database_user + database_hostname + database_name,
+)
+SQLALCHEMY_ASYNC_DATABASE_URL = config(
+    "DATABASE_ASYNC_URL",
+    default=async_string_connection + database_user + database_hostname + database_name,
 )
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, echo=False, pool_recycle=3600)
+# Si es True los endpoints usan AsyncSession y el driver asincrono
+DATABASE_ASYNC = config("DATABASE_ASYNC", default=False, cast=bool)
+
+# Pool de conexiones por proceso, con varios workers el total en la BD es
+# workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+DB_POOL_SIZE = config("DB_POOL_SIZE", default=5, cast=int)
+DB_MAX_OVERFLOW = config("DB_MAX_OVERFLOW", default=10, cast=int)
+DB_POOL_TIMEOUT = config("DB_POOL_TIMEOUT", default=30, cast=float)
+DB_POOL_RECYCLE = config("DB_POOL_RECYCLE", default=3600, cast=int)
+DB_POOL_PRE_PING = config("DB_POOL_PRE_PING", default=False, cast=bool)
+DB_POOL_LIFO = config("DB_POOL_LIFO", default=False, cast=bool)
+
+engine_metrics = PoolMetrics()
+async_engine_metrics = PoolMetrics()
+
+
+def _connect_args(url: str) -> dict:
+    """Argumentos extra del driver, sqlite no permite compartir hilos por defecto."""
+    return {"check_same_thread": False} if url.startswith("sqlite") else {}
+
+
+def _pool_args(url: str, base: type, metrics: PoolMetrics) -> dict:
+    """Configuracion del pool, sqlite conserva el pool que elige SQLAlchemy."""
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": instrumented_pool(base, metrics),
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_use_lifo": DB_POOL_LIFO,
+    }
+
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    echo=False,
+    pool_recycle=DB_POOL_RECYCLE,
+    connect_args=_connect_args(SQLALCHEMY_DATABASE_URL),
+    **_pool_args(SQLALCHEMY_DATABASE_URL, QueuePool, engine_metrics),
+)
+engine_metrics.attach(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = None
+AsyncSessionLocal = None
+
+if DATABASE_ASYNC:
+    # Se importa solo si se usa para no exigir el driver asincrono en modo sync
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    async_engine = create_async_engine(
+        SQLALCHEMY_ASYNC_DATABASE_URL,
+        echo=False,
+        pool_recycle=DB_POOL_RECYCLE,
+        connect_args=_connect_args(SQLALCHEMY_ASYNC_DATABASE_URL),
+        **_pool_args(
+            SQLALCHEMY_ASYNC_DATABASE_URL, AsyncAdaptedQueuePool, async_engine_metrics
+        ),
+    )
+    async_engine_metrics.attach(async_engine.sync_engine)
+    AsyncSessionLocal = sessionmaker(
+        async_engine,
+        class_=AsyncSession,
+        autocommit=False,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
 
 Base = declarative_base()
@@ -0,0 +1,86 @@
+import time
+from typing import Any, Dict, Optional, Type
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+from app.extras.metrics import Histogram
+
+
+class PoolMetrics:
+    """Metricas del pool de conexiones de un engine.
+
+    La latencia de checkout incluye la espera cuando el pool esta lleno,
+    es la metrica que indica si faltan conexiones para los workers.
+    """
+
+    def __init__(self) -> None:
+        self.checkout_latency = Histogram()
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.engine: Optional[Engine] = None
+
+    def attach(self, engine: Engine) -> None:
+        """Registra los eventos del pool del engine."""
+        self.engine = engine
+        event.listen(engine.pool, "connect", self._on_connect)
+        event.listen(engine.pool, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection: Any, connection_record: Any) -> None:
+        self.connects += 1
+
+    def _on_invalidate(
+        self, dbapi_connection: Any, connection_record: Any, exception: Any
+    ) -> None:
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Estado actual del pool y contadores."""
+        # engine.dispose() reemplaza el pool, siempre se lee el actual
+        pool = self.engine.pool if self.engine is not None else None
+        stats: Dict[str, Any] = {
+            "pool": type(pool).__name__ if pool is not None else None,
+            "checkout_latency": self.checkout_latency.snapshot(),
+            "timeouts": self.timeouts,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+        }
+        # Solo los pools con cola (QueuePool) tienen tamaño y overflow
+        if hasattr(pool, "checkedout"):
+            stats.update(
+                {
+                    "size": pool.size(),
+                    "in_use": pool.checkedout(),
+                    "idle": pool.checkedin(),
+                    "overflow": max(pool.overflow(), 0),
+                }
+            )
+        return stats
+
+
+def instrumented_pool(base: Type[Pool], metrics: PoolMetrics) -> Type[Pool]:
+    """Crea una subclase del pool que mide el tiempo de cada checkout.
+
+    Args:
+        base (Type[Pool]): Clase de pool de SQLAlchemy, por ejemplo QueuePool
+        metrics (PoolMetrics): Donde se guardan las mediciones
+
+    Returns:
+        Type[Pool]: Clase para el argumento poolclass de create_engine
+    """
+
+    class InstrumentedPool(base):  # type: ignore
+        def connect(self) -> Any:
+            start = time.perf_counter()
+            try:
+                return super().connect()
+            except exc.TimeoutError:
+                metrics.timeouts += 1
+                raise
+            finally:
+                metrics.checkout_latency.observe(time.perf_counter() - start)
+
+    InstrumentedPool.__name__ = base.__name__
+    return InstrumentedPool
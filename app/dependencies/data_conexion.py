@@ -1,8 +1,21 @@
-from typing import Generator
-from app.database.main import SessionLocal
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Callable,
+    Generator,
+    Iterator,
+    List,
+    TypeVar,
+    Union,
+)
+from fastapi.concurrency import run_in_threadpool
+from app.database.main import DATABASE_ASYNC, AsyncSessionLocal, SessionLocal
 
+T = TypeVar("T")
 
-def get_db() -> Generator[SessionLocal, None, None]:  # type: ignore
+
+def get_sync_db() -> Generator[SessionLocal, None, None]:  # type: ignore
     """Obten una session en la BD.
 
     Yields:
@@ -13,3 +26,81 @@ def get_db() -> Generator[SessionLocal, None, None]:  # type: ignore
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[Any, None]:
+    """Obten una session asincrona en la BD.
+
+    Se usa cuando DATABASE_ASYNC es True, asi las consultas
+    no bloquean el event loop de uvicorn.
+
+    Yields:
+        AsyncGenerator[AsyncSession, None]: Conexion asincrona a la BD
+    """
+    async with AsyncSessionLocal() as db:  # type: ignore
+        yield db
+
+
+# La dependencia que usan las rutas se elige por configuracion
+get_db = get_async_db if DATABASE_ASYNC else get_sync_db
+
+
+async def run_with_db(db: Any, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Ejecuta un metodo de app/internal con la session que entrego get_db.
+
+    Los metodos de los *Actions reciben una Session sincrona como primer
+    argumento. Con una AsyncSession se ejecutan mediante run_sync, de modo
+    que cada consulta espera al driver asincrono sin bloquear el event loop.
+    Con la Session sincrona se ejecutan en el threadpool por la misma razon.
+
+    Args:
+        db (Session | AsyncSession): Session obtenida con get_db
+        fn (Callable): Metodo a ejecutar, recibe la session como primer argumento
+
+    Returns:
+        T: Lo que regrese el metodo ejecutado
+    """
+    if DATABASE_ASYNC:
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+def _stream_sync(db: Any, statement: Any, batch_size: int) -> Iterator[List[Any]]:
+    result = db.execute(statement, execution_options={"stream_results": True})
+    try:
+        yield from result.yield_per(batch_size).partitions()
+    finally:
+        result.close()
+
+
+async def _stream_async(
+    db: Any, statement: Any, batch_size: int
+) -> AsyncIterator[List[Any]]:
+    result = await db.stream(statement)
+    try:
+        async for rows in result.partitions(batch_size):
+            yield rows
+    finally:
+        await result.close()
+
+
+def stream_with_db(
+    db: Any, statement: Any, batch_size: int
+) -> Union[Iterator[List[Any]], AsyncIterator[List[Any]]]:
+    """Lee una consulta por bloques con un cursor del lado del servidor.
+
+    A diferencia de .all() nunca se cargan todas las filas en memoria, se
+    piden batch_size filas al driver por cada bloque. Con la Session sincrona
+    StreamingResponse consume el iterador en el threadpool.
+
+    Args:
+        db (Session | AsyncSession): Session obtenida con get_db
+        statement (Select): Consulta construida con select()
+        batch_size (int): Filas por bloque
+
+    Returns:
+        Iterator | AsyncIterator: Bloques de filas
+    """
+    if DATABASE_ASYNC:
+        return _stream_async(db, statement, batch_size)
+    return _stream_sync(db, statement, batch_size)
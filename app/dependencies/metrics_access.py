@@ -0,0 +1,46 @@
+import secrets
+from typing import Optional
+
+from decouple import config
+from fastapi import Header, HTTPException, Request, status
+
+# Token fijo para el scraper de Prometheus (authorization.credentials en
+# scrape_configs). Sin token solo se aceptan peticiones desde localhost.
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+
+LOCAL_HOSTS = frozenset({"127.0.0.1", "::1", "localhost"})
+
+
+async def metrics_access(
+    request: Request, authorization: Optional[str] = Header(default=None)
+) -> None:
+    """Protege /metrics y /metrics/pool.
+
+    Las metricas exponen rutas, tiempos y estado de los pools, asi que no
+    son publicas: con METRICS_TOKEN se pide ``Authorization: Bearer <token>``
+    y sin el solo responde a clientes en la misma maquina.
+
+    Args:
+        request (Request): Peticion, para saber la IP del cliente
+        authorization (str, optional): Header Authorization
+
+    Raises:
+        HTTPException: 401 si el token no coincide
+        HTTPException: 403 si no hay token configurado y el cliente es remoto
+    """
+    if METRICS_TOKEN:
+        scheme, _, token = (authorization or "").partition(" ")
+        if scheme.lower() != "bearer" or not secrets.compare_digest(
+            token.encode(), METRICS_TOKEN.encode()
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                headers={"WWW-Authenticate": "Bearer"},
+                detail={"success": False, "msg": "Invalid metrics token"},
+            )
+        return
+    if request.client is None or request.client.host not in LOCAL_HOSTS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail={"success": False, "msg": "Metrics are only available locally"},
+        )
@@ -1,7 +1,14 @@
+from typing import Collection, Dict, List, Mapping, Optional
+
 from typing_extensions import Self
 from fastapi import HTTPException, Depends, status
-from fastapi_another_jwt_auth import AuthJWT
+from sqlalchemy.orm import Session
 from app import main
+from app.dependencies.data_conexion import get_db, run_with_db
+from app.dependencies.token_claims import TokenClaims, get_token_claims
+from app.extras.permission_bits import permission_vocabulary
+from app.internal.permission_map import cached_permission_map, get_permission_map
+from app.internal.permission_version import permission_versions
 
 
 class RoleChecker:
@@ -18,16 +25,85 @@ class RoleChecker:
     - Esta funcion nos sirve para almacenar los roles en diccionario
     Es nuestro parametro
 
-    def __call__(self, Authorize: AuthJWT = Depends()):
-    - Mandamos a traer el JWT en sesion
+    def __call__(self, claims: TokenClaims = Depends(get_token_claims), db):
+    - Recibimos los claims del JWT ya verificado
+    - Con tokens compact sin permissions se usa el mapa de permisos en memoria
     - Obtenemos el role de usuario en session
     - Si no esta el rol en nuestra lista levantamos una HTTPExcption
     """
 
     def __init__(self: Self, allowed_permissions: dict) -> None:
         self.allowed_permissions = allowed_permissions
+        # Se calcula una sola vez, None si el permiso no esta en el vocabulario
+        self.mask = permission_vocabulary.mask(
+            allowed_permissions["module"], allowed_permissions["permission"]
+        )
+
+    def uses_bits(self: Self, claims: Mapping) -> bool:
+        """Indica si el permiso se puede validar con perm_bits."""
+        return (
+            claims.get("perm_bits") is not None
+            and self.mask is not None
+            and claims.get("perm_v") == permission_vocabulary.fingerprint
+        )
+
+    def is_allowed(
+        self: Self,
+        claims: Mapping,
+        permissions: Optional[Mapping[str, Collection[str]]] = None,
+    ) -> bool:
+        """Valida los permisos del token.
+
+        Si el token trae perm_bits del mismo vocabulario basta con un AND,
+        en caso contrario se revisa el diccionario permissions.
+
+        Args:
+            claims (Mapping): Claims del JWT
+            permissions (Optional[Mapping[str, Collection[str]]]): Permisos
+             del rol, TokenClaims.permissions o los del mapa en memoria.
+             Defaults to claims["permissions"].
+
+        Returns:
+            bool: True si tiene el permiso
+        """
+        if self.uses_bits(claims):
+            return claims["perm_bits"] & self.mask != 0
+
+        if permissions is None:
+            permissions = claims["permissions"]
+        return (
+            self.allowed_permissions["module"] in permissions  # noqa
+            and self.allowed_permissions["permission"]  # noqa
+            in permissions[self.allowed_permissions["module"]]  # noqa
+        )
 
-    def __call__(self: Self, Authorize: AuthJWT = Depends()) -> None:
+    async def resolve_permissions(
+        self: Self, claims: Mapping, db: Session
+    ) -> Optional[Dict[str, List[str]]]:
+        """Permisos del rol para un token compact que no trae permissions.
+
+        Se buscan en el mapa en memoria con el rol y perm_ver del token, solo
+        si no esta se consulta la BD una vez y queda guardado.
+
+        Returns:
+            Optional[Dict[str, List[str]]]: None si el token trae permissions
+             o basta con perm_bits
+        """
+        if "permissions" in claims or self.uses_bits(claims):
+            return None
+        role_id, version = claims.get("role"), claims.get("perm_ver")
+        permissions = cached_permission_map(role_id, version)
+        if permissions is None:
+            permissions = await run_with_db(
+                db, get_permission_map, role_id, version or 0
+            )
+        return permissions
+
+    async def __call__(
+        self: Self,
+        claims: TokenClaims = Depends(get_token_claims),
+        db: Session = Depends(get_db),
+    ) -> None:
         """En la llamada a la clase obtenemos los permisos del JWToken.
 
         Esto con el fin de poder compararlo y poder dar acceso a ciertos
@@ -35,23 +111,35 @@ class RoleChecker:
 
         Args:
             self (Self): _description_
-            Authorize (AuthJWT): Autorizacion de la libreria que usamos.
-             Defaults to Depends().
+            claims (TokenClaims): Claims del token, se decodifica una vez
+             por peticion. Defaults to Depends(get_token_claims).
+            db (Session): Session que comparte con el endpoint, solo se usa
+             con tokens compact cuyo rol no esta en memoria.
+             Defaults to Depends(get_db).
 
         Raises:
+            HTTPException: 401 si los permisos del rol cambiaron despues de
+             generar el token, el cliente debe usar /auth/refresh
             HTTPException: 403 Forbidden
         """
-        Authorize.jwt_required()
-        permissions = Authorize.get_raw_jwt()["permissions"]
-
-        # print("Datos del token: ", permissions)
-        # print("Lo que seteamos en la ruta: ", self.allowed_permissions)
-
-        if not (
-            self.allowed_permissions["module"] in permissions  # noqa
-            and self.allowed_permissions["permission"]  # noqa
-            in permissions[self.allowed_permissions["module"]]  # noqa
-        ):
+        # Sin consultas a la BD: se compara con la version en memoria del rol
+        if permission_versions.is_stale(claims.get("role"), claims.get("perm_ver")):
+            main.logger.info(msg="Permissions changed, token must be refreshed")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                headers={"WWW-Authenticate": 'Bearer error="invalid_token"'},
+                detail={
+                    "success": False,
+                    "msg": "Permissions changed, refresh required",
+                    "refresh_required": True,
+                },
+            )
+        # Con tokens embedded se usan los frozenset que se calcularon al
+        # verificar el token, no se recorren listas en cada peticion
+        permissions = claims.permissions
+        if permissions is None:
+            permissions = await self.resolve_permissions(claims.raw, db)
+        if not self.is_allowed(claims.raw, permissions):
             main.logger.info(msg="The user dont have permissions")
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -59,4 +147,5 @@ class RoleChecker:
                 detail={"success": False, "msg": "Tú no tienes acceso a este recurso."},
             )
         else:
-            main.logger.info(msg="User has a permissions")
+            # Se ejecuta en cada peticion, solo se registra en nivel DEBUG
+            main.logger.debug(msg="User has a permissions")
@@ -0,0 +1,133 @@
+import hashlib
+import time
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Mapping, Optional
+
+from decouple import config
+from fastapi import Depends
+from fastapi_another_jwt_auth import AuthJWT
+from fastapi_another_jwt_auth.exceptions import AccessTokenRequired, MissingTokenError
+
+from app.extras.cache import TTLCache
+from app.internal.cache_events import sync_caches
+
+
+class TokenClaims:
+    """Claims del access token ya verificado, de solo lectura.
+
+    get_token_claims lo genera una vez por token y lo guarda en
+    verified_tokens, FastAPI lo comparte en la peticion con RoleChecker,
+    require_user y el endpoint, y las siguientes peticiones con el mismo
+    token reciben el mismo objeto sin validar la firma otra vez. Por eso
+    no se puede modificar: raw es un MappingProxyType y permissions se
+    calcula al crearlo con un frozenset de acciones por modulo.
+
+    Args:
+        raw (Dict[str, Any]): Claims decodificados del JWT
+    """
+
+    __slots__ = ("raw", "permissions")
+
+    raw: Mapping[str, Any]
+    permissions: Optional[Mapping[str, FrozenSet[str]]]
+
+    def __init__(self, raw: Dict[str, Any]) -> None:
+        permissions = raw.get("permissions")
+        if permissions is not None:
+            permissions = MappingProxyType(
+                {module: frozenset(actions) for module, actions in permissions.items()}
+            )
+        object.__setattr__(self, "raw", MappingProxyType(dict(raw)))
+        object.__setattr__(self, "permissions", permissions)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("TokenClaims is read-only")
+
+    @property
+    def subject(self) -> Optional[str]:
+        """ID del usuario en sesion."""
+        return self.raw.get("sub")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Regresa un claim o default si no existe."""
+        return self.raw.get(key, default)
+
+
+# Claims ya verificados por digest del token, cada entrada vive hasta el exp
+# del token. El LRU limita la memoria si llegan muchos tokens distintos.
+verified_tokens = TTLCache(
+    maxsize=config("TOKEN_CACHE_SIZE", default=10000, cast=int), ttl=0
+)
+
+
+# Atributos internos de AuthJWT que usa el camino rapido de get_token_claims.
+# requirements.txt fija la version de la libreria y test_token_claims revisa
+# que sigan existiendo; si faltan se usa jwt_required() sin cache.
+AUTHJWT_PRIVATE_API = (
+    "_token",
+    "_header_name",
+    "_decode_issuer",
+    "_denylist_token_checks",
+    "_verified_token",
+    "_check_token_is_revoked",
+)
+_fast_path = all(hasattr(AuthJWT, name) for name in AUTHJWT_PRIVATE_API)
+
+
+def token_digest(token: str) -> bytes:
+    """Llave del token en verified_tokens, no se guarda el token completo."""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def get_token_claims(Authorize: AuthJWT = Depends()) -> TokenClaims:
+    """Verifica el access token del header y regresa sus claims.
+
+    Hace lo mismo que Authorize.jwt_required() para tokens en el header,
+    pero decodifica el token una sola vez, jwt_required() lo decodifica
+    dos veces y get_raw_jwt() o get_jwt_subject() otra vez cada uno.
+    Un token que ya se verifico se toma de verified_tokens sin validar
+    la firma; la revocacion y el tipo se revisan en cada peticion. Antes
+    se aplican los eventos de cache_channel, asi las versiones de permisos
+    que usa RoleChecker y las revocaciones vienen de todos los workers.
+
+    Si el token no viene en el header (authjwt_token_location con cookies)
+    o la libreria ya no tiene los atributos de AUTHJWT_PRIVATE_API, se usa
+    el API publico: jwt_required() y get_raw_jwt(), sin cache.
+
+    Args:
+        Authorize (AuthJWT): Autorizacion de la libreria que usamos.
+         Defaults to Depends().
+
+    Raises:
+        MissingTokenError: No se envio el token
+        AccessTokenRequired: Se envio un refresh token
+
+    Returns:
+        TokenClaims: Claims del token
+    """
+    sync_caches()
+    token = Authorize._token if _fast_path else None
+    if not token or not Authorize.jwt_in_headers:
+        if _fast_path and not Authorize.jwt_in_cookies:
+            raise MissingTokenError(
+                status_code=401, message=f"Missing {Authorize._header_name} Header"
+            )
+        Authorize.jwt_required()
+        return TokenClaims(Authorize.get_raw_jwt())
+
+    key = token_digest(token)
+    claims = verified_tokens.get(key)
+    if claims is None:
+        claims = TokenClaims(Authorize._verified_token(token, Authorize._decode_issuer))
+        if "exp" in claims.raw:
+            verified_tokens.set(key, claims, ttl=claims.raw["exp"] - time.time())
+
+    raw = claims.raw
+    if raw["type"] in Authorize._denylist_token_checks:
+        Authorize._check_token_is_revoked(raw)
+    if raw["type"] != "access":
+        raise AccessTokenRequired(
+            status_code=422, message="Only access tokens are allowed"
+        )
+
+    return claims
@@ -1,12 +1,10 @@
-from typing import Optional
 from fastapi import Depends, HTTPException, status
 
 from sqlalchemy.orm import Session
-from sqlalchemy.sql.expression import false
-from fastapi_another_jwt_auth import AuthJWT
 
-from app.dependencies.data_conexion import get_db
-from app.models.users import Users
+from app.dependencies.data_conexion import get_db, run_with_db
+from app.dependencies.token_claims import TokenClaims, get_token_claims
+from app.internal.user_validity import load_user_exists, user_validity_cache
 
 
 class UserNotFound(Exception):
@@ -19,14 +17,19 @@ class UserNotFound(Exception):
     pass
 
 
-def require_user(
-    db: Session = Depends(get_db), Authorize: AuthJWT = Depends()
-) -> Optional[HTTPException]:
+async def require_user(
+    db: Session = Depends(get_db),
+    claims: TokenClaims = Depends(get_token_claims),
+) -> str:
     """Verificamos que el usuario exista en nuestros registros.
 
+    El resultado se guarda unos segundos en user_validity_cache, por lo que
+    la mayoria de las peticiones no consultan la tabla users.
+
     Args:
         db (Session, optional): _description_. Defaults to Depends(get_db).
-        Authorize (AuthJWT, optional): _description_. Defaults to Depends().
+        claims (TokenClaims, optional): Claims del token.
+         Defaults to Depends(get_token_claims).
 
     Raises:
         UserNotFound: _description_
@@ -35,19 +38,17 @@ def require_user(
         HTTPException: _description_
 
     Returns:
-        Optional[HTTPException]: _description_
+        str: ID del usuario en session
     """
     try:
-        Authorize.jwt_required()
-        current_user = Authorize.get_jwt_subject()
-        user = (
-            db.query(Users)
-            .filter(Users.id == current_user)
-            .filter(Users.is_deleted == false())
-            .first()
-        )
+        current_user = claims.subject
+        # get_token_claims ya aplico los eventos de cache_channel
+        # La mayoria de las veces se resuelve con el cache, sin ir a la BD
+        exists = user_validity_cache.get(str(current_user))
+        if exists is None:
+            exists = await run_with_db(db, load_user_exists, current_user)
 
-        if not user:
+        if not exists:
             raise UserNotFound("User no longer exist")
     except Exception as e:
         error = e.__class__.__name__
@@ -67,4 +68,4 @@ def require_user(
             detail={"status": False, "msg": "Token is invalid or has expired"},
         )
 
-    return user
+    return current_user
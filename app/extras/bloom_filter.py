@@ -0,0 +1,64 @@
+import hashlib
+import math
+import threading
+from typing import Iterable, Iterator
+
+
+class BloomFilter:
+    """Conjunto probabilistico de strings en un arreglo de bits.
+
+    Si might_contain() regresa False el valor nunca se agrego, si regresa
+    True puede ser un falso positivo y hay que confirmarlo en otro lado.
+    Se usa un solo blake2b por valor y las k posiciones se derivan con
+    doble hashing, asi una consulta cuesta un hash y k lecturas de bits.
+
+    Args:
+        capacity (int): Valores esperados antes de que suba el error
+        error_rate (float): Probabilidad de falso positivo con capacity valores
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.size = max(
+            int(-self.capacity * math.log(error_rate) / math.log(2) ** 2), 8
+        )
+        self.hashes = max(int(round(self.size / self.capacity * math.log(2))), 1)
+        self._bits = bytearray((self.size + 7) // 8)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def saturated(self) -> bool:
+        """Indica si ya tiene mas valores de los que se calcularon."""
+        return self.count > self.capacity
+
+    def _positions(self, value: str) -> Iterator[int]:
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (first + i * second) % self.size
+
+    def add(self, value: str) -> None:
+        """Agrega un valor."""
+        with self._lock:
+            for position in self._positions(value):
+                self._bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+    def update(self, values: Iterable[str]) -> None:
+        """Agrega varios valores."""
+        for value in values:
+            self.add(value)
+
+    def might_contain(self, value: str) -> bool:
+        """False si el valor seguro no esta, True si puede estar."""
+        bits = self._bits
+        for position in self._positions(value):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Cache en memoria con expiracion (TTL) y limite de tamaño (LRU).
+
+    Es seguro entre hilos y lleva contadores de hits, misses, evictions
+    e invalidations para poder exponerlos como metricas.
+
+    Args:
+        maxsize (int): Numero maximo de entradas, al pasarlo se saca la
+         menos usada.
+        ttl (float): Segundos que vive una entrada.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Cambia en cada invalidacion, evita guardar datos que se leyeron
+        # antes de que alguien invalidara la llave.
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def generation(self) -> int:
+        """Numero de invalidaciones, se pasa a set() para descartar cargas viejas."""
+        return self._generation
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Regresa el valor guardado o default si no existe o ya expiro."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                expires, value = item
+                if expires > self._clock():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: Optional[float] = None,
+        generation: Optional[int] = None,
+    ) -> None:
+        """Guarda un valor.
+
+        Args:
+            ttl (float, optional): Sobreescribe el TTL para esta entrada.
+            generation (int, optional): Si se indica y hubo invalidaciones
+             desde entonces, el valor se descarta.
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            expires = self._clock() + (self.ttl if ttl is None else ttl)
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Regresa el valor guardado o lo calcula con loader y lo guarda."""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        generation = self.generation
+        value = loader()
+        self.set(key, value, generation=generation)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        """Elimina una llave."""
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Elimina todas las llaves."""
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores para metricas."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
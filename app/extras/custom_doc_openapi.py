@@ -29,7 +29,7 @@ def custom_openapi():
         "backgroundColor": "#000000",
     }
 
-    # Get all routes where jwt_optional() or jwt_required
+    # Get all routes where jwt_optional(), jwt_required or get_token_claims
     api_router = [route for route in main.app.routes if isinstance(route, APIRoute)]
 
     for route in api_router:
@@ -41,6 +41,7 @@ def custom_openapi():
             # access_token
             if (
                 re.search("jwt_required", inspect.getsource(endpoint))
+                or re.search("get_token_claims", inspect.getsource(endpoint))  # noqa
                 or re.search("fresh_jwt_required", inspect.getsource(endpoint))  # noqa
                 or re.search("jwt_optional", inspect.getsource(endpoint))  # noqa
                 or re.search(  # noqa
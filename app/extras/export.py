@@ -0,0 +1,107 @@
+import csv
+import io
+from datetime import datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Iterable, Iterator, List, Type, Union
+
+import orjson
+from decouple import config
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+# Filas que se leen del cursor y se codifican por cada bloque de la respuesta
+EXPORT_BATCH_SIZE = config("EXPORT_BATCH_SIZE", default=1000, cast=int)
+
+Partitions = Union[Iterator[List[Any]], AsyncIterator[List[Any]]]
+
+
+class ExportFormat(str, Enum):
+    """Formatos de exportacion."""
+
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+
+def encode_ndjson(rows: Iterable[Any], fields: List[str]) -> bytes:
+    """Un objeto JSON por linea, UUID y datetime los serializa orjson."""
+    return b"".join(
+        orjson.dumps({name: getattr(row, name) for name in fields}) + b"\n"
+        for row in rows
+    )
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _write_csv(lines: Iterable[Iterable[Any]]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(lines)
+    return buffer.getvalue().encode()
+
+
+def encode_csv(rows: Iterable[Any], fields: List[str]) -> bytes:
+    """Filas en CSV sin encabezado."""
+    return _write_csv(
+        [_csv_value(getattr(row, name)) for name in fields] for row in rows
+    )
+
+
+def export_response(
+    partitions: Partitions,
+    schema: Type[BaseModel],
+    fmt: ExportFormat,
+    filename: str,
+) -> StreamingResponse:
+    """Respuesta que codifica y envia cada bloque de filas al leerlo.
+
+    Solo se mantiene en memoria un bloque de EXPORT_BATCH_SIZE filas, sin
+    importar el total de registros.
+
+    Args:
+        partitions (Partitions): Bloques de filas, sincronos o asincronos,
+         como los que regresa stream_with_db
+        schema (Type[BaseModel]): Schema con los campos a exportar
+        fmt (ExportFormat): ndjson o csv
+        filename (str): Nombre del archivo sin extension
+
+    Returns:
+        StreamingResponse: Respuesta con Content-Disposition de descarga
+    """
+    fields = list(schema.__fields__)
+    if fmt == ExportFormat.csv:
+        encode = encode_csv
+        header = _write_csv([fields])
+    else:
+        encode = encode_ndjson
+        header = b""
+
+    if hasattr(partitions, "__aiter__"):
+
+        async def content() -> AsyncIterator[bytes]:
+            yield header
+            async for rows in partitions:  # type: ignore
+                yield encode(rows, fields)
+
+    else:
+
+        def content() -> Iterator[bytes]:  # type: ignore
+            yield header
+            for rows in partitions:  # type: ignore
+                yield encode(rows, fields)
+
+    return StreamingResponse(
+        content(),
+        media_type=MEDIA_TYPES[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{fmt.value}"'
+        },
+    )
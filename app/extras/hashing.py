@@ -1,13 +1,153 @@
+import asyncio
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, List, TypeVar
+
+from decouple import config
 from passlib.context import CryptContext
+from sqlalchemy.exc import MissingGreenlet
+from sqlalchemy.util import await_only
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+T = TypeVar("T")
+
+
+class HashingPoolSaturated(Exception):
+    """Se levanta cuando la cola del pool de hashing esta llena."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Hashing pool is saturated")
+        self.retry_after = retry_after
+
+
+async def _await_future(future: Future) -> Any:
+    return await asyncio.wrap_future(future)
+
+
+class HashingPool:
+    """Pool acotado de hilos para bcrypt.
+
+    bcrypt libera el GIL mientras calcula, asi que con hilos se aprovechan
+    varios nucleos sin detener el event loop. Se admiten como maximo
+    ``workers + max_queue`` tareas a la vez; por encima de eso se levanta
+    HashingPoolSaturated y el API responde 503 con Retry-After.
+    """
+
+    def __init__(self, workers: int, max_queue: int, retry_after: int) -> None:
+        self.workers = workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="hashing"
+        )
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def _call(self, fn: Callable[..., T], args: Any) -> T:
+        try:
+            return fn(*args)
+        finally:
+            # Se libera antes de resolver el future para que stats() sea exacto
+            with self._lock:
+                self._in_flight -= 1
+                self._completed += 1
+            self._slots.release()
+
+    def submit(self, fn: Callable[..., T], *args: Any) -> "Future[T]":
+        """Encola una tarea o levanta HashingPoolSaturated si no hay lugar."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HashingPoolSaturated(self.retry_after)
+        with self._lock:
+            self._in_flight += 1
+            self._submitted += 1
+        return self._executor.submit(self._call, fn, args)
+
+    def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Ejecuta la tarea en el pool y espera su resultado.
 
-class Hash():
+        Dentro de AsyncSession.run_sync se espera con await_only, de modo que
+        el event loop sigue atendiendo otras peticiones. Fuera de ese contexto
+        (threadpool, scripts) simplemente se bloquea el hilo actual.
+        """
+        return self._result(self.submit(fn, *args))
+
+    def _result(self, future: "Future[T]") -> T:
+        waiter = _await_future(future)
+        try:
+            return await_only(waiter)
+        except MissingGreenlet:
+            waiter.close()
+            return future.result()
+
+    def map(self, fn: Callable[..., T], items: Iterable[Any]) -> List[T]:
+        """Ejecuta fn(item) por cada elemento usando todos los workers.
+
+        Para lotes grandes, como el alta masiva de usuarios. Se mantienen a
+        lo mas ``workers`` tareas propias en el pool, asi los logins siguen
+        teniendo lugar en la cola. Si aun asi el pool esta lleno se espera a
+        la tarea mas antigua antes de reintentar; solo se levanta
+        HashingPoolSaturated si no hay ninguna tarea propia pendiente.
+
+        Returns:
+            List[T]: Resultados en el mismo orden que items
+        """
+        results: List[T] = []
+        pending: Deque["Future[T]"] = deque()
+        for item in items:
+            if len(pending) >= self.workers:
+                results.append(self._result(pending.popleft()))
+            while True:
+                try:
+                    pending.append(self.submit(fn, item))
+                    break
+                except HashingPoolSaturated:
+                    if not pending:
+                        raise
+                    results.append(self._result(pending.popleft()))
+        while pending:
+            results.append(self._result(pending.popleft()))
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        """Metricas del pool: tamaño, profundidad de cola y contadores."""
+        with self._lock:
+            in_flight = self._in_flight
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": in_flight,
+                "queued": max(0, in_flight - self.workers),
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+
+hashing_pool = HashingPool(
+    workers=config("HASHING_WORKERS", default=os.cpu_count() or 2, cast=int),
+    max_queue=config("HASHING_MAX_QUEUE", default=64, cast=int),
+    retry_after=config("HASHING_RETRY_AFTER", default=1, cast=int),
+)
+
+
+class Hash:
     @staticmethod
     def bcrypt(password):
-        return pwd_context.hash(password)
-        
+        return hashing_pool.run(pwd_context.hash, password)
+
+    @staticmethod
+    def bcrypt_many(passwords: Iterable[str]) -> List[str]:
+        return hashing_pool.map(pwd_context.hash, passwords)
+
     @staticmethod
     def verify(hashed_password, plain_password: str):
-        return pwd_context.verify(plain_password, hashed_password)
+        return hashing_pool.run(pwd_context.verify, plain_password, hashed_password)
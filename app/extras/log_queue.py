@@ -0,0 +1,100 @@
+import copy
+import queue
+from logging import Formatter, LogRecord
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+
+_exception_formatter = Formatter()
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler que nunca bloquea la peticion.
+
+    Si la cola esta llena el registro se descarta y se cuenta en dropped,
+    el valor se expone en /metrics.
+    """
+
+    def __init__(self, queue: queue.Queue) -> None:
+        super().__init__(queue)
+        self.dropped = 0
+
+    def prepare(self, record: LogRecord) -> LogRecord:
+        """Prepara el registro sin perder la excepcion.
+
+        QueueHandler.prepare() pega la traza al mensaje y borra exc_info y
+        stack_info, pensado para colas entre procesos. El listener es un
+        hilo del mismo proceso, asi que se conserva la tupla para que el
+        formatter escriba exc_info; el mensaje y exc_text se resuelven aqui
+        por si los argumentos cambian antes de que el listener lo escriba.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+        return record
+
+    def enqueue(self, record: LogRecord) -> None:
+        """Agrega el registro a la cola o lo descarta si esta llena."""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BufferedRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler sin flush por registro.
+
+    BatchQueueListener llama a flush_batch() al terminar cada lote, asi se
+    escribe al disco una vez por lote y no una vez por linea.
+    """
+
+    def flush(self) -> None:
+        """No hace nada, el flush lo hace flush_batch()."""
+        pass
+
+    def flush_batch(self) -> None:
+        """Escribe al disco lo acumulado en el buffer."""
+        super().flush()
+
+
+class BatchQueueListener(QueueListener):
+    """QueueListener que procesa los registros en lotes.
+
+    Espera el primer registro y toma los que ya esten en la cola, hasta
+    batch_size, antes de hacer flush en los handlers.
+
+    Args:
+        queue (queue.Queue): Cola compartida con DroppingQueueHandler
+        handlers (Handler): Handlers que escriben los registros
+        batch_size (int): Registros maximos por lote
+    """
+
+    def __init__(self, queue: queue.Queue, *handlers, batch_size: int = 256) -> None:
+        super().__init__(queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+
+    def enqueue_sentinel(self) -> None:
+        """Al detenerse se espera lugar en la cola para no perder el aviso."""
+        self.queue.put(self._sentinel)
+
+    def _monitor(self) -> None:
+        q = self.queue
+        running = True
+        while running:
+            batch = [self.dequeue(True)]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+
+            for record in batch:
+                if record is self._sentinel:
+                    running = False
+                else:
+                    self.handle(record)
+                q.task_done()
+
+            for handler in self.handlers:
+                getattr(handler, "flush_batch", handler.flush)()
@@ -0,0 +1,46 @@
+from bisect import bisect_left
+from typing import Dict, Iterable, List
+
+# Limites en segundos, sirven para latencias de milisegundos a segundos
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Histogram:
+    """Histograma con limites fijos.
+
+    Cada observacion solo incrementa un contador de su rango, no guarda los
+    valores, asi el costo es constante y no crece con el trafico.
+
+    Args:
+        buckets (Iterable[float]): Limites superiores de cada rango,
+         ordenados de menor a mayor.
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        # El ultimo contador es para los valores mayores al ultimo limite
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Registra un valor."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[int]:
+        """Conteos acumulados por limite, el ultimo equivale a +Inf."""
+        total = 0
+        result = []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+    def snapshot(self) -> Dict[str, object]:
+        """Valores actuales para exponerlos como JSON."""
+        cumulative = self.cumulative()
+        buckets = {str(le): cumulative[i] for i, le in enumerate(self.buckets)}
+        buckets["+Inf"] = cumulative[-1]
+        return {"buckets": buckets, "sum": self.sum, "count": self.count}
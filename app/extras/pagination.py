@@ -0,0 +1,209 @@
+import base64
+import datetime
+import json
+from typing import Any, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from decouple import config
+from sqlalchemy import and_, func, or_, text
+from sqlalchemy.orm import Query
+
+from app.extras.cache import TTLCache
+
+# Registros por pagina cuando se usa cursor sin limit
+PAGE_SIZE = config("PAGE_SIZE", default=50, cast=int)
+
+# Los totales se guardan unos segundos por cada combinacion de filtros
+count_cache = TTLCache(
+    maxsize=config("COUNT_CACHE_SIZE", default=1024, cast=int),
+    ttl=config("COUNT_CACHE_TTL", default=10, cast=float),
+)
+
+
+class InvalidCursor(Exception):
+    """El cursor recibido no se pudo decodificar."""
+
+    pass
+
+
+class Page(NamedTuple):
+    """Resultado de paginar una consulta."""
+
+    rows: List[Any]
+    next_cursor: Optional[str]
+    prev_cursor: Optional[str]
+
+
+def encode_cursor(created_on: datetime.datetime, id: UUID, direction: str) -> str:
+    """Genera un cursor opaco a partir de (created_on, id).
+
+    Args:
+        created_on (datetime): Fecha de creacion del registro
+        id (UUID): ID del registro
+        direction (str): "next" o "prev"
+
+    Returns:
+        str: Cursor en base64 url-safe
+    """
+    payload = json.dumps(
+        {"c": created_on.isoformat(), "i": UUID(str(id)).hex, "d": direction},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime.datetime, UUID, str]:
+    """Recupera (created_on, id, direction) de un cursor.
+
+    Raises:
+        InvalidCursor: Si el cursor no es valido
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        direction = payload["d"]
+        if direction not in ("next", "prev"):
+            raise ValueError(direction)
+        created_on = datetime.datetime.fromisoformat(payload["c"])
+        return created_on, UUID(hex=payload["i"]), direction
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor(cursor) from e
+
+
+def _row_cursor(row: Any, direction: str) -> str:
+    return encode_cursor(row.created_on, row.id, direction)
+
+
+def paginate(
+    query: Query,
+    created_on: Any,
+    id: Any,
+    start: Optional[int] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Page:
+    """Pagina una consulta ordenada por (created_on, id).
+
+    Sin cursor se usa offset/limit como antes. Con cursor se filtra a partir
+    del ultimo registro visto (keyset), asi el costo no crece con la pagina
+    y se aprovecha el indice compuesto (created_on, id).
+
+    Las filas deben tener los atributos created_on e id para poder
+    generar los cursores.
+
+    Args:
+        query (Query): Consulta con los filtros ya aplicados
+        created_on (Column): Columna created_on de la tabla principal
+        id (Column): Columna id de la tabla principal
+        start (int, optional): Offset, solo sin cursor. Defaults to None.
+        limit (int, optional): Registros por pagina. Defaults to None.
+        cursor (str, optional): next_cursor o prev_cursor de una
+         respuesta anterior. Defaults to None.
+
+    Raises:
+        InvalidCursor: Si el cursor no es valido
+
+    Returns:
+        Page: Registros y cursores para la pagina siguiente y anterior
+    """
+    if cursor is None:
+        # Se pide un registro de mas para saber si hay otra pagina
+        rows = (
+            query.order_by(created_on, id)
+            .offset(start)
+            .limit(None if limit is None else limit + 1)
+            .all()
+        )
+        has_more = limit is not None and len(rows) > limit
+        rows = rows[:limit]
+        return Page(
+            rows,
+            _row_cursor(rows[-1], "next") if has_more else None,
+            _row_cursor(rows[0], "prev") if start and rows else None,
+        )
+
+    last_created, last_id, direction = decode_cursor(cursor)
+    limit = limit or PAGE_SIZE
+    if direction == "next":
+        query = query.filter(
+            or_(
+                created_on > last_created,
+                and_(created_on == last_created, id > last_id),
+            )
+        ).order_by(created_on, id)
+    else:
+        query = query.filter(
+            or_(
+                created_on < last_created,
+                and_(created_on == last_created, id < last_id),
+            )
+        ).order_by(created_on.desc(), id.desc())
+
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == "next":
+        return Page(
+            rows,
+            _row_cursor(rows[-1], "next") if has_more else None,
+            _row_cursor(rows[0], "prev") if rows else None,
+        )
+
+    rows.reverse()
+    return Page(
+        rows,
+        _row_cursor(rows[-1], "next") if rows else None,
+        _row_cursor(rows[0], "prev") if has_more else None,
+    )
+
+
+def _estimated_rows(query: Query, table: str) -> Optional[int]:
+    """Numero de filas segun las estadisticas de la tabla (solo MySQL).
+
+    Es el total de la tabla sin filtros, incluye los registros borrados.
+    """
+    session = query.session
+    if session.get_bind().dialect.name != "mysql":
+        return None
+    return session.execute(
+        text(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table"
+        ),
+        {"table": table},
+    ).scalar()
+
+
+def count_rows(query: Query, id: Any, approximate: bool = False) -> int:
+    """Total de registros de una consulta sin paginar.
+
+    Se hace un COUNT sobre la misma consulta (mismos joins y filtros) y se
+    guarda en count_cache por unos segundos, la llave es el SQL con sus
+    parametros. Con approximate se usa la estadistica de la tabla en lugar
+    del COUNT, es inmediato pero ignora los filtros; si la base de datos no
+    la tiene se hace el COUNT normal.
+
+    Args:
+        query (Query): Consulta con los filtros ya aplicados
+        id (Column): Columna id de la tabla principal
+        approximate (bool, optional): Usar el estimado de la tabla.
+         Defaults to False.
+
+    Returns:
+        int: Total de registros
+    """
+    if approximate:
+        table = id.expression.table.name
+        estimate = count_cache.get_or_load(
+            ("approximate", table), lambda: _estimated_rows(query, table)
+        )
+        if estimate is not None:
+            return int(estimate)
+
+    count_query = query.with_entities(func.count(id)).order_by(None)
+    statement = count_query.statement.compile()
+    key = (
+        str(statement),
+        tuple(sorted((name, str(value)) for name, value in statement.params.items())),
+    )
+    return count_cache.get_or_load(key, count_query.scalar)
@@ -0,0 +1,74 @@
+import hashlib
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from decouple import config
+
+from app.models.actions_enum import ActionName
+
+# Modulos que protege permissions_policy.py. El orden define los bits, solo
+# agrega al final para no cambiar la posicion de los existentes.
+POLICY_MODULES = ("users", "roles", "modules", "actions", "permissions")
+
+# Si es True los tokens llevan tambien el claim perm_bits
+PERMISSION_BITS_CLAIM = config("PERMISSION_BITS_CLAIM", default=True, cast=bool)
+
+# embedded: el token lleva el diccionario permissions. compact: solo rol,
+# perm_ver y perm_bits, el resto se resuelve con el mapa de permisos en memoria
+TOKEN_PERMISSIONS = config("TOKEN_PERMISSIONS", default="embedded")
+
+
+class PermissionVocabulary:
+    """Asigna una posicion de bit a cada par (modulo, accion).
+
+    Con esto los permisos de un rol se representan como un entero y
+    RoleChecker los valida con un solo AND. El fingerprint cambia si
+    cambia el vocabulario, asi un token generado con otro vocabulario
+    no se interpreta con bits equivocados.
+
+    Args:
+        modules (Iterable[str]): Nombres de los modulos
+        actions (Iterable[str]): Nombres de las acciones
+    """
+
+    def __init__(self, modules: Iterable[str], actions: Iterable[str]) -> None:
+        self.modules = tuple(modules)
+        self.actions = tuple(actions)
+        self._bits: Dict[Tuple[str, str], int] = {}
+        for module_index, module in enumerate(self.modules):
+            for action_index, action in enumerate(self.actions):
+                position = module_index * len(self.actions) + action_index
+                self._bits[(module, action)] = 1 << position
+        vocabulary = ",".join(self.modules) + "|" + ",".join(self.actions)
+        self.fingerprint = hashlib.sha1(vocabulary.encode()).hexdigest()[:8]
+
+    def mask(self, module: str, action: str) -> Optional[int]:
+        """Bit del permiso o None si no pertenece al vocabulario."""
+        return self._bits.get((module, action))
+
+    def encode(self, permissions: Mapping[str, Iterable[str]]) -> int:
+        """Convierte {modulo: [acciones]} en un entero."""
+        bits = 0
+        for module, actions in permissions.items():
+            for action in actions:
+                bits |= self._bits.get((module, action), 0)
+        return bits
+
+    def decode(self, bits: int) -> Dict[str, List[str]]:
+        """Convierte un entero en {modulo: [acciones]}."""
+        permissions: Dict[str, List[str]] = {}
+        for (module, action), bit in self._bits.items():
+            if bits & bit:
+                permissions.setdefault(module, []).append(action)
+        return permissions
+
+    def claims(self, permissions: Mapping[str, Iterable[str]]) -> Dict[str, Any]:
+        """Claims compactos para el JWT."""
+        return {
+            "perm_bits": self.encode(permissions),
+            "perm_v": self.fingerprint,
+        }
+
+
+permission_vocabulary = PermissionVocabulary(
+    POLICY_MODULES, [action.value for action in ActionName]
+)
@@ -0,0 +1,250 @@
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.extras.cache import TTLCache
+from app.extras.metrics import Histogram
+
+# Consultas por peticion, sirve para detectar N+1
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Plantilla de ruta por (metodo, path). Las rutas con id llenan el cache con
+# paths distintos, el limite LRU evita que crezca sin fin.
+ROUTE_CACHE_SIZE = 4096
+
+
+class RequestStats:
+    """Consultas a la BD hechas durante una peticion."""
+
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.seconds = 0.0
+
+
+class RouteMetrics:
+    """Metricas de una ruta (metodo + plantilla)."""
+
+    __slots__ = ("latency", "db_queries", "db_seconds", "in_flight", "responses")
+
+    def __init__(self) -> None:
+        self.latency = Histogram()
+        self.db_queries = Histogram(QUERY_BUCKETS)
+        self.db_seconds = 0.0
+        self.in_flight = 0
+        self.responses: Dict[int, int] = {}
+
+
+# La peticion en curso, lo lee el evento de SQLAlchemy. El threadpool de
+# starlette y run_sync copian el contexto, asi que llega a las consultas.
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar(
+    "current_request", default=None
+)
+
+routes: Dict[Tuple[str, str], RouteMetrics] = {}
+
+
+route_templates = TTLCache(maxsize=ROUTE_CACHE_SIZE, ttl=float("inf"))
+
+
+# El inicio va en el contexto de ejecucion y no en la conexion: si la
+# consulta falla after_cursor_execute no se llama y no queda nada pendiente.
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    start = getattr(context, "_query_start", None)
+    stats = _current_request.get()
+    if start is not None and stats is not None:
+        stats.queries += 1
+        stats.seconds += time.perf_counter() - start
+
+
+def instrument_queries() -> None:
+    """Cuenta las consultas de todos los engines (sync y async)."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _route_template(scope: Scope) -> str:
+    """Plantilla de la ruta, por ejemplo /users/{id}, para no crear una
+    serie por cada id."""
+    key = (scope["method"], scope["path"])
+    template = route_templates.get(key)
+    if template is None:
+        template = _match_route(scope)
+        route_templates.set(key, template)
+    return template
+
+
+def _match_route(scope: Scope) -> str:
+    """Recorre las rutas de la app, solo en un miss de route_templates."""
+    partial = None
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or "unmatched"
+
+
+class PrometheusMiddleware:
+    """Middleware ASGI que mide cada peticion HTTP.
+
+    Registra por metodo y plantilla de ruta la latencia, las peticiones en
+    curso, los codigos de respuesta y las consultas a la BD. Solo hace
+    sumas sobre contadores ya creados, no usa locks.
+
+    Args:
+        app (ASGIApp): Aplicacion
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        instrument_queries()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        key = (scope["method"], _route_template(scope))
+        metrics = routes.get(key)
+        if metrics is None:
+            metrics = routes.setdefault(key, RouteMetrics())
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        metrics.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.latency.observe(time.perf_counter() - start)
+            metrics.in_flight -= 1
+            metrics.responses[status_code] = metrics.responses.get(status_code, 0) + 1
+            metrics.db_queries.observe(stats.queries)
+            metrics.db_seconds += stats.seconds
+            _current_request.reset(token)
+
+
+def _labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    values = ",".join(f'{name}="{value}"' for name, value in labels.items())
+    return "{" + values + "}"
+
+
+class Exposition:
+    """Construye el texto en formato de Prometheus."""
+
+    def __init__(self) -> None:
+        self.lines: List[str] = []
+        self._declared: set = set()
+
+    def _declare(self, name: str, kind: str, help: str) -> None:
+        if name not in self._declared:
+            self._declared.add(name)
+            self.lines.append(f"# HELP {name} {help}")
+            self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(
+        self,
+        name: str,
+        kind: str,
+        help: str,
+        value: float,
+        labels: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Agrega un counter o gauge."""
+        self._declare(name, kind, help)
+        self.lines.append(f"{name}{_labels(labels or {})} {value}")
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        histogram: Histogram,
+        labels: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Agrega las series _bucket, _sum y _count de un histograma."""
+        labels = labels or {}
+        self._declare(name, "histogram", help)
+        cumulative = histogram.cumulative()
+        bounds: Iterable[Any] = list(histogram.buckets) + ["+Inf"]
+        for le, count in zip(bounds, cumulative):
+            self.lines.append(f"{name}_bucket{_labels({**labels, 'le': le})} {count}")
+        self.lines.append(f"{name}_sum{_labels(labels)} {histogram.sum}")
+        self.lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def add_route_metrics(exposition: Exposition) -> None:
+    """Agrega las metricas HTTP de todas las rutas.
+
+    Prometheus pide que las series de una metrica vayan juntas, por eso se
+    recorren las rutas una vez por metrica.
+    """
+    items = [
+        ({"method": method, "route": route}, metrics)
+        for (method, route), metrics in list(routes.items())
+    ]
+    for labels, metrics in items:
+        exposition.histogram(
+            "http_request_duration_seconds",
+            "Latencia de las peticiones HTTP.",
+            metrics.latency,
+            labels,
+        )
+    for labels, metrics in items:
+        exposition.sample(
+            "http_requests_in_flight",
+            "gauge",
+            "Peticiones en curso.",
+            metrics.in_flight,
+            labels,
+        )
+    for labels, metrics in items:
+        for status_code, count in list(metrics.responses.items()):
+            exposition.sample(
+                "http_requests_total",
+                "counter",
+                "Peticiones HTTP por codigo de respuesta.",
+                count,
+                {**labels, "status": status_code},
+            )
+    for labels, metrics in items:
+        exposition.histogram(
+            "http_request_db_queries",
+            "Consultas a la BD por peticion.",
+            metrics.db_queries,
+            labels,
+        )
+    for labels, metrics in items:
+        exposition.sample(
+            "http_request_db_seconds_total",
+            "counter",
+            "Tiempo total en consultas a la BD.",
+            metrics.db_seconds,
+            labels,
+        )
@@ -0,0 +1,50 @@
+from typing import Any, Dict, Iterable, List, Type, Union
+
+from decouple import config
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+# Con False los listados se regresan como ORJSONResponse y FastAPI no vuelve
+# a validar la respuesta contra el response_model de la ruta
+RESPONSE_VALIDATION = config("RESPONSE_VALIDATION", default=False, cast=bool)
+
+
+def rows_to_dicts(rows: Iterable[Any], schema: Type[BaseModel]) -> List[dict]:
+    """Convierte filas de SQLAlchemy en diccionarios con los campos del schema.
+
+    Sirve tanto para Row (consultas por columnas) como para objetos del
+    modelo, solo se leen los campos del schema para no exponer columnas
+    de mas como is_deleted o created_by.
+
+    Args:
+        rows (Iterable[Any]): Filas regresadas por la consulta
+        schema (Type[BaseModel]): Schema de cada elemento de data
+
+    Returns:
+        List[dict]: Filas con UUID y datetime sin convertir
+    """
+    fields = tuple(schema.__fields__)
+    return [{name: getattr(row, name) for name in fields} for row in rows]
+
+
+def list_response(
+    res: Dict[str, Any], schema: Type[BaseModel]
+) -> Union[ORJSONResponse, Dict[str, Any]]:
+    """Respuesta de un listado con la propiedad data.
+
+    orjson serializa UUID y datetime de forma nativa, asi se evita recorrer
+    cada fila con jsonable_encoder y la segunda validacion de pydantic.
+
+    Args:
+        res (Dict[str, Any]): Respuesta con success, numRows y data
+        schema (Type[BaseModel]): Schema de cada elemento de data
+
+    Returns:
+        Union[ORJSONResponse, Dict[str, Any]]: ORJSONResponse lista para
+        enviarse, o el diccionario codificado si RESPONSE_VALIDATION es True
+    """
+    res["data"] = rows_to_dicts(res["data"], schema)
+    if RESPONSE_VALIDATION:
+        return jsonable_encoder(res)
+    return ORJSONResponse(content=res)
@@ -3,16 +3,22 @@ from typing import Optional
 from uuid import UUID
 
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from sqlalchemy.sql.expression import false
+from sqlalchemy.sql import Select
 from fastapi import status
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
 from app import main
+from app.extras.pagination import count_rows, paginate
+from app.extras.responses import list_response
 from app.schemas import action_schemas
 from app.models.module import Module
 from app.models.actions import Actions
 from app.models.role_actions import Role_Actions
+from app.internal.archive import restore_archived
+from app.internal.permission_map import invalidate_roles, roles_with_action
+from app.internal.permission_version import bump_permission_version
 
 extra = {"event.category": "app_log"}
 
@@ -60,14 +66,19 @@ class ActionsOperations:
              En caso contrario nos mostrara la propiedad success
              y la propiedad msg.
         """
-        new_action = (
-            db.query(Actions)
-            .filter(
-                Actions.module_id == request.module_id,
-                Actions.action_name == request.action_name,
-            )
-            .first()
+        find_action = db.query(Actions).filter(
+            Actions.module_id == request.module_id,
+            Actions.action_name == request.action_name,
         )
+        new_action = find_action.first()
+        if new_action is None and restore_archived(
+            db,
+            Actions,
+            module_id=request.module_id,
+            action_name=request.action_name,
+        ):
+            # Las acciones archivadas se restauran con su ID original
+            new_action = find_action.first()
 
         # print(50*'-')
         # print(new_action)
@@ -76,7 +87,7 @@ class ActionsOperations:
         check_module = (
             db.query(Module.id)
             .filter(Module.id == request.module_id)
-            .filter(Module.is_deleted == false())
+            .filter(Module.not_deleted())
             .first()
         )
 
@@ -84,20 +95,26 @@ class ActionsOperations:
         # print(check_module)
         # print(50*'-')
 
-        if new_action and new_action.is_deleted is True:
+        if new_action and new_action.soft_deleted:
             # If the action is deleted, we can restore it and set the is_deleted to False.
             # print("If the action is deleted, we can restore it.")
+            affected_roles = roles_with_action(db, new_action.id)
             new_action.is_deleted = False
+            new_action.deleted_at = None
+            new_action.is_active = request.is_active
             new_action.created_on = datetime.now()
             new_action.created_by = current_user
+            # Los permisos que seguian asignados vuelven a tener efecto
+            bump_permission_version(db, affected_roles)
             db.commit()
+            invalidate_roles(affected_roles)
             main.logger.info(msg="Action created successfully!", extra=extra)
             return JSONResponse(
                 status_code=status.HTTP_201_CREATED,
                 content={"success": True, "msg": "Action created succesfully!"},
             )
 
-        elif new_action is not None and new_action.is_deleted is False:
+        elif new_action is not None:
             # If the user is not deleted, we can not create it.
             # print("If the user is not deleted, we can not create it.")
             main.logger.info(msg="Action already exist!", extra=extra)
@@ -135,6 +152,8 @@ class ActionsOperations:
         db: Session,
         start: Optional[int] = None,
         limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        approximate: bool = False,
     ) -> JSONResponse:
         """Este metodo cuenta todos los registros y paginar el listado de la informacion.
 
@@ -145,15 +164,20 @@ class ActionsOperations:
             indicar el inicio de nuestro paginador. Defaults to None.
             limit (int, optional): Este argumento sirve para
             indicar el limite de nuestro paginador. Defaults to None.
+            cursor (str, optional): Cursor de la respuesta anterior para
+            paginar por (created_on, id) en lugar de offset. Defaults to None.
+            approximate (bool, optional): Usar el estimado de la tabla para
+            numRows en lugar de COUNT. Defaults to False.
 
         Returns:
             JSONResponse:  Nos devuelve una respuesta en JSON con la propiedad success
                 en caso de tener exito nos mostarara la propiedad numRows con la cantidad de todos
                 los registros y data con la informacion solicitada.
         """
-        show_roles = (
+        query = (
             db.query(
                 Actions.id,
+                Actions.created_on,
                 Actions.action_name,
                 Actions.is_active,
                 Actions.description,
@@ -161,18 +185,47 @@ class ActionsOperations:
                 Module.name.label("module_name"),
             )
             .join(Module, isouter=True)
-            .filter(Actions.is_deleted == false())
-            .filter(Module.is_deleted == false())
-            .offset(start)
-            .limit(limit)
-            .all()
+            .filter(Actions.not_deleted())
+            .filter(Module.not_deleted())
         )
+        page = paginate(query, Actions.created_on, Actions.id, start, limit, cursor)
+        show_roles = page.rows
         # Sacar el numero de registros
-        total = len(show_roles)
-
-        res = {"success": True, "numRows": total, "data": show_roles}
+        total = count_rows(query, Actions.id, approximate)
+
+        res = {
+            "success": True,
+            "numRows": total,
+            "data": show_roles,
+            "next_cursor": page.next_cursor,
+            "prev_cursor": page.prev_cursor,
+        }
         main.logger.info(msg="List of Actions is display!", extra=extra)
-        return jsonable_encoder(res)
+        return list_response(res, action_schemas.ShowActionInfo)
+
+    def export_actions(self) -> Select:
+        """Consulta para exportar las acciones con los filtros del listado.
+
+        #? ENDPOINT /actions/export GET
+
+        Returns:
+            Select: Consulta ordenada por (created_on, id) para stream_with_db
+        """
+        main.logger.info(msg="Actions export started!", extra=extra)
+        return (
+            select(
+                Actions.id,
+                Actions.action_name,
+                Actions.is_active,
+                Actions.description,
+                Actions.module_id,
+                Module.name.label("module_name"),
+            )
+            .join(Module, isouter=True)
+            .where(Actions.not_deleted())
+            .where(Module.not_deleted())
+            .order_by(Actions.created_on, Actions.id)
+        )
 
     def get_one_action(self, db: Session, id: UUID) -> JSONResponse:
         """Este metodo lo que hace es realizar la busqueda de un registro por su id.
@@ -200,8 +253,8 @@ class ActionsOperations:
             )
             .join(Module, isouter=True)
             .filter(Actions.id == id)
-            .filter(Actions.is_deleted == false())
-            .filter(Module.is_deleted == false())
+            .filter(Actions.not_deleted())
+            .filter(Module.not_deleted())
             .first()
         )
 
@@ -250,7 +303,7 @@ class ActionsOperations:
         action = (
             db.query(Actions)
             .filter(Actions.id == id)
-            .filter(Actions.is_deleted == false())
+            .filter(Actions.not_deleted())
             .first()
         )
 
@@ -266,7 +319,7 @@ class ActionsOperations:
             db.query(Actions)
             .filter(Actions.action_name == request.action_name)
             .filter(Actions.module_id == action.module_id)
-            .filter(Actions.is_deleted == false())
+            .filter(Actions.not_deleted())
             .count()
         )
 
@@ -287,9 +340,12 @@ class ActionsOperations:
         action.is_active = request.is_active
         action.updated_by = current_user
         action.updated_on = datetime.now()
+        affected_roles = roles_with_action(db, id)
         db.add(action)
+        bump_permission_version(db, affected_roles)
         db.commit()
         db.refresh(action)
+        invalidate_roles(affected_roles)
         main.logger.info(msg="Action Updated successfully!", extra=extra)
         return JSONResponse(
             status_code=202, content={"success": True, "msg": "Updated successfully"}
@@ -317,7 +373,7 @@ class ActionsOperations:
         check_child = (
             db.query(Role_Actions)
             .filter(Role_Actions.actions_id == id)
-            .filter(Role_Actions.is_deleted == false())
+            .filter(Role_Actions.not_deleted())
             .count()
         )
 
@@ -332,7 +388,9 @@ class ActionsOperations:
             )
 
         is_d = True
-        action = db.query(Actions).filter(Actions.id == id).filter_by(is_deleted=False)
+        action = (
+            db.query(Actions).filter(Actions.id == id).filter(Actions.not_deleted())
+        )
         if is_d is False:
             main.logger.info(
                 msg="value is true but something was changed to false!", extra=extra
@@ -347,7 +405,10 @@ class ActionsOperations:
                 status_code=status.HTTP_404_NOT_FOUND,
                 content={"success": False, "msg": "Not Found"},
             )
-        action.update({Actions.is_deleted: is_d, Actions.is_active: False})
+        affected_roles = roles_with_action(db, id)
+        action.update({**Actions.deleted_values(), "is_active": False})
+        bump_permission_version(db, affected_roles)
         db.commit()
+        invalidate_roles(affected_roles)
         main.logger.info(msg=f"Action {id} it's deleted!", extra=extra)
         return None
@@ -0,0 +1,197 @@
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from decouple import config
+from sqlalchemy import delete, exists, insert, literal, or_, select
+from sqlalchemy.orm import Session
+from sqlalchemy.types import DateTime
+
+from app import main
+from app.models.actions import Actions
+from app.models.archive import ARCHIVES
+from app.models.role_actions import Role_Actions
+from app.models.users import Users
+
+extra = {"event.category": "app_log"}
+
+# Dias que un registro eliminado se queda en la tabla antes de archivarse
+ARCHIVE_AFTER_DAYS = config("ARCHIVE_AFTER_DAYS", default=90, cast=int)
+# Registros por transaccion y segundos de pausa entre transacciones
+ARCHIVE_BATCH_SIZE = config("ARCHIVE_BATCH_SIZE", default=500, cast=int)
+ARCHIVE_SLEEP = config("ARCHIVE_SLEEP", default=0.1, cast=float)
+
+# Primero los permisos, asi las acciones eliminadas quedan sin referencias
+ARCHIVE_ORDER = (Role_Actions, Actions, Users)
+
+
+def _archivable(model: Any, cutoff: datetime) -> Any:
+    """IDs de los registros eliminados antes de cutoff."""
+    query = select(model.id).where(model.deleted_at < cutoff)
+    if model is Actions:
+        # Una accion con permisos, aunque esten eliminados, sigue referenciada
+        query = query.where(~exists().where(Role_Actions.actions_id == Actions.id))
+    return query
+
+
+def archive_model(
+    db: Session,
+    model: Any,
+    cutoff: datetime,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    sleep: float = ARCHIVE_SLEEP,
+    limit: Optional[int] = None,
+) -> int:
+    """Mueve a la tabla historica los registros eliminados antes de cutoff.
+
+    Cada bloque se copia y se borra en su propia transaccion, con una pausa
+    entre bloques para no acaparar la BD ni los locks de la tabla.
+
+    Args:
+        db (Session): Session de SQLAlchemy
+        model (Any): Users, Actions o Role_Actions
+        cutoff (datetime): Fecha limite de deleted_at
+        batch_size (int, optional): Registros por transaccion.
+        sleep (float, optional): Segundos entre transacciones.
+        limit (Optional[int], optional): Maximo de registros a mover.
+
+    Returns:
+        int: Numero de registros archivados
+    """
+    table = model.__table__
+    archive = ARCHIVES[model]
+    total = 0
+    while limit is None or total < limit:
+        size = batch_size if limit is None else min(batch_size, limit - total)
+        ids = db.execute(_archivable(model, cutoff).limit(size)).scalars().all()
+        if not ids:
+            break
+        archived_on = literal(datetime.now(), DateTime)
+        db.execute(
+            insert(archive).from_select(
+                [column.name for column in table.columns] + ["archived_on"],
+                select(*table.columns, archived_on).where(table.c.id.in_(ids)),
+            )
+        )
+        db.execute(delete(table).where(table.c.id.in_(ids)))
+        db.commit()
+        total += len(ids)
+        main.logger.info(
+            msg=f"{len(ids)} rows archived from {table.name}!", extra=extra
+        )
+        if len(ids) < size:
+            break
+        time.sleep(sleep)
+    return total
+
+
+def archive_deleted(
+    db: Session,
+    older_than_days: int = ARCHIVE_AFTER_DAYS,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    sleep: float = ARCHIVE_SLEEP,
+    limit: Optional[int] = None,
+) -> Dict[str, int]:
+    """Archiva permisos, acciones y usuarios eliminados hace mas de N dias.
+
+    Modulos y roles no se archivan: create_module y create_new_role los
+    restauran por nombre y son los padres de las demas tablas.
+
+    Returns:
+        Dict[str, int]: Registros archivados por tabla
+    """
+    cutoff = datetime.now() - timedelta(days=older_than_days)
+    return {
+        model.__tablename__: archive_model(db, model, cutoff, batch_size, sleep, limit)
+        for model in ARCHIVE_ORDER
+    }
+
+
+def _restorable(model: Any, query: Any) -> Any:
+    """Filtra los archivados cuyos padres siguen existiendo."""
+    archive = ARCHIVES[model]
+    for foreign_key in model.__table__.foreign_keys:
+        column = archive.c[foreign_key.parent.name]
+        query = query.where(
+            or_(column.is_(None), column.in_(select(foreign_key.column)))
+        )
+    return query
+
+
+def _restore_rows(db: Session, model: Any, rows: List[Any]) -> None:
+    """Copia los registros archivados a la tabla viva y los borra del archivo."""
+    table = model.__table__
+    archive = ARCHIVES[model]
+    db.execute(
+        insert(table),
+        [
+            {column.name: row._mapping[column.name] for column in table.columns}
+            for row in rows
+        ],
+    )
+    db.execute(delete(archive).where(archive.c.id.in_([row.id for row in rows])))
+
+
+def restore_archived(db: Session, model: Any, **lookup: Any) -> bool:
+    """Regresa a la tabla viva el ultimo registro archivado que coincida.
+
+    El registro vuelve eliminado, con su ID original, para que el create_*
+    que lo busco siga su camino normal de restauracion. Solo se consideran
+    registros cuyos padres siguen existiendo. No hace commit.
+
+    Args:
+        db (Session): Session de SQLAlchemy
+        model (Any): Users, Actions o Role_Actions
+        lookup (Any): Columnas y valores con los que el create_* busca
+
+    Returns:
+        bool: True si se restauro un registro
+    """
+    archive = ARCHIVES[model]
+    query = select(archive).where(
+        *[archive.c[column] == value for column, value in lookup.items()]
+    )
+    query = _restorable(model, query)
+    row = db.execute(query.order_by(archive.c.archived_on.desc()).limit(1)).first()
+    if row is None:
+        return False
+
+    _restore_rows(db, model, [row])
+    main.logger.info(msg=f"Row {row.id} restored from {archive.name}!", extra=extra)
+    return True
+
+
+def restore_archived_many(
+    db: Session, model: Any, column: str, values: Iterable[Any]
+) -> Dict[Any, Any]:
+    """Igual que restore_archived para varios valores de una columna unica.
+
+    Hace una sola consulta al archivo por bloque de ARCHIVE_BATCH_SIZE
+    valores en lugar de una por valor. No hace commit.
+
+    Args:
+        db (Session): Session de SQLAlchemy
+        model (Any): Users, Actions o Role_Actions
+        column (str): Columna con la que el create_* busca, por ejemplo email
+        values (Iterable[Any]): Valores que no estan en la tabla viva
+
+    Returns:
+        Dict[Any, Any]: ID restaurado por cada valor encontrado
+    """
+    archive = ARCHIVES[model]
+    values = list(values)
+    latest = {}
+    for i in range(0, len(values), ARCHIVE_BATCH_SIZE):
+        query = select(archive).where(
+            archive.c[column].in_(values[i : i + ARCHIVE_BATCH_SIZE])
+        )
+        query = _restorable(model, query).order_by(archive.c.archived_on.desc())
+        for row in db.execute(query):
+            # El primero de cada valor es el archivado mas reciente
+            latest.setdefault(row._mapping[column], row)
+    if latest:
+        _restore_rows(db, model, list(latest.values()))
+        main.logger.info(
+            msg=f"{len(latest)} rows restored from {archive.name}!", extra=extra
+        )
+    return {value: row.id for value, row in latest.items()}
@@ -1,26 +1,129 @@
 import datetime
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
 from fastapi import Depends, HTTPException, status
 from fastapi.responses import JSONResponse
 
-from sqlalchemy.sql.expression import false, true
+from sqlalchemy.sql.expression import true
 from sqlalchemy.orm import Session
 from fastapi_another_jwt_auth import AuthJWT
+from fastapi_another_jwt_auth.exceptions import AuthJWTException, MissingTokenError
 
 from app import main
 from app.models import Users
-from app.models.actions import Actions
-from app.models.module import Module
-from app.models.role_actions import Role_Actions
 from app.models.roles import Role
 from app.schemas import schemas_config
-from app.extras.hashing import Hash
+from app.extras.hashing import Hash, HashingPoolSaturated
+from app.extras.permission_bits import (
+    PERMISSION_BITS_CLAIM,
+    TOKEN_PERMISSIONS,
+    permission_vocabulary,
+)
 from app.dependencies.data_conexion import get_db
+from app.internal.permission_map import (
+    get_permission_map,
+    parse_permission_pairs,
+    permission_cache,
+    permission_pairs_of,
+    remember_permission_map,
+)
+from app.internal.permission_version import (
+    PERMISSION_VERSION_CLAIM,
+    permission_versions,
+)
+from app.internal.token_revocation import token_revocations
 
 extra = {"event.category": "auth"}
 
 
+def permission_claims(
+    version: int, permissions: Dict[str, List[str]]
+) -> Dict[str, Any]:
+    """Claims de permisos del token segun TOKEN_PERMISSIONS.
+
+    El formato compact no lleva el diccionario permissions, RoleChecker usa
+    perm_bits o resuelve el rol y perm_ver con el mapa en memoria, por eso
+    siempre lleva ambos claims.
+
+    Args:
+        version (int): perm_version del rol
+        permissions (Dict[str, List[str]]): {modulo: [acciones]}
+
+    Returns:
+        Dict[str, Any]: Claims para agregar al token
+    """
+    compact = TOKEN_PERMISSIONS == "compact"
+    claims: Dict[str, Any] = {} if compact else {"permissions": permissions}
+    if PERMISSION_BITS_CLAIM or compact:
+        claims.update(permission_vocabulary.claims(permissions))
+    if PERMISSION_VERSION_CLAIM or compact:
+        claims["perm_ver"] = version
+    return claims
+
+
+def user_with_permissions(db: Session, *criteria: Any) -> Any:
+    """Usuario activo con su rol y los permisos del rol en una sola consulta.
+
+    No se busca antes en permission_cache: el rol se conoce hasta leer al
+    usuario, asi que usar el cache costaria una segunda consulta en cada
+    fallo. La subconsulta de permission_pairs_of usa indices (ver
+    test_query_plans) y user_permissions guarda el mapa leido en el cache
+    para RoleChecker.
+
+    Args:
+        db (Session): Session de SQLAlchemy
+        *criteria: Filtros del usuario, por ejemplo Users.email == email
+
+    Returns:
+        Row: id, email, role_id, is_active, password, soft_deleted,
+         role_name, perm_version y permission_pairs, None si no existe
+    """
+    return (
+        db.query(
+            Users.id,
+            Users.email,
+            Users.role_id,
+            Users.is_active,
+            Users.password,
+            Users.soft_deleted.label("soft_deleted"),
+            Role.name.label("role_name"),
+            Role.perm_version,
+            permission_pairs_of(Users.role_id).label("permission_pairs"),
+        )
+        .join(Role)
+        .filter(*criteria)
+        .filter(Users.is_active == true())
+        .filter(Users.not_deleted())
+        .first()
+    )
+
+
+def user_permissions(
+    db: Session, user: Any, generation: Optional[int] = None
+) -> Tuple[int, Dict[str, List[str]]]:
+    """Version y permisos del rol que se leyeron junto con el usuario.
+
+    La consulta del usuario trae perm_version y permission_pairs del rol en
+    la misma fila, solo si este worker ya conoce una version mayor se vuelve
+    a consultar la BD.
+
+    Args:
+        db (Session): Session de SQLAlchemy
+        user (Row): Fila con role_id, perm_version y permission_pairs
+        generation (Optional[int]): permission_cache.generation antes de
+         la consulta del usuario
+
+    Returns:
+        Tuple[int, Dict[str, List[str]]]: perm_version y {modulo: [acciones]}
+    """
+    version = permission_versions.observe(user.role_id, user.perm_version)
+    if version > user.perm_version:
+        return version, get_permission_map(db, user.role_id, version)
+    permissions = parse_permission_pairs(user.permission_pairs)
+    remember_permission_map(user.role_id, version, permissions, generation)
+    return version, permissions
+
+
 class AuthActions:
     """Esta clase tiene los metodos necesarios para hacer Auth."""
 
@@ -52,22 +155,9 @@ class AuthActions:
 
         """
         try:
-            user = (
-                db.query(
-                    Users.id,
-                    Users.email,
-                    Users.role_id,
-                    Users.is_active,
-                    Users.password,
-                    Users.is_deleted,
-                    Role.name.label("role_name"),
-                )
-                .join(Role)
-                .filter(Users.email == request.email)  # noqa
-                .filter(Users.is_active == true())
-                .filter(Users.is_deleted == false())
-                .first()
-            )
+            generation = permission_cache.generation
+            # Usuario, rol y permisos en un solo viaje a la BD
+            user = user_with_permissions(db, Users.email == request.email)
 
             if not user:
                 main.logger.info(
@@ -78,31 +168,6 @@ class AuthActions:
                     content={"success": False, "msg": "Invalid Credentials"},
                 )
 
-            result_permission = (
-                db.query(Module.name, Actions.action_name)
-                .order_by(Module.name)
-                .join(Role_Actions, isouter=False)
-                .join(Module, isouter=False)
-                .filter(Role_Actions.role_id == user.role_id.__str__())
-                .filter(Role_Actions.actions_id == Actions.id)
-                .filter(Actions.module_id == Module.id)
-                .filter(Actions.is_deleted == false())
-                .filter(Actions.is_active == true())
-                .filter(Module.is_deleted == false())
-                .filter(Role_Actions.is_deleted == false())
-                .all()
-            )
-
-            permissions: Dict[str, Any] = {}
-
-            for permission, action in result_permission:
-                # print(permission, action)
-                if permission not in permissions:
-                    permissions[permission] = []
-
-                if action not in permissions[permission]:
-                    permissions[permission].append(action)
-
             if not Hash().verify(user.password, request.password):
                 main.logger.info(
                     msg=f"Invalid Credentials {request.email}", extra=extra
@@ -112,7 +177,7 @@ class AuthActions:
                     content={"success": False, "msg": "Invalid Credentials"},
                 )
 
-            if user.is_deleted is True:
+            if user.soft_deleted:
                 main.logger.info(
                     msg=f"Invalid Credentials {request.email}", extra=extra
                 )
@@ -129,6 +194,8 @@ class AuthActions:
                     status_code=400,
                     content={"success": False, "msg": "Invalid Credentials"},
                 )
+            version, permissions = user_permissions(db, user, generation)
+
             expires = datetime.timedelta(hours=2)
             expires_fresh = datetime.timedelta(hours=4)
 
@@ -137,7 +204,7 @@ class AuthActions:
             another_claims = {
                 "role": user.role_id.__str__(),
                 "is_active": user.is_active,
-                "permissions": permissions,
+                **permission_claims(version, permissions),
             }
             access_token = Authorize.create_access_token(
                 subject=user.id.__str__(),
@@ -162,6 +229,8 @@ class AuthActions:
             }
             main.logger.info(msg=f"Success login {request.email}", extra=extra)
             return JSONResponse(res)
+        except HashingPoolSaturated:
+            raise
         except Exception as e:
             main.logger.info(msg=f"Failed login {request.email}", extra=extra)
             main.logger.error(msg=f"An exception occurred: {e}", extra=extra)
@@ -203,22 +272,8 @@ class AuthActions:
                     content={"success": True, "msg": "Could not refresh access token!"},
                 )
 
-            validate_current_user = (
-                db.query(
-                    Users.id,
-                    Users.email,
-                    Users.role_id,
-                    Users.is_active,
-                    Users.password,
-                    Users.is_deleted,
-                    Role.name.label("role_name"),
-                )
-                .join(Role)
-                .filter(Users.id == current_user)
-                .filter(Users.is_active == true())
-                .filter(Users.is_deleted == false())
-                .first()
-            )
+            generation = permission_cache.generation
+            validate_current_user = user_with_permissions(db, Users.id == current_user)
 
             if not validate_current_user or validate_current_user is None:
                 main.logger.info(
@@ -238,38 +293,18 @@ class AuthActions:
                 we can use the get_jwt_subject() function to get the subject of the refresh
                 token, and use the create_access_token() function again to make a new access token
             """
-            result_permission = (
-                db.query(Module.name, Actions.action_name)
-                .order_by(Module.name)
-                .join(Role_Actions, isouter=False)
-                .join(Module, isouter=False)
-                .filter(Role_Actions.role_id == validate_current_user.role_id.__str__())
-                .filter(Role_Actions.actions_id == Actions.id)
-                .filter(Actions.module_id == Module.id)
-                .filter(Actions.is_deleted == false())
-                .filter(Actions.is_active == true())
-                .filter(Module.is_deleted == false())
-                .filter(Role_Actions.is_deleted == false())
-                .all()
+            role_id = validate_current_user.role_id
+            version, permissions = user_permissions(
+                db, validate_current_user, generation
             )
 
-            permissions: Dict[str, Any] = {}
-
-            for permission, action in result_permission:
-                # print(permission, action)
-                if permission not in permissions:
-                    permissions[permission] = []
-
-                if action not in permissions[permission]:
-                    permissions[permission].append(action)
-
             expires = datetime.timedelta(hours=2)
             expires_fresh = datetime.timedelta(hours=4)
 
             another_claims = {
-                "role": validate_current_user.role_id.__str__(),
+                "role": role_id.__str__(),
                 "is_active": validate_current_user.is_active,
-                "permissions": permissions,
+                **permission_claims(version, permissions),
             }
             new_access_token = Authorize.create_access_token(
                 subject=validate_current_user.id.__str__(),
@@ -312,3 +347,55 @@ class AuthActions:
                 status_code=status.HTTP_421_MISDIRECTED_REQUEST,
                 detail={"status": False, "msg": error},
             )
+
+    def logout(self, db: Session, Authorize: AuthJWT) -> JSONResponse:
+        """Revoca el token que viene en el header.
+
+        Acepta el access token o el refresh token, para cerrar la sesion
+        por completo el cliente revoca ambos.
+
+        #? Endpoint /auth/logout POST
+
+        Args:
+            db (Session): Sesion de SQLAlchemy para poder realizar consultas la BD.
+            Authorize (AuthJWT): Dependecia y metodo de la clase FastAPI_users.
+
+        Raises:
+            MissingTokenError: No se envio el token
+
+        Returns:
+            JSONResponse: JSON con la propiedad success y msg.
+        """
+        try:
+            raw = Authorize.get_raw_jwt()
+            if not raw:
+                raise MissingTokenError(
+                    status_code=401, message=f"Missing {Authorize._header_name} Header"
+                )
+            token_revocations.revoke_token(db, raw)
+            main.logger.info(msg=f"Logout user {raw.get('sub')}", extra=extra)
+            return JSONResponse({"success": True, "msg": "Token revoked"})
+        except AuthJWTException:
+            raise
+        except Exception as e:
+            main.logger.error(msg=f"An exception occurred: {e}", extra=extra)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={"success": False, "msg": "Bad Request"},
+            )
+
+    def logout_all(self, db: Session, current_user: str) -> JSONResponse:
+        """Revoca todos los tokens del usuario en sesion.
+
+        #? Endpoint /auth/logout/all POST
+
+        Args:
+            db (Session): Sesion de SQLAlchemy para poder realizar consultas la BD.
+            current_user (str): ID del usuario en sesion
+
+        Returns:
+            JSONResponse: JSON con la propiedad success y msg.
+        """
+        token_revocations.revoke_user(db, current_user)
+        main.logger.info(msg=f"Logout from all sessions {current_user}", extra=extra)
+        return JSONResponse({"success": True, "msg": "All tokens revoked"})
@@ -0,0 +1,144 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+from decouple import config
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app import main
+from app.database.main import SessionLocal
+from app.models.cache_events import Cache_Events
+
+extra = {"event.category": "cache"}
+
+
+class CacheInvalidationChannel:
+    """Canal opcional para invalidar caches en memoria entre workers.
+
+    Quien modifica datos cacheados llama a publish() dentro de su
+    transaccion, con lo que se guarda una fila en cache_events al hacer
+    commit. Cada worker llama a poll() como maximo una vez por intervalo
+    y aplica las invalidaciones que hicieron los demas procesos.
+
+    Un evento cuyo commit llegue despues de uno con id mayor puede
+    perderse; en ese caso la entrada vive solo hasta su TTL.
+
+    Con interval en 0 el canal esta apagado y cada worker depende
+    unicamente del TTL de sus caches; solo sirve con un solo worker, las
+    versiones de permisos no tienen TTL.
+
+    Args:
+        interval (float): Segundos entre cada consulta a cache_events.
+        retention (float): Segundos que se conservan las filas.
+    """
+
+    def __init__(self, interval: float, retention: float) -> None:
+        self.interval = interval
+        self.retention = retention
+        self._caches: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._last_id = None
+        self._last_poll = 0.0
+        self._last_cleanup = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    def register(self, name: str, cache: Any) -> None:
+        """Registra un cache que tenga el metodo invalidate(key)."""
+        self._caches[name] = cache
+
+    def publish(self, db: Session, name: str, key: Any) -> None:
+        """Agrega el evento a la transaccion actual, no hace commit."""
+        if not self.enabled:
+            return
+        db.add(Cache_Events(cache=name, key=str(key)))
+
+    def due(self) -> bool:
+        """Indica si ya toca consultar la tabla de eventos."""
+        return self.enabled and time.monotonic() - self._last_poll >= self.interval
+
+    def poll(self, db: Session) -> int:
+        """Aplica las invalidaciones publicadas por otros workers.
+
+        Args:
+            db (Session): Session de SQLAlchemy
+
+        Returns:
+            int: Numero de eventos aplicados
+        """
+        if not self._lock.acquire(blocking=False):
+            # Otro hilo ya esta consultando
+            return 0
+        try:
+            self._last_poll = time.monotonic()
+            if self._last_id is None:
+                # Al arrancar el cache esta vacio, no hay nada que invalidar
+                self._last_id = db.query(func.max(Cache_Events.id)).scalar() or 0
+                return 0
+
+            events = (
+                db.query(Cache_Events.id, Cache_Events.cache, Cache_Events.key)
+                .filter(Cache_Events.id > self._last_id)
+                .order_by(Cache_Events.id)
+                .all()
+            )
+            for event in events:
+                cache = self._caches.get(event.cache)
+                if cache is not None:
+                    cache.invalidate(event.key)
+                self._last_id = event.id
+
+            if events:
+                main.logger.info(
+                    msg=f"{len(events)} cache invalidations applied", extra=extra
+                )
+            if self._last_poll - self._last_cleanup >= self.retention:
+                self._last_cleanup = self._last_poll
+                self.cleanup(db)
+            return len(events)
+        finally:
+            self._lock.release()
+
+    def cleanup(self, db: Session) -> int:
+        """Borra eventos mas viejos que retention y hace commit.
+
+        Returns:
+            int: Numero de filas eliminadas
+        """
+        limit = datetime.now() - timedelta(seconds=self.retention)
+        deleted = (
+            db.query(Cache_Events)
+            .filter(Cache_Events.created_on < limit)
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return deleted
+
+
+cache_channel = CacheInvalidationChannel(
+    interval=config("CACHE_SYNC_INTERVAL", default=1, cast=float),
+    retention=config("CACHE_SYNC_RETENTION", default=3600, cast=float),
+)
+
+
+def sync_caches() -> int:
+    """Llama a cache_channel.poll() con su propia session si ya toca.
+
+    Se llama desde get_token_claims y desde el denylist de AuthJWT, que
+    corren en todas las rutas con token, antes de revisar revocaciones y
+    versiones de permisos.
+
+    Returns:
+        int: Numero de eventos aplicados
+    """
+    if not cache_channel.due():
+        return 0
+    db = SessionLocal()
+    try:
+        return cache_channel.poll(db)
+    finally:
+        db.close()
@@ -0,0 +1,150 @@
+from typing import Any, Dict
+
+from app import main
+from app.database.main import DATABASE_ASYNC, async_engine_metrics, engine_metrics
+from app.dependencies.token_claims import verified_tokens
+from app.extras.hashing import hashing_pool
+from app.extras.pagination import count_cache
+from app.extras.prometheus import Exposition, add_route_metrics
+from app.internal.permission_map import permission_cache
+from app.internal.token_revocation import token_revocations
+from app.internal.user_validity import user_validity_cache
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Estado de los pools (conexiones a la BD y bcrypt), caches y cola de logs.
+
+    #? ENDPOINT /metrics/pool GET
+
+    Returns:
+        Dict[str, Any]: Metricas de este proceso, cada worker tiene las suyas.
+    """
+    stats: Dict[str, Any] = {
+        "database": engine_metrics.stats(),
+        "hashing": hashing_pool.stats(),
+        "caches": {
+            "permissions": permission_cache.stats(),
+            "users": user_validity_cache.stats(),
+            "counts": count_cache.stats(),
+            "tokens": verified_tokens.stats(),
+        },
+        "revocations": token_revocations.stats(),
+    }
+    if DATABASE_ASYNC:
+        stats["database_async"] = async_engine_metrics.stats()
+    stats["logging"] = {
+        "queued": main.log_queue.qsize(),
+        "max_queue": main.log_queue.maxsize,
+        "dropped": main.qh.dropped,
+    }
+    return stats
+
+
+def prometheus_text() -> str:
+    """Metricas HTTP, de los pools y de los caches en formato de Prometheus.
+
+    #? ENDPOINT /metrics GET
+
+    Returns:
+        str: Texto para el scraper de Prometheus
+    """
+    exposition = Exposition()
+    add_route_metrics(exposition)
+
+    databases = [("sync", engine_metrics)]
+    if DATABASE_ASYNC:
+        databases.append(("async", async_engine_metrics))
+    for engine_name, metrics in databases:
+        exposition.histogram(
+            "db_pool_checkout_seconds",
+            "Espera para obtener una conexion del pool.",
+            metrics.checkout_latency,
+            {"engine": engine_name},
+        )
+    for engine_name, metrics in databases:
+        stats = metrics.stats()
+        for field in ("size", "in_use", "idle", "overflow"):
+            if field in stats:
+                exposition.sample(
+                    f"db_pool_{field}",
+                    "gauge",
+                    f"Conexiones del pool ({field}).",
+                    stats[field],
+                    {"engine": engine_name},
+                )
+    for engine_name, metrics in databases:
+        exposition.sample(
+            "db_pool_timeouts_total",
+            "counter",
+            "Checkouts que excedieron DB_POOL_TIMEOUT.",
+            metrics.timeouts,
+            {"engine": engine_name},
+        )
+
+    hashing = hashing_pool.stats()
+    for field in ("in_flight", "queued"):
+        exposition.sample(
+            f"hashing_pool_{field}",
+            "gauge",
+            f"Tareas de bcrypt ({field}).",
+            hashing[field],
+        )
+    exposition.sample(
+        "hashing_pool_rejected_total",
+        "counter",
+        "Tareas de bcrypt rechazadas con 503.",
+        hashing["rejected"],
+    )
+
+    exposition.sample(
+        "log_queue_size",
+        "gauge",
+        "Registros de log en espera de escribirse.",
+        main.log_queue.qsize(),
+    )
+    exposition.sample(
+        "log_dropped_total",
+        "counter",
+        "Registros de log descartados por cola llena.",
+        main.qh.dropped,
+    )
+
+    revocations = token_revocations.stats()
+    exposition.sample(
+        "token_revocation_bloom_size",
+        "gauge",
+        "Tokens revocados en el filtro de Bloom.",
+        revocations["tokens"],
+    )
+    for field in ("lookups", "false_positives"):
+        exposition.sample(
+            f"token_revocation_{field}_total",
+            "counter",
+            f"Consultas a revoked_tokens por positivos del filtro ({field}).",
+            revocations[field],
+        )
+
+    caches = {
+        "permissions": permission_cache.stats(),
+        "users": user_validity_cache.stats(),
+        "counts": count_cache.stats(),
+        "tokens": verified_tokens.stats(),
+    }
+    for field in ("hits", "misses", "evictions"):
+        for cache_name, stats in caches.items():
+            exposition.sample(
+                f"cache_{field}_total",
+                "counter",
+                f"Cache {field}.",
+                stats[field],
+                {"cache": cache_name},
+            )
+    for cache_name, stats in caches.items():
+        exposition.sample(
+            "cache_hit_ratio",
+            "gauge",
+            "Hits entre consultas al cache desde que arranco el worker.",
+            stats["hit_rate"],
+            {"cache": cache_name},
+        )
+    return exposition.render()
@@ -2,15 +2,18 @@ from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy.sql.expression import false
 from sqlalchemy.orm import Session
 from fastapi import status
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
 
 from app import main
+from app.extras.pagination import count_rows, paginate
+from app.extras.responses import list_response
 from app.models.module import Module
 from app.models.actions import Actions
+from app.internal.permission_map import invalidate_roles, roles_with_module
+from app.internal.permission_version import bump_permission_version
 from app.schemas import module_schemas
 
 extra = {"event.category": "app_log"}
@@ -62,18 +65,22 @@ class ModuleActions:
         """
         new_module = db.query(Module).filter(Module.name == request.name).first()
 
-        if new_module is not None and new_module.is_deleted is True:
+        if new_module is not None and new_module.soft_deleted:
             #  If the module is deleted. We can restore it and set the is_deleted to false
+            affected_roles = roles_with_module(db, new_module.id)
             new_module.description = request.description
             new_module.is_deleted = False
+            new_module.deleted_at = None
             new_module.created_by = current_user
+            bump_permission_version(db, affected_roles)
             db.commit()
+            invalidate_roles(affected_roles)
             main.logger.info(msg="Module created successfully!", extra=extra)
             return JSONResponse(
                 status_code=status.HTTP_201_CREATED,
                 content={"success": True, "msg": "Module created succesfully!"},
             )
-        elif new_module is not None and new_module.is_deleted is False:
+        elif new_module is not None:
             #  If the module is not deleted, we can not create it.
             main.logger.info(msg="Module already exist!", extra=extra)
             return JSONResponse(
@@ -101,6 +108,8 @@ class ModuleActions:
         db: Session,
         start: Optional[int] = None,
         limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        approximate: bool = False,
     ) -> JSONResponse:
         """Este metodo cuenta todos los registros y paginar el listado de la informacion.
 
@@ -112,25 +121,31 @@ class ModuleActions:
             indicar el inicio de nuestro paginador. Defaults to None.
             limit (int, optional): Este argumento sirve para
             indicar el limite de nuestro paginador. Defaults to None.
+            cursor (str, optional): Cursor de la respuesta anterior para
+            paginar por (created_on, id) en lugar de offset. Defaults to None.
+            approximate (bool, optional): Usar el estimado de la tabla para
+            numRows en lugar de COUNT. Defaults to False.
 
         Returns:
             JSONResponse:  Nos devuelve una respuesta en JSON con la propiedad success
                 en caso de tener exito nos mostarara la propiedad numRows con la cantidad de todos
                 los registros y data con la informacion solicitada.
         """
-        show_modules = (
-            db.query(Module)
-            .filter_by(is_deleted=False)
-            .offset(start)
-            .limit(limit)
-            .all()
-        )
-
-        total = len(show_modules)
-
-        res = {"success": True, "numRows": total, "data": show_modules}
+        query = db.query(Module).filter(Module.not_deleted())
+        page = paginate(query, Module.created_on, Module.id, start, limit, cursor)
+        show_modules = page.rows
+
+        total = count_rows(query, Module.id, approximate)
+
+        res = {
+            "success": True,
+            "numRows": total,
+            "data": show_modules,
+            "next_cursor": page.next_cursor,
+            "prev_cursor": page.prev_cursor,
+        }
         main.logger.info(msg="List of Modules is display!", extra=extra)
-        return jsonable_encoder(res)
+        return list_response(res, module_schemas.ShowModuleInfo)
 
     def get_one_module(self, db: Session, id: UUID) -> JSONResponse:
         """Este metodo lo que hace es realizar la busqueda de un registro por su id.
@@ -148,7 +163,10 @@ class ModuleActions:
              del usuario buscado.
         """
         module = (
-            db.query(Module).filter(Module.id == id).filter_by(is_deleted=False).first()
+            db.query(Module)
+            .filter(Module.id == id)
+            .filter(Module.not_deleted())
+            .first()
         )
 
         if not module:
@@ -196,7 +214,7 @@ class ModuleActions:
         module = (
             db.query(Module)
             .filter(Module.id == id)
-            .filter(Module.is_deleted == false())
+            .filter(Module.not_deleted())
             .first()
         )
         # estamos buscando primero por id
@@ -225,8 +243,12 @@ class ModuleActions:
         module.name = request.name
         module.updated_by = current_user
         module.updated_on = datetime.now()
+        # El nombre del modulo es la llave en el mapa de permisos
+        affected_roles = roles_with_module(db, id)
         db.add(module)
+        bump_permission_version(db, affected_roles)
         db.commit()
+        invalidate_roles(affected_roles)
         main.logger.info(msg="Module Updated successfully!", extra=extra)
         return JSONResponse(
             status_code=202, content={"success": True, "msg": "Updated successfully"}
@@ -252,7 +274,7 @@ class ModuleActions:
         check_child = (
             db.query(Actions)
             .filter(Actions.module_id == id)
-            .filter(Actions.is_deleted == false())
+            .filter(Actions.not_deleted())
             .count()
         )
 
@@ -269,7 +291,7 @@ class ModuleActions:
             )
 
         is_d = True
-        module = db.query(Module).filter(Module.id == id).filter_by(is_deleted=False)
+        module = db.query(Module).filter(Module.id == id).filter(Module.not_deleted())
         if is_d is False:
             main.logger.info(
                 msg="value is true but something was changed to false!", extra=extra
@@ -285,8 +307,11 @@ class ModuleActions:
                 status_code=status.HTTP_404_NOT_FOUND,
                 content={"success": False, "msg": "Not Found"},
             )
-        module.update({Module.is_deleted: is_d})
+        affected_roles = roles_with_module(db, id)
+        module.update(Module.deleted_values())
+        bump_permission_version(db, affected_roles)
         db.commit()
+        invalidate_roles(affected_roles)
         main.logger.info(msg=f"Module {id} it's deleted!", extra=extra)
         return None
 
@@ -330,8 +355,8 @@ class ModuleActions:
             )
             .join(Module, isouter=True)
             .filter(Module.id == id)
-            .filter(Actions.is_deleted == false())
-            .filter(Module.is_deleted == false())
+            .filter(Actions.not_deleted())
+            .filter(Module.not_deleted())
             .offset(start)
             .limit(limit)
             .all()
@@ -341,4 +366,4 @@ class ModuleActions:
 
         res = {"success": True, "numRows": total, "data": show_module_with_actions}
         main.logger.info(msg="List of Actions from module is display!", extra=extra)
-        return jsonable_encoder(res)
+        return list_response(res, module_schemas.ShowModuleWithAction)
@@ -0,0 +1,231 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+import orjson
+from decouple import config
+from sqlalchemy import select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import ColumnElement, FunctionElement, true
+from sqlalchemy.types import Text
+
+from app import main
+from app.extras.cache import TTLCache
+from app.models.actions import Actions
+from app.models.module import Module
+from app.models.role_actions import Role_Actions
+
+extra = {"event.category": "auth"}
+
+# Los permisos cambian muy poco, se guardan por rol para no repetir el join
+# en cada login o refresh. Cada worker tiene su cache, el TTL acota cuanto
+# tiempo puede ver datos viejos un worker que no recibio la invalidacion.
+# Cada entrada es (perm_version, {modulo: [acciones]}), una version mayor
+# a la guardada obliga a recargar aunque no haya llegado la invalidacion.
+permission_cache = TTLCache(
+    maxsize=config("PERMISSIONS_CACHE_SIZE", default=1024, cast=int),
+    ttl=config("PERMISSIONS_CACHE_TTL", default=300, cast=float),
+)
+
+
+class permission_pairs(FunctionElement):
+    """Agrega (modulo, accion) en un arreglo JSON [[modulo, accion], ...].
+
+    Asi una sola fila trae todos los permisos de un rol. Cada BD tiene su
+    propia funcion de agregacion, ver los @compiles de abajo.
+    """
+
+    type = Text()
+    name = "permission_pairs"
+    inherit_cache = True
+
+
+@compiles(permission_pairs)
+def _permission_pairs_sqlite(element: Any, compiler: Any, **kw: Any) -> str:
+    return "json_group_array(json_array(%s))" % compiler.process(element.clauses, **kw)
+
+
+@compiles(permission_pairs, "mysql")
+@compiles(permission_pairs, "mariadb")
+def _permission_pairs_mysql(element: Any, compiler: Any, **kw: Any) -> str:
+    return "JSON_ARRAYAGG(JSON_ARRAY(%s))" % compiler.process(element.clauses, **kw)
+
+
+def group_permissions(pairs: Iterable[Tuple[str, str]]) -> Dict[str, List[str]]:
+    """Agrupa pares (modulo, accion) en {modulo: [acciones]}.
+
+    Los modulos quedan ordenados por nombre y las acciones sin repetir.
+    """
+    permissions: Dict[str, Dict[str, None]] = {}
+    for module, action in pairs:
+        permissions.setdefault(module, {})[action] = None
+    return {module: list(permissions[module]) for module in sorted(permissions)}
+
+
+def permission_pairs_of(role_id: ColumnElement) -> Any:
+    """Subconsulta escalar con los permisos del rol en JSON.
+
+    Se agrega como una columna mas a la consulta del usuario y se
+    correlaciona con ella, por ejemplo permission_pairs_of(Users.role_id),
+    asi el usuario y sus permisos llegan en un solo viaje a la BD.
+
+    Args:
+        role_id (ColumnElement): Columna con el ID del rol
+
+    Returns:
+        ScalarSelect: Texto JSON o None si el rol no tiene permisos
+    """
+    return (
+        select(permission_pairs(Module.name, Actions.action_name))
+        .select_from(Role_Actions)
+        .join(Actions, Role_Actions.actions_id == Actions.id)
+        .join(Module, Actions.module_id == Module.id)
+        .where(Role_Actions.role_id == role_id)
+        .where(Role_Actions.not_deleted())
+        .where(Actions.not_deleted())
+        .where(Actions.is_active == true())
+        .where(Module.not_deleted())
+        .scalar_subquery()
+    )
+
+
+def parse_permission_pairs(pairs: Optional[str]) -> Dict[str, List[str]]:
+    """Convierte el JSON de permission_pairs_of en {modulo: [acciones]}."""
+    return group_permissions(orjson.loads(pairs) if pairs else ())
+
+
+def _query_permission_map(db: Session, role_id: str) -> Dict[str, List[str]]:
+    """Ejecuta el join de Module, Actions y Role_Actions para un rol.
+
+    Args:
+        db (Session): Session de SQLAlchemy
+        role_id (str): ID del rol
+
+    Returns:
+        Dict[str, List[str]]: {modulo: [acciones]}
+    """
+    result_permission = (
+        db.query(Module.name, Actions.action_name)
+        .order_by(Module.name)
+        .join(Role_Actions, isouter=False)
+        .join(Module, isouter=False)
+        .filter(Role_Actions.role_id == role_id)
+        .filter(Role_Actions.actions_id == Actions.id)
+        .filter(Actions.module_id == Module.id)
+        .filter(Actions.not_deleted())
+        .filter(Actions.is_active == true())
+        .filter(Module.not_deleted())
+        .filter(Role_Actions.not_deleted())
+        .all()
+    )
+    return group_permissions(result_permission)
+
+
+def cached_permission_map(
+    role_id: Any, version: Optional[int] = None
+) -> Optional[Dict[str, List[str]]]:
+    """Mapa de permisos en memoria, sin consultar la BD.
+
+    Args:
+        role_id (UUID | str): ID del rol
+        version (Optional[int]): perm_version que se espera, None acepta
+         cualquiera.
+
+    Returns:
+        Optional[Dict[str, List[str]]]: {modulo: [acciones]} de solo lectura,
+         None si no esta en el cache o es de otra version.
+    """
+    cached = permission_cache.get(str(role_id))
+    if cached is None or (version is not None and cached[0] != version):
+        return None
+    return cached[1]
+
+
+def get_permission_map(
+    db: Session, role_id: Any, version: int = 0
+) -> Dict[str, List[str]]:
+    """Obtiene el mapa de permisos de un rol, usando el cache si es posible.
+
+    Args:
+        db (Session): Session de SQLAlchemy
+        role_id (UUID | str): ID del rol
+        version (int, optional): perm_version que leyo el llamador, si el
+         cache tiene una menor se recarga. Defaults to 0.
+
+    Returns:
+        Dict[str, List[str]]: {modulo: [acciones]}, es una copia que
+         se puede modificar sin afectar el cache.
+    """
+    key = str(role_id)
+    cached = permission_cache.get(key)
+    if cached is not None and cached[0] >= version:
+        permissions = cached[1]
+    else:
+        generation = permission_cache.generation
+        permissions = _query_permission_map(db, key)
+        permission_cache.set(key, (version, permissions), generation=generation)
+    return {module: list(actions) for module, actions in permissions.items()}
+
+
+def remember_permission_map(
+    role_id: Any,
+    version: int,
+    permissions: Dict[str, List[str]],
+    generation: Optional[int] = None,
+) -> None:
+    """Guarda en el cache un mapa que se leyo junto con el usuario.
+
+    Args:
+        role_id (UUID | str): ID del rol
+        version (int): perm_version que se leyo en la misma consulta
+        permissions (Dict[str, List[str]]): {modulo: [acciones]}
+        generation (Optional[int]): permission_cache.generation antes de la
+         consulta, si hubo invalidaciones desde entonces no se guarda.
+    """
+    key = str(role_id)
+    cached = permission_cache.get(key)
+    if cached is not None and cached[0] >= version:
+        return
+    permission_cache.set(
+        key,
+        (version, {module: list(actions) for module, actions in permissions.items()}),
+        generation=generation,
+    )
+
+
+def invalidate_roles(role_ids: Iterable[Any]) -> None:
+    """Invalida el mapa de permisos de los roles indicados.
+
+    Args:
+        role_ids (Iterable[UUID | str]): IDs de los roles afectados
+    """
+    for role_id in {str(role_id) for role_id in role_ids}:
+        permission_cache.invalidate(role_id)
+        main.logger.info(
+            msg=f"Permissions cache of role {role_id} invalidated", extra=extra
+        )
+
+
+def roles_with_action(db: Session, action_id: UUID) -> List[Any]:
+    """IDs de los roles que tienen asignada una accion."""
+    rows = (
+        db.query(Role_Actions.role_id)
+        .filter(Role_Actions.actions_id == action_id)
+        .filter(Role_Actions.not_deleted())
+        .distinct()
+        .all()
+    )
+    return [row.role_id for row in rows]
+
+
+def roles_with_module(db: Session, module_id: UUID) -> List[Any]:
+    """IDs de los roles que tienen asignada alguna accion del modulo."""
+    rows = (
+        db.query(Role_Actions.role_id)
+        .join(Actions, Role_Actions.actions_id == Actions.id)
+        .filter(Actions.module_id == module_id)
+        .filter(Role_Actions.not_deleted())
+        .distinct()
+        .all()
+    )
+    return [row.role_id for row in rows]
@@ -0,0 +1,121 @@
+import threading
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+from decouple import config
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import main
+from app.internal.cache_events import cache_channel
+from app.models.roles import Role
+
+extra = {"event.category": "auth"}
+
+CACHE_NAME = "permission_versions"
+
+# Si es True los tokens llevan perm_ver y RoleChecker rechaza los que tengan
+# una version menor a la del rol
+PERMISSION_VERSION_CLAIM = config("PERMISSION_VERSION_CLAIM", default=True, cast=bool)
+
+# Llave de session.info con las versiones que se aplican al hacer commit
+_PENDING = "permission_versions"
+
+
+class PermissionVersions:
+    """Version de los permisos de cada rol, en memoria.
+
+    La BD guarda la version en roles.perm_version y cada cambio de permisos
+    la incrementa en la misma transaccion. Este worker solo aprende versiones
+    ya confirmadas: las suyas al hacer commit, las de otros workers por
+    cache_channel y las que lee en login o refresh. Las versiones solo
+    suben, asi un valor viejo nunca reemplaza a uno nuevo.
+    """
+
+    def __init__(self) -> None:
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+    def get(self, role_id: Any) -> int:
+        """Version conocida del rol, 0 si nunca ha cambiado."""
+        return self._versions.get(str(role_id), 0)
+
+    def update(self, versions: Mapping[Any, int]) -> None:
+        """Guarda las versiones que sean mayores a las conocidas."""
+        with self._lock:
+            for role_id, version in versions.items():
+                key = str(role_id)
+                if version > self._versions.get(key, 0):
+                    self._versions[key] = version
+
+    def observe(self, role_id: Any, version: int) -> int:
+        """Registra la version leida de la BD y regresa la mayor conocida."""
+        self.update({role_id: version})
+        return self.get(role_id)
+
+    def is_stale(self, role_id: Any, version: Optional[int]) -> bool:
+        """Indica si un token con esa version ya no tiene los permisos vigentes.
+
+        Los tokens sin perm_ver se generaron antes de esta validacion y
+        se siguen aceptando hasta que expiren.
+        """
+        if version is None:
+            return False
+        return version < self._versions.get(str(role_id), 0)
+
+    def invalidate(self, key: str) -> None:
+        """Aplica un evento rol:version publicado por otro worker."""
+        role_id, _, version = key.rpartition(":")
+        self.update({role_id: int(version)})
+
+    def load(self, db: Session) -> None:
+        """Carga la version de todos los roles, se llama al arrancar."""
+        self.update(
+            {row.id: row.perm_version for row in db.query(Role.id, Role.perm_version)}
+        )
+        main.logger.info(
+            msg=f"Permission versions loaded for {len(self)} roles", extra=extra
+        )
+
+
+permission_versions = PermissionVersions()
+cache_channel.register(CACHE_NAME, permission_versions)
+
+
+def bump_permission_version(db: Session, role_ids: Iterable[Any]) -> None:
+    """Incrementa la version de permisos de los roles, no hace commit.
+
+    Se llama en la transaccion que cambia los permisos. Las versiones nuevas
+    se publican a los demas workers y se aplican en este al hacer commit.
+
+    Args:
+        db (Session): Session de SQLAlchemy
+        role_ids (Iterable[UUID | str]): IDs de los roles afectados
+    """
+    ids = list({str(role_id) for role_id in role_ids})
+    if not ids:
+        return
+    db.query(Role).filter(Role.id.in_(ids)).update(
+        {Role.perm_version: Role.perm_version + 1}, synchronize_session=False
+    )
+    rows = db.query(Role.id, Role.perm_version).filter(Role.id.in_(ids)).all()
+    pending = db.info.setdefault(_PENDING, {})
+    for row in rows:
+        pending[str(row.id)] = row.perm_version
+        cache_channel.publish(db, CACHE_NAME, f"{row.id}:{row.perm_version}")
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_versions(session: Session) -> None:
+    """Aplica en este worker las versiones que se acaban de confirmar."""
+    pending = session.info.pop(_PENDING, None)
+    if pending:
+        permission_versions.update(pending)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_versions(session: Session, previous_transaction: Any) -> None:
+    """Descarta las versiones de una transaccion que no se confirmo."""
+    session.info.pop(_PENDING, None)
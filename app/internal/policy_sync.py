@@ -0,0 +1,310 @@
+from typing import Any, Dict, List, Set, Tuple
+from uuid import uuid4
+
+import yaml
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app import main
+from app.internal.permission_map import invalidate_roles
+from app.internal.permission_version import bump_permission_version
+from app.models.actions import Actions
+from app.models.module import Module
+from app.models.role_actions import Role_Actions
+from app.models.roles import Role
+from app.schemas.policy_schemas import Policy
+
+extra = {"event.category": "app_log"}
+
+KINDS = ("modules", "actions", "roles", "grants")
+
+
+def load_policy(path: str) -> Policy:
+    """Lee la politica de un archivo YAML o JSON.
+
+    JSON es un subconjunto de YAML, asi que ambos se leen con safe_load.
+
+    Args:
+        path (str): Ruta del archivo
+
+    Returns:
+        Policy: Politica validada
+    """
+    with open(path, encoding="utf-8") as policy_file:
+        return Policy.parse_obj(yaml.safe_load(policy_file) or {})
+
+
+class SyncPlan:
+    """Diferencia entre la politica y la BD.
+
+    Guarda las filas a insertar, restaurar, actualizar y revocar por modelo
+    para aplicarlas con una sentencia por grupo, y una descripcion legible
+    de cada cambio para el modo dry-run.
+    """
+
+    def __init__(self) -> None:
+        self.changes: Dict[str, List[str]] = {kind: [] for kind in KINDS}
+        self.inserts: Dict[Any, List[dict]] = {}
+        self.restores: Dict[Any, List[Any]] = {}
+        self.updates: Dict[Any, List[dict]] = {}
+        self.revokes: List[Any] = []
+        self.roles_changed: Set[Any] = set()
+
+    def insert(self, kind: str, model: Any, values: dict, label: str) -> None:
+        self.inserts.setdefault(model, []).append(values)
+        self.changes[kind].append(f"+ {label}")
+
+    def restore(self, kind: str, model: Any, id: Any, label: str) -> None:
+        self.restores.setdefault(model, []).append(id)
+        self.changes[kind].append(f"~ {label} (restore)")
+
+    def update(self, kind: str, model: Any, values: dict, label: str) -> None:
+        self.updates.setdefault(model, []).append(values)
+        self.changes[kind].append(f"~ {label} (description)")
+
+    def revoke(self, id: Any, label: str) -> None:
+        self.revokes.append(id)
+        self.changes["grants"].append(f"- {label}")
+
+    @property
+    def total(self) -> int:
+        """Numero de cambios."""
+        return sum(len(changes) for changes in self.changes.values())
+
+    def lines(self) -> List[str]:
+        """Cambios agrupados por tipo, para imprimirlos."""
+        lines = []
+        for kind, changes in self.changes.items():
+            lines.append(f"{kind}: {len(changes)} changes")
+            lines.extend(f"  {change}" for change in changes)
+        return lines
+
+
+def _sync_named(
+    plan: SyncPlan,
+    kind: str,
+    model: Any,
+    wanted: Dict[str, Any],
+    existing: Dict[str, Any],
+    default_description: str,
+) -> Dict[str, Any]:
+    """Planea modulos o roles, que se identifican por nombre.
+
+    Returns:
+        Dict[str, Any]: ID de cada nombre, los nuevos con un UUID generado
+    """
+    ids = {}
+    for name, item in wanted.items():
+        description = item.description or default_description.format(name=name)
+        row = existing.get(name)
+        if row is None:
+            ids[name] = uuid4()
+            plan.insert(
+                kind,
+                model,
+                {"id": ids[name], "name": name, "description": description},
+                name,
+            )
+            continue
+        ids[name] = row.id
+        if row.soft_deleted:
+            plan.restore(kind, model, row.id, name)
+        if item.description is not None and item.description != row.description:
+            plan.update(kind, model, {"id": row.id, "description": description}, name)
+    return ids
+
+
+def plan_policy(db: Session, policy: Policy) -> SyncPlan:
+    """Calcula los cambios para que la BD tenga la politica.
+
+    Se leen los modulos, acciones, roles y permisos involucrados con una
+    consulta por tabla. Lo que no esta en la politica no se toca, excepto
+    los permisos de los roles declarados: sus grants son el conjunto
+    completo y los demas se revocan.
+
+    Args:
+        db (Session): Session de SQLAlchemy
+        policy (Policy): Politica validada
+
+    Returns:
+        SyncPlan: Cambios a aplicar
+    """
+    plan = SyncPlan()
+
+    modules = {
+        row.name: row
+        for row in db.query(
+            Module.id,
+            Module.name,
+            Module.description,
+            Module.soft_deleted.label("soft_deleted"),
+        ).filter(Module.name.in_(policy.modules))
+    }
+    module_ids = _sync_named(
+        plan, "modules", Module, policy.modules, modules, "module for {name}"
+    )
+
+    existing_actions: Dict[Tuple[Any, str], Any] = {}
+    if modules:
+        existing_actions = {
+            (row.module_id, row.action_name): row
+            for row in db.query(
+                Actions.id,
+                Actions.module_id,
+                Actions.action_name,
+                Actions.soft_deleted.label("soft_deleted"),
+            ).filter(Actions.module_id.in_([row.id for row in modules.values()]))
+        }
+    action_ids: Dict[Tuple[str, str], Any] = {}
+    for module_name, module in policy.modules.items():
+        module_id = module_ids[module_name]
+        for action_name in module.actions:
+            label = f"{module_name}.{action_name}"
+            row = existing_actions.get((module_id, action_name))
+            if row is None:
+                action_ids[(module_name, action_name)] = uuid4()
+                plan.insert(
+                    "actions",
+                    Actions,
+                    {
+                        "id": action_ids[(module_name, action_name)],
+                        "module_id": module_id,
+                        "action_name": action_name,
+                        "is_active": True,
+                        "description": f"you can {action_name} in {module_name}",
+                    },
+                    label,
+                )
+                continue
+            action_ids[(module_name, action_name)] = row.id
+            if row.soft_deleted:
+                plan.restore("actions", Actions, row.id, label)
+
+    roles = {
+        row.name: row
+        for row in db.query(
+            Role.id,
+            Role.name,
+            Role.description,
+            Role.soft_deleted.label("soft_deleted"),
+        ).filter(Role.name.in_(policy.roles))
+    }
+    role_ids = _sync_named(plan, "roles", Role, policy.roles, roles, "role {name}")
+
+    current: Dict[Any, Dict[Any, Any]] = {}
+    if roles:
+        for row in db.query(
+            Role_Actions.id,
+            Role_Actions.role_id,
+            Role_Actions.actions_id,
+            Role_Actions.soft_deleted.label("soft_deleted"),
+        ).filter(Role_Actions.role_id.in_([row.id for row in roles.values()])):
+            assigned = current.setdefault(row.role_id, {})
+            # Con duplicados del mismo permiso gana la fila viva
+            previous = assigned.get(row.actions_id)
+            if previous is None or previous.soft_deleted:
+                assigned[row.actions_id] = row
+    names = {action_id: f"{m}.{a}" for (m, a), action_id in action_ids.items()}
+
+    for role_name in policy.roles:
+        role_id = role_ids[role_name]
+        assigned = current.get(role_id, {})
+        wanted = {action_ids[pair] for pair in policy.grant_pairs(role_name)}
+        for action_id in wanted:
+            label = f"{role_name}: {names[action_id]}"
+            row = assigned.get(action_id)
+            if row is None:
+                plan.insert(
+                    "grants",
+                    Role_Actions,
+                    {
+                        "id": uuid4(),
+                        "role_id": role_id,
+                        "actions_id": action_id,
+                        "description": f"role has {names[action_id]} permission",
+                    },
+                    label,
+                )
+                plan.roles_changed.add(role_id)
+            elif row.soft_deleted:
+                plan.restore("grants", Role_Actions, row.id, label)
+                plan.roles_changed.add(role_id)
+        for action_id, row in assigned.items():
+            if action_id not in wanted and not row.soft_deleted:
+                plan.revoke(row.id, f"{role_name}: {names.get(action_id, action_id)}")
+                plan.roles_changed.add(role_id)
+
+    # Restaurar un modulo o una accion devuelve el efecto de los permisos que
+    # seguian asignados, tambien en roles que no estan en la politica
+    restored_modules = plan.restores.get(Module, [])
+    restored_actions = plan.restores.get(Actions, [])
+    if restored_modules or restored_actions:
+        plan.roles_changed.update(
+            row.role_id
+            for row in db.query(Role_Actions.role_id)
+            .join(Actions, Role_Actions.actions_id == Actions.id)
+            .filter(
+                or_(
+                    Actions.id.in_(restored_actions),
+                    Actions.module_id.in_(restored_modules),
+                )
+            )
+            .filter(Role_Actions.not_deleted())
+            .distinct()
+        )
+
+    for changes in plan.changes.values():
+        changes.sort()
+    return plan
+
+
+def apply_plan(db: Session, plan: SyncPlan) -> None:
+    """Aplica el plan con una sentencia por modelo y tipo de cambio.
+
+    No hace commit, el llamador decide cuando termina la transaccion.
+    """
+    # Orden de las llaves foraneas: modulos, acciones, roles y permisos
+    for model in (Module, Actions, Role, Role_Actions):
+        if plan.inserts.get(model):
+            db.bulk_insert_mappings(model, plan.inserts[model])
+        if plan.restores.get(model):
+            values = model.restored_values()
+            if model is Actions:
+                # Igual que las acciones nuevas, delete_action las desactiva
+                values["is_active"] = True
+            db.query(model).filter(model.id.in_(plan.restores[model])).update(
+                values, synchronize_session=False
+            )
+        if plan.updates.get(model):
+            db.bulk_update_mappings(model, plan.updates[model])
+    if plan.revokes:
+        db.query(Role_Actions).filter(Role_Actions.id.in_(plan.revokes)).update(
+            Role_Actions.deleted_values(), synchronize_session=False
+        )
+    bump_permission_version(db, plan.roles_changed)
+
+
+def sync_policy(db: Session, policy: Policy, dry_run: bool = False) -> SyncPlan:
+    """Reconcilia la BD con la politica en una sola transaccion.
+
+    Args:
+        db (Session): Session de SQLAlchemy
+        policy (Policy): Politica validada
+        dry_run (bool, optional): Solo calcula los cambios. Defaults to False.
+
+    Returns:
+        SyncPlan: Cambios calculados, aplicados si dry_run es False
+    """
+    plan = plan_policy(db, policy)
+    if dry_run or not plan.total:
+        db.rollback()
+        return plan
+    try:
+        apply_plan(db, plan)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    invalidate_roles(plan.roles_changed)
+    main.logger.info(msg=f"Policy synced with {plan.total} changes!", extra=extra)
+    return plan
@@ -1,16 +1,22 @@
 from datetime import datetime
 from typing import Optional
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from sqlalchemy.sql.expression import false, true
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
 from fastapi import status
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 from app import main
+from app.extras.pagination import count_rows, paginate
+from app.extras.responses import list_response
 from app.models.role_actions import Role_Actions
 from app.models.actions import Actions
 from app.models.roles import Role
+from app.internal.archive import restore_archived
+from app.internal.permission_map import invalidate_roles
+from app.internal.permission_version import bump_permission_version
 from app.schemas import role_actions_schemas
 
 extra = {"event.category": "app_log"}
@@ -42,6 +48,8 @@ class RoleActions:
         db: Session,
         start: Optional[int] = None,
         limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        approximate: bool = False,
     ) -> JSONResponse:
         """Este metodo cuenta todos los registros y paginar el listado de la informacion.
 
@@ -53,6 +61,10 @@ class RoleActions:
             indicar el inicio de nuestro paginador. Defaults to None.
             limit (int, optional): Este argumento sirve para
             indicar el limite de nuestro paginador. Defaults to None.
+            cursor (str, optional): Cursor de la respuesta anterior para
+            paginar por (created_on, id) en lugar de offset. Defaults to None.
+            approximate (bool, optional): Usar el estimado de la tabla para
+            numRows en lugar de COUNT. Defaults to False.
 
         Returns:
             JSONResponse:Nos devuelve una respuesta en JSON con la propiedad success
@@ -60,9 +72,10 @@ class RoleActions:
             los registros y data con la informacion solicitada.
 
         """
-        actions = (
+        query = (
             db.query(
                 Role_Actions.id,
+                Role_Actions.created_on,
                 Role_Actions.actions_id,
                 Actions.action_name.label("action_name"),
                 Role_Actions.role_id,
@@ -70,18 +83,49 @@ class RoleActions:
                 Role_Actions.description,
             )
             .join(Role, Actions, isouter=True)
-            .filter(Role_Actions.is_deleted == false())
-            .offset(start)
-            .limit(limit)
-            .all()
+            .filter(Role_Actions.not_deleted())
         )
+        page = paginate(
+            query, Role_Actions.created_on, Role_Actions.id, start, limit, cursor
+        )
+        actions = page.rows
 
-        total = len(actions)
+        total = count_rows(query, Role_Actions.id, approximate)
         main.logger.info(msg="List of Permissions is display!", extra=extra)
 
-        res = {"success": True, "numRows": total, "data": actions}
+        res = {
+            "success": True,
+            "numRows": total,
+            "data": actions,
+            "next_cursor": page.next_cursor,
+            "prev_cursor": page.prev_cursor,
+        }
 
-        return jsonable_encoder(res)
+        return list_response(res, role_actions_schemas.ShowRoleActionInfo)
+
+    def export_actions_assigned(self) -> Select:
+        """Consulta para exportar los permisos con los filtros del listado.
+
+        #? ENDPOINT /permissions/export GET
+
+        Returns:
+            Select: Consulta ordenada por (created_on, id) para stream_with_db
+        """
+        main.logger.info(msg="Permissions export started!", extra=extra)
+        return (
+            select(
+                Role_Actions.id,
+                Role_Actions.actions_id,
+                Actions.action_name.label("action_name"),
+                Role_Actions.role_id,
+                Role.name.label("role_name"),
+                Role_Actions.description,
+            )
+            .join(Role, isouter=True)
+            .join(Actions, isouter=True)
+            .where(Role_Actions.not_deleted())
+            .order_by(Role_Actions.created_on, Role_Actions.id)
+        )
 
     def show_one_role_action(self, db: Session, id: UUID) -> JSONResponse:
         """Este metodo lo que hace es realizar la busqueda de un registro por su id.
@@ -109,7 +153,7 @@ class RoleActions:
             )
             .join(Role, Actions, isouter=True)
             .filter(Role_Actions.id == id)
-            .filter(Role_Actions.is_deleted == false())
+            .filter(Role_Actions.not_deleted())
             .first()
         )
 
@@ -150,19 +194,32 @@ class RoleActions:
             .filter(Role_Actions.role_id == request.role_id)
             .filter(Role_Actions.actions_id == request.actions_id)
         )
-        if check_status.filter(Role_Actions.is_deleted == false()).first():
+        if check_status.first() is None:
+            # Los permisos archivados se restauran con su ID original
+            restore_archived(
+                db,
+                Role_Actions,
+                role_id=request.role_id,
+                actions_id=request.actions_id,
+            )
+        if check_status.filter(Role_Actions.not_deleted()).first():
             main.logger.info(msg="Permission already exist!", extra=extra)
             return JSONResponse(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 content={"success": True, "msg": "It was already assign"},
             )
 
-        if check_status.filter(Role_Actions.is_deleted == true()).first():
-            is_d = False
+        if check_status.filter(Role_Actions.soft_deleted).first():
             check_status.update(
-                {**request.dict(), "is_deleted": is_d, "updated_by": current_user}
+                {
+                    **request.dict(),
+                    **Role_Actions.restored_values(),
+                    "updated_by": current_user,
+                }
             )
+            bump_permission_version(db, [request.role_id])
             db.commit()
+            invalidate_roles([request.role_id])
             main.logger.info(msg="Permission created Successfully!", extra=extra)
             return JSONResponse(
                 status_code=status.HTTP_201_CREATED,
@@ -173,7 +230,7 @@ class RoleActions:
             check_role = (
                 db.query(Role)
                 .filter(Role.id == request.role_id)
-                .filter(Role.is_deleted == false())
+                .filter(Role.not_deleted())
                 .first()
             )
             if not check_role:
@@ -186,7 +243,7 @@ class RoleActions:
             check_action = (
                 db.query(Actions)
                 .filter(Actions.id == request.actions_id)
-                .filter(Actions.is_deleted == false())
+                .filter(Actions.not_deleted())
                 .first()
             )
 
@@ -200,13 +257,135 @@ class RoleActions:
                 )
             assing_action = Role_Actions(**request.dict(), created_by=current_user)
             db.add(assing_action)
+            bump_permission_version(db, [request.role_id])
             db.commit()
+            invalidate_roles([request.role_id])
             main.logger.info(msg="Permission created succesfully!", extra=extra)
             return JSONResponse(
                 status_code=status.HTTP_201_CREATED,
                 content={"success": True, "message": "Action assign in a Role"},
             )
 
+    def assing_actions_bulk(
+        self,
+        db: Session,
+        request: role_actions_schemas.bulk_assigned_actions,
+        current_user: str,
+    ) -> JSONResponse:
+        """Asigna y revoca varias acciones de un rol en una transaccion.
+
+        Se leen una sola vez los permisos actuales del rol y se calcula la
+        diferencia contra lo pedido: las acciones nuevas se insertan, las
+        eliminadas se restauran y las que sobran se marcan como eliminadas,
+        cada grupo con una sola sentencia.
+
+        #? ENPOINT /permissions/bulk POST
+
+        Args:
+            db (Session): Session para realizar acciones con SQLALCHEMY.
+            request (role_actions_schemas.bulk_assigned_actions): ID del rol,
+             acciones a asignar y a revocar o el conjunto completo con replace
+            current_user (str): ID del usuario en sesion para la auditoria
+
+        Returns:
+            JSONResponse: IDs de las acciones asignadas, restauradas,
+             revocadas, sin cambios e invalidas.
+        """
+        check_role = (
+            db.query(Role.id)
+            .filter(Role.id == request.role_id)
+            .filter(Role.not_deleted())
+            .first()
+        )
+        if not check_role:
+            main.logger.info(msg=f"Role {request.role_id} not found!", extra=extra)
+            return JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={"success": False, "msg": "Invalid role!"},
+            )
+
+        wanted = set(request.actions_id)
+        valid = set()
+        if wanted:
+            valid = {
+                row.id
+                for row in db.query(Actions.id)
+                .filter(Actions.id.in_(wanted))
+                .filter(Actions.not_deleted())
+            }
+
+        # Puede haber varias filas del mismo (rol, accion): la accion esta
+        # activa si alguna esta viva y al restaurar se usa una sola fila
+        active = set()
+        deleted_rows = {}
+        for row in db.query(
+            Role_Actions.id,
+            Role_Actions.actions_id,
+            Role_Actions.not_deleted().label("live"),
+        ).filter(Role_Actions.role_id == request.role_id):
+            if row.live:
+                active.add(row.actions_id)
+            else:
+                deleted_rows.setdefault(row.actions_id, row.id)
+
+        to_insert = valid - active - deleted_rows.keys()
+        to_restore = (valid & deleted_rows.keys()) - active
+        if request.replace:
+            to_revoke = active - valid
+        else:
+            to_revoke = (active & set(request.revoke_id)) - valid
+
+        if to_insert:
+            db.bulk_insert_mappings(
+                Role_Actions,
+                [
+                    {
+                        "id": uuid4(),
+                        "role_id": request.role_id,
+                        "actions_id": action,
+                        "description": request.description,
+                        "created_by": current_user,
+                    }
+                    for action in to_insert
+                ],
+            )
+        if to_restore:
+            values = {**Role_Actions.restored_values(), "updated_by": current_user}
+            if request.description is not None:
+                values["description"] = request.description
+            db.query(Role_Actions).filter(
+                Role_Actions.id.in_([deleted_rows[action] for action in to_restore])
+            ).update(values, synchronize_session=False)
+        if to_revoke:
+            db.query(Role_Actions).filter(
+                Role_Actions.role_id == request.role_id
+            ).filter(Role_Actions.actions_id.in_(to_revoke)).filter(
+                Role_Actions.not_deleted()
+            ).update(
+                {**Role_Actions.deleted_values(), "updated_by": current_user},
+                synchronize_session=False,
+            )
+        if to_insert or to_restore or to_revoke:
+            bump_permission_version(db, [request.role_id])
+        db.commit()
+
+        if to_insert or to_restore or to_revoke:
+            invalidate_roles([request.role_id])
+        main.logger.info(
+            msg=f"Permissions of role {request.role_id}: {len(to_insert)} assigned, "
+            f"{len(to_restore)} restored, {len(to_revoke)} revoked!",
+            extra=extra,
+        )
+        res = {
+            "success": True,
+            "assigned": sorted(to_insert, key=str),
+            "restored": sorted(to_restore, key=str),
+            "revoked": sorted(to_revoke, key=str),
+            "unchanged": sorted(valid & active, key=str),
+            "invalid": sorted(wanted - valid, key=str),
+        }
+        return jsonable_encoder(res)
+
     def deleted_assing_role_and_actions(
         self, db: Session, id: UUID, current_user: str
     ) -> Optional[JSONResponse]:
@@ -241,18 +420,23 @@ class RoleActions:
         role_action = (
             db.query(Role_Actions)
             .filter(Role_Actions.id == id)
-            .filter(Role_Actions.is_deleted == false())
+            .filter(Role_Actions.not_deleted())
         )
-        if not role_action.first():
+        current_role_action = role_action.first()
+        if not current_role_action:
             main.logger.info(msg=f"Permission {id} not found", extra=extra)
             return JSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
                 content={"success": True, "msg": "Not Found"},
             )
 
-        role_action.update({"is_deleted": is_d, "updated_by": current_user})
+        role_action.update(
+            {**Role_Actions.deleted_values(), "updated_by": current_user}
+        )
         main.logger.info(msg=f"Permission {id} it's deleted!", extra=extra)
+        bump_permission_version(db, [current_role_action.role_id])
         db.commit()
+        invalidate_roles([current_role_action.role_id])
         return None
 
     def update_description(
@@ -288,7 +472,7 @@ class RoleActions:
         role_action = (
             db.query(Role_Actions)
             .filter(Role_Actions.id == id)
-            .filter_by(is_deleted=False)
+            .filter(Role_Actions.not_deleted())
             .first()
         )
         #  Si no existe el user, devolvemos un error
@@ -2,19 +2,25 @@ from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy.sql.expression import false, true
+from sqlalchemy.sql.expression import true
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
 from fastapi import status
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
 
 from app import main
+from app.extras.pagination import count_rows, paginate
+from app.extras.responses import list_response
 from app.models.users import Users
 from app.models.roles import Role
 from app.models.actions import Actions
 from app.models.module import Module
 from app.models.role_actions import Role_Actions
 from app.schemas import role_schemas
+from app.internal.permission_map import invalidate_roles
+from app.internal.permission_version import bump_permission_version
 
 extra = {"event.category": "app_log"}
 
@@ -64,9 +70,10 @@ class RoleActions:
         """
         new_role = db.query(Role).filter(Role.name == request.name).first()
 
-        if new_role is not None and new_role.is_deleted is True:
+        if new_role is not None and new_role.soft_deleted:
             #  If the role is deleted. We can restore it and set the is_deleted to false
             new_role.is_deleted = False
+            new_role.deleted_at = None
             new_role.description = request.description
             new_role.created_by = current_user
             db.commit()
@@ -76,7 +83,7 @@ class RoleActions:
                 content={"success": True, "msg": "Role created succesfully!"},
             )
 
-        elif new_role is not None and new_role.is_deleted is False:
+        elif new_role is not None:
             #  If the role is not deleted, we can not create it.
             main.logger.info(msg="Role already exist!", extra=extra)
             return JSONResponse(
@@ -104,6 +111,8 @@ class RoleActions:
         db: Session,
         start: Optional[int] = None,
         limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        approximate: bool = False,
     ) -> JSONResponse:
         """Este metodo cuenta todos los registros y paginar el listado de la informacion.
 
@@ -115,26 +124,49 @@ class RoleActions:
             indicar el inicio de nuestro paginador. Defaults to None.
             limit (int, optional): Este argumento sirve para
             indicar el limite de nuestro paginador. Defaults to None.
+            cursor (str, optional): Cursor de la respuesta anterior para
+            paginar por (created_on, id) en lugar de offset. Defaults to None.
+            approximate (bool, optional): Usar el estimado de la tabla para
+            numRows en lugar de COUNT. Defaults to False.
 
         Returns:
             JSONResponse: Nos devuelve una respuesta en JSON con la propiedad success
              en caso de tener exito nos mostarara la propiedad numRows con la cantidad
              de todos los registros y data con la informacion solicitada.
         """
-        show_roles = (
-            db.query(Role)
-            .filter(Role.name != "super admin")
-            .filter_by(is_deleted=False)
-            .offset(start)
-            .limit(limit)
-            .all()
+        query = (
+            db.query(Role).filter(Role.name != "super admin").filter(Role.not_deleted())
         )
+        page = paginate(query, Role.created_on, Role.id, start, limit, cursor)
+        show_roles = page.rows
 
-        total = len(show_roles)
+        total = count_rows(query, Role.id, approximate)
         main.logger.info(msg="List of Roles is display!", extra=extra)
-        res = {"success": True, "numRows": total, "data": show_roles}
+        res = {
+            "success": True,
+            "numRows": total,
+            "data": show_roles,
+            "next_cursor": page.next_cursor,
+            "prev_cursor": page.prev_cursor,
+        }
 
-        return jsonable_encoder(res)
+        return list_response(res, role_schemas.ShowRoleInfo)
+
+    def export_roles(self) -> Select:
+        """Consulta para exportar los roles con los filtros del listado.
+
+        #? ENDPOINT /roles/export GET
+
+        Returns:
+            Select: Consulta ordenada por (created_on, id) para stream_with_db
+        """
+        main.logger.info(msg="Roles export started!", extra=extra)
+        return (
+            select(Role.id, Role.name, Role.description)
+            .where(Role.name != "super admin")
+            .where(Role.not_deleted())
+            .order_by(Role.created_on, Role.id)
+        )
 
     def get_one_role(self, db: Session, id: UUID) -> JSONResponse:
         """Este metodo lo que hace es realizar la busqueda de un registro por su id.
@@ -154,7 +186,7 @@ class RoleActions:
             db.query(Role)
             .filter(Role.name != "super admin")
             .filter(Role.id == id)
-            .filter_by(is_deleted=False)
+            .filter(Role.not_deleted())
             .first()
         )
 
@@ -199,12 +231,7 @@ class RoleActions:
             la propiedad success y la propiedad msg.
         """
         # Buscamos el rol el cual es filtrado por un id
-        role = (
-            db.query(Role)
-            .filter(Role.id == id)
-            .filter(Role.is_deleted == false())
-            .first()
-        )
+        role = db.query(Role).filter(Role.id == id).filter(Role.not_deleted()).first()
         # Si no existe devolvemos un error
         if not role:
             main.logger.info(msg=f"Role {id} not found!", extra=extra)
@@ -260,7 +287,7 @@ class RoleActions:
         check_child = (
             db.query(Users)
             .filter(Users.role_id == id)
-            .filter(Users.is_deleted == false())
+            .filter(Users.not_deleted())
             .count()
         )
 
@@ -277,7 +304,7 @@ class RoleActions:
             )
 
         is_d = True
-        role = db.query(Role).filter(Role.id == id).filter_by(is_deleted=False)
+        role = db.query(Role).filter(Role.id == id).filter(Role.not_deleted())
 
         if is_d is False:
             main.logger.info(
@@ -295,8 +322,10 @@ class RoleActions:
                 content={"success": False, "msg": "Not Found"},
             )
 
-        role.update({Role.is_deleted: is_d})
+        role.update(Role.deleted_values())
+        bump_permission_version(db, [id])
         db.commit()
+        invalidate_roles([id])
         main.logger.info(msg=f"Role {id} it's deleted!", extra=extra)
         return None
 
@@ -339,8 +368,8 @@ class RoleActions:
             )
             .join(Role, isouter=True)
             .filter(Role.id == id)
-            .filter(Users.is_deleted == false())
-            .filter(Role.is_deleted == false())
+            .filter(Users.not_deleted())
+            .filter(Role.not_deleted())
             .offset(start)
             .limit(limit)
             .all()
@@ -350,7 +379,7 @@ class RoleActions:
 
         res = {"success": True, "numRows": total, "data": show_role_with_users}
         main.logger.info(msg="List of Users from Role is display!", extra=extra)
-        return jsonable_encoder(res)
+        return list_response(res, role_schemas.ShowRoleWithUser)
 
     def show_actions_and_modules(self, db: Session, id: UUID) -> JSONResponse:
         """El método show_actions_and_modules lo que hace es filtrar el registro por ID.
@@ -376,7 +405,7 @@ class RoleActions:
         role = (
             db.query(Role.id, Role.name, Role.description)
             .filter(Role.id == id)
-            .filter_by(is_deleted=False)
+            .filter(Role.not_deleted())
             .first()
         )
 
@@ -399,10 +428,10 @@ class RoleActions:
             .filter(Role_Actions.role_id == role.id.__str__())
             .filter(Role_Actions.actions_id == Actions.id)
             .filter(Actions.module_id == Module.id)
-            .filter(Actions.is_deleted == false())
+            .filter(Actions.not_deleted())
             .filter(Actions.is_active == true())
-            .filter(Module.is_deleted == false())
-            .filter(Role_Actions.is_deleted == false())
+            .filter(Module.not_deleted())
+            .filter(Role_Actions.not_deleted())
             .all()
         )
 
@@ -0,0 +1,307 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Mapping
+from uuid import UUID
+
+from decouple import config
+from sqlalchemy.orm import Session
+
+from app import main
+from app.database.main import SessionLocal
+from app.extras.bloom_filter import BloomFilter
+from app.internal.cache_events import cache_channel, sync_caches
+from app.models.revoked_tokens import Revoked_Tokens
+from app.models.token_watermarks import Token_Watermarks
+
+extra = {"event.category": "auth"}
+
+CACHE_NAME = "token_revocations"
+
+# Tamaño del filtro: con mas tokens revocados vivos sube el error y con el
+# las consultas a revoked_tokens, al pasar la capacidad se reconstruye
+REVOCATION_BLOOM_CAPACITY = config(
+    "REVOCATION_BLOOM_CAPACITY", default=100000, cast=int
+)
+REVOCATION_BLOOM_ERROR = config("REVOCATION_BLOOM_ERROR", default=0.001, cast=float)
+# Segundos entre cada borrado de revocaciones expiradas
+REVOCATION_CLEANUP_INTERVAL = config(
+    "REVOCATION_CLEANUP_INTERVAL", default=3600, cast=float
+)
+
+# Igual al expires_fresh de auth.py, ningun token vive mas que esto
+TOKEN_MAX_AGE = timedelta(hours=4)
+
+
+class TokenRevocations:
+    """Tokens revocados por jti y marcas por usuario, en memoria.
+
+    La BD guarda cada jti en revoked_tokens y cada marca en
+    token_watermarks. En memoria los jti viven en un filtro de Bloom, asi
+    un token no revocado, el caso comun, se descarta con un hash y solo
+    un positivo consulta la BD. Las marcas son pocas y se guardan
+    completas: un token del usuario emitido antes de la marca esta
+    revocado.
+
+    Las marcas van en segundos enteros, la misma precision del iat y de
+    la columna DateTime, asi el worker que revoca y los que cargan de la BD
+    comparan igual. Un token emitido en el mismo segundo que la marca sigue
+    valido: es el costo de que un login justo despues de revocar funcione.
+
+    Los demas workers se enteran por cache_channel; si el canal esta
+    apagado la memoria no ve lo que revocan otros workers y cada token se
+    revisa en la BD con stored().
+
+    Args:
+        capacity (int): Capacidad inicial del filtro de Bloom
+        error_rate (float): Falsos positivos esperados con capacity tokens
+        cleanup_interval (float): Segundos entre cada limpieza por TTL
+    """
+
+    def __init__(
+        self, capacity: int, error_rate: float, cleanup_interval: float
+    ) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.cleanup_interval = cleanup_interval
+        self._filter = BloomFilter(capacity, error_rate)
+        self._watermarks: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._last_cleanup = time.monotonic()
+        self.lookups = 0
+        self.false_positives = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Tamaño del filtro y consultas a la BD por positivos."""
+        return {
+            "tokens": len(self._filter),
+            "capacity": self._filter.capacity,
+            "watermarks": len(self._watermarks),
+            "lookups": self.lookups,
+            "false_positives": self.false_positives,
+        }
+
+    def _set_watermarks(self, watermarks: Mapping[str, int]) -> None:
+        """Guarda las marcas que sean mas recientes que las conocidas."""
+        with self._lock:
+            for user_id, revoked_before in watermarks.items():
+                if revoked_before > self._watermarks.get(user_id, 0):
+                    self._watermarks[user_id] = revoked_before
+
+    def is_revoked(self, raw: Mapping[str, Any]) -> bool:
+        """Indica si el token fue revocado, se usa como denylist de AuthJWT.
+
+        Args:
+            raw (Mapping[str, Any]): Claims del token ya verificado
+
+        Returns:
+            bool: True si el token esta revocado
+        """
+        if not cache_channel.enabled:
+            db = SessionLocal()
+            try:
+                return self.stored(db, raw)
+            finally:
+                db.close()
+
+        revoked_before = self._watermarks.get(str(raw.get("sub")))
+        if revoked_before is not None and raw.get("iat", 0) < revoked_before:
+            return True
+
+        jti = raw.get("jti")
+        if not jti or not self._filter.might_contain(jti):
+            return False
+        db = SessionLocal()
+        try:
+            return self.confirm(db, jti)
+        finally:
+            db.close()
+
+    def stored(self, db: Session, raw: Mapping[str, Any]) -> bool:
+        """Busca el jti y la marca del usuario directo en la BD.
+
+        Args:
+            db (Session): Session de SQLAlchemy
+            raw (Mapping[str, Any]): Claims del token ya verificado
+
+        Returns:
+            bool: True si el token esta revocado
+        """
+        jti = raw.get("jti")
+        if jti and (
+            db.query(Revoked_Tokens.jti).filter(Revoked_Tokens.jti == jti).first()
+        ):
+            return True
+        try:
+            user_id = UUID(str(raw.get("sub")))
+        except ValueError:
+            return False
+        issued_on = datetime.fromtimestamp(raw.get("iat", 0))
+        return (
+            db.query(Token_Watermarks.user_id)
+            .filter(
+                Token_Watermarks.user_id == user_id,
+                Token_Watermarks.revoked_before > issued_on,
+            )
+            .first()
+        ) is not None
+
+    def confirm(self, db: Session, jti: str) -> bool:
+        """Consulta la BD por un positivo del filtro de Bloom.
+
+        Args:
+            db (Session): Session de SQLAlchemy
+            jti (str): ID del token
+
+        Returns:
+            bool: True si el token esta en revoked_tokens
+        """
+        self.lookups += 1
+        revoked = (
+            db.query(Revoked_Tokens.jti).filter(Revoked_Tokens.jti == jti).first()
+        ) is not None
+        if not revoked:
+            self.false_positives += 1
+            if self._filter.saturated:
+                self.load(db)
+        return revoked
+
+    def revoke_token(self, db: Session, raw: Mapping[str, Any]) -> None:
+        """Revoca un token por su jti y hace commit.
+
+        Args:
+            db (Session): Session de SQLAlchemy
+            raw (Mapping[str, Any]): Claims del token a revocar
+        """
+        jti = raw["jti"]
+        db.merge(
+            Revoked_Tokens(
+                jti=jti,
+                user_id=raw.get("sub"),
+                expires_on=datetime.fromtimestamp(raw["exp"]),
+            )
+        )
+        cache_channel.publish(db, CACHE_NAME, f"jti:{jti}")
+        db.commit()
+        self._filter.add(jti)
+        self.cleanup_if_due(db)
+
+    def revoke_user(self, db: Session, user_id: Any) -> None:
+        """Revoca todos los tokens que el usuario tenga hasta ahora y hace commit.
+
+        Args:
+            db (Session): Session de SQLAlchemy
+            user_id (UUID | str): ID del usuario
+        """
+        user_id = UUID(str(user_id))
+        now = datetime.now().replace(microsecond=0)
+        revoked_before = int(now.timestamp())
+        db.merge(
+            Token_Watermarks(
+                user_id=user_id,
+                revoked_before=now,
+                expires_on=now + TOKEN_MAX_AGE,
+            )
+        )
+        cache_channel.publish(db, CACHE_NAME, f"user:{user_id}:{revoked_before}")
+        db.commit()
+        self._set_watermarks({str(user_id): revoked_before})
+        self.cleanup_if_due(db)
+
+    def invalidate(self, key: str) -> None:
+        """Aplica una revocacion publicada por otro worker."""
+        kind, _, value = key.partition(":")
+        if kind == "jti":
+            # El worker que revoco recibe su propio evento, no se cuenta dos veces
+            if not self._filter.might_contain(value):
+                self._filter.add(value)
+        elif kind == "user":
+            user_id, _, revoked_before = value.rpartition(":")
+            self._set_watermarks({user_id: int(revoked_before)})
+
+    def load(self, db: Session) -> None:
+        """Reconstruye el filtro y las marcas con las revocaciones vigentes.
+
+        Se llama al arrancar y cuando el filtro pasa su capacidad.
+
+        Args:
+            db (Session): Session de SQLAlchemy
+        """
+        now = datetime.now()
+        with self._lock:
+            jtis = [
+                row.jti
+                for row in db.query(Revoked_Tokens.jti).filter(
+                    Revoked_Tokens.expires_on > now
+                )
+            ]
+            bloom = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+            bloom.update(jtis)
+            self._filter = bloom
+
+            oldest = int((now - TOKEN_MAX_AGE).timestamp())
+            self._watermarks = {
+                user_id: revoked_before
+                for user_id, revoked_before in self._watermarks.items()
+                if revoked_before > oldest
+            }
+        self._set_watermarks(
+            {
+                str(row.user_id): int(row.revoked_before.timestamp())
+                for row in db.query(
+                    Token_Watermarks.user_id, Token_Watermarks.revoked_before
+                ).filter(Token_Watermarks.expires_on > now)
+            }
+        )
+        main.logger.info(
+            msg=f"Token revocations loaded: {len(jtis)} tokens, "
+            f"{len(self._watermarks)} users",
+            extra=extra,
+        )
+
+    def cleanup_if_due(self, db: Session) -> int:
+        """Llama a cleanup() como maximo una vez por cleanup_interval."""
+        if time.monotonic() - self._last_cleanup < self.cleanup_interval:
+            return 0
+        self._last_cleanup = time.monotonic()
+        return self.cleanup(db)
+
+    def cleanup(self, db: Session) -> int:
+        """Borra las revocaciones de tokens que ya expiraron y hace commit.
+
+        Returns:
+            int: Numero de filas eliminadas
+        """
+        now = datetime.now()
+        deleted = (
+            db.query(Revoked_Tokens)
+            .filter(Revoked_Tokens.expires_on <= now)
+            .delete(synchronize_session=False)
+        )
+        deleted += (
+            db.query(Token_Watermarks)
+            .filter(Token_Watermarks.expires_on <= now)
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return deleted
+
+
+token_revocations = TokenRevocations(
+    capacity=REVOCATION_BLOOM_CAPACITY,
+    error_rate=REVOCATION_BLOOM_ERROR,
+    cleanup_interval=REVOCATION_CLEANUP_INTERVAL,
+)
+cache_channel.register(CACHE_NAME, token_revocations)
+
+
+def token_is_revoked(decrypted_token: Dict[str, Any]) -> bool:
+    """Callback de AuthJWT.token_in_denylist_loader.
+
+    AuthJWT llama al callback como funcion, no como metodo, por eso no se
+    registra token_revocations.is_revoked directamente. Antes aplica los
+    eventos de cache_channel, refresh y logout usan jwt_*_required() y no
+    pasan por get_token_claims.
+    """
+    sync_caches()
+    return token_revocations.is_revoked(decrypted_token)
@@ -0,0 +1,87 @@
+from typing import Any
+
+from decouple import config
+from sqlalchemy.orm import Session
+
+from app.extras.cache import TTLCache
+from app.internal.cache_events import cache_channel
+from app.models.users import Users
+
+CACHE_NAME = "users"
+
+# require_user solo necesita saber si el usuario del token sigue existiendo,
+# se guarda True/False por usuario durante unos segundos. Los negativos
+# tienen su propio TTL para que un usuario restaurado no espere demasiado.
+user_validity_cache = TTLCache(
+    maxsize=config("USER_CACHE_SIZE", default=10000, cast=int),
+    ttl=config("USER_CACHE_TTL", default=30, cast=float),
+)
+negative_ttl = config("USER_CACHE_NEGATIVE_TTL", default=5, cast=float)
+
+cache_channel.register(CACHE_NAME, user_validity_cache)
+
+
+def _query_user_exists(db: Session, user_id: str) -> bool:
+    """Busca al usuario que no este marcado como eliminado.
+
+    Args:
+        db (Session): Session de SQLAlchemy
+        user_id (str): ID del usuario
+
+    Returns:
+        bool: True si existe
+    """
+    return (
+        db.query(Users.id)
+        .filter(Users.id == user_id)
+        .filter(Users.not_deleted())
+        .first()
+    ) is not None
+
+
+def user_exists(db: Session, user_id: Any) -> bool:
+    """Indica si el usuario existe, usando el cache si es posible.
+
+    Args:
+        db (Session): Session de SQLAlchemy
+        user_id (UUID | str): ID del usuario
+
+    Returns:
+        bool: True si existe y no esta eliminado
+    """
+    cached = user_validity_cache.get(str(user_id))
+    if cached is not None:
+        return cached
+    return load_user_exists(db, user_id)
+
+
+def load_user_exists(db: Session, user_id: Any) -> bool:
+    """Consulta la BD y guarda el resultado, para un miss de user_validity_cache.
+
+    require_user ya leyo el cache antes de llamar a la BD, con esta funcion
+    no lo vuelve a leer y el miss se cuenta una sola vez en las metricas.
+
+    Args:
+        db (Session): Session de SQLAlchemy
+        user_id (UUID | str): ID del usuario
+
+    Returns:
+        bool: True si existe y no esta eliminado
+    """
+    key = str(user_id)
+    generation = user_validity_cache.generation
+    exists = _query_user_exists(db, key)
+    user_validity_cache.set(
+        key, exists, ttl=None if exists else negative_ttl, generation=generation
+    )
+    return exists
+
+
+def publish_user_change(db: Session, user_id: Any) -> None:
+    """Avisa a los demas workers, se guarda al hacer commit de db."""
+    cache_channel.publish(db, CACHE_NAME, user_id)
+
+
+def invalidate_user(user_id: Any) -> None:
+    """Invalida la entrada del usuario en este worker."""
+    user_validity_cache.invalidate(str(user_id))
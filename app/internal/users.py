@@ -1,20 +1,31 @@
 from datetime import datetime
+from types import SimpleNamespace
 from typing import Optional
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from sqlalchemy.sql.expression import false
+from decouple import config
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
 from fastapi import status
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 from app import main
+from app.extras.pagination import count_rows, paginate
+from app.extras.responses import list_response
 from app.schemas import user_schemas
 from app.extras.hashing import Hash
 from app.models.users import Users
 from app.models.roles import Role
+from app.internal.archive import restore_archived, restore_archived_many
+from app.internal.token_revocation import token_revocations
+from app.internal.user_validity import invalidate_user, publish_user_change
 
 extra = {"event.category": "app_log"}
 
+# Filas por IN e INSERT en /users/bulk
+BULK_CHUNK_SIZE = config("BULK_CHUNK_SIZE", default=1000, cast=int)
+
 
 class UsersActions:
     """Esta clase realiza operacions en usuarios.
@@ -63,8 +74,8 @@ class UsersActions:
             )
             .join(Role, isouter=True)
             .filter(Users.id == current_user)
-            .filter(Users.is_deleted == false())
-            .filter(Role.is_deleted == false())
+            .filter(Users.not_deleted())
+            .filter(Role.not_deleted())
             .first()
         )
 
@@ -101,11 +112,15 @@ class UsersActions:
              y la propiedad msg con sus respectivos valores.
              En caso contrario nos mostrara la propiedad success y la propiedad msg.
         """
-        new_user = db.query(Users).filter(Users.email == request.email).first()
+        find_user = db.query(Users).filter(Users.email == request.email)
+        new_user = find_user.first()
+        if new_user is None and restore_archived(db, Users, email=request.email):
+            # Los usuarios archivados se restauran con su ID original
+            new_user = find_user.first()
         check_role = (
             db.query(Role.id)
             .filter(Role.id == request.role_id)
-            .filter(Role.is_deleted == false())
+            .filter(Role.not_deleted())
             .first()
         )
         if not check_role:
@@ -115,22 +130,31 @@ class UsersActions:
                 content={"success": False, "msg": "Invalid role!"},
             )
 
-        if new_user is not None and new_user.is_deleted is True:
+        if new_user is not None and new_user.soft_deleted:
             # If the user is deleted, we can restore it and
             # set the is_deleted to False and update Password.
             # print("If the user is deleted, we can restore it.")
-            new_user.is_deleted = False
-            new_user.role_id = request.role_id
-            new_user.password = Hash().bcrypt(request.password)
-            new_user.created_on = datetime.now()
-            new_user.created_by = current_user
+            # Mismos valores que el restore de create_users_bulk
+            find_user.update(
+                {
+                    **Users.restored_values(),
+                    "is_active": True,
+                    "role_id": request.role_id,
+                    "password": Hash().bcrypt(request.password),
+                    "created_on": datetime.now(),
+                    "created_by": current_user,
+                },
+                synchronize_session=False,
+            )
+            publish_user_change(db, new_user.id)
             db.commit()
+            invalidate_user(new_user.id)
             main.logger.info(msg="User created succesfully!", extra=extra)
             return JSONResponse(
                 status_code=status.HTTP_201_CREATED,
                 content={"success": True, "msg": "User created succesfully!"},
             )
-        elif new_user is not None and new_user.is_deleted is False:
+        elif new_user is not None:
             # If the user is not deleted, we can not create it.
             # print("If the user is not deleted, we can not create it.")
             main.logger.info(msg="User already exists!", extra=extra)
@@ -154,12 +178,121 @@ class UsersActions:
             content={"success": True, "msg": "User created succesfully!"},
         )
 
+    def create_users_bulk(
+        self, db: Session, current_user: str, request: user_schemas.UsersBulkCreate
+    ) -> JSONResponse:
+        """Crea varios usuarios con las mismas reglas que create_new_user.
+
+        Los roles se validan con una sola consulta, los correos existentes se
+        buscan con IN por bloques, los passwords se hashean en paralelo en el
+        pool de bcrypt y las altas se insertan con bulk_insert_mappings, todo
+        en una sola transaccion.
+
+        #? Endpoint /users/bulk POST
+
+        Args:
+            db (Session): Session para realizar acciones con SQLALCHEMY.
+            current_user (str): ID del usuario en sesion para la auditoria
+            request (Pydantic model): Lista de usuarios a crear
+
+        Returns:
+            JSONResponse: Reporte con el estado de cada usuario en el mismo
+             orden del request: created, restored, exists, duplicated
+             o invalid_role.
+        """
+        users = request.users
+        role_ids = {user.role_id for user in users}
+        valid_roles = {
+            row.id
+            for row in db.query(Role.id)
+            .filter(Role.id.in_(role_ids))
+            .filter(Role.not_deleted())
+        }
+
+        emails = list({user.email for user in users})
+        existing = {}
+        for i in range(0, len(emails), BULK_CHUNK_SIZE):
+            chunk = emails[i : i + BULK_CHUNK_SIZE]
+            for row in db.query(
+                Users.id, Users.email, Users.soft_deleted.label("soft_deleted")
+            ).filter(Users.email.in_(chunk)):
+                existing[row.email] = row
+
+        # Los archivados vuelven eliminados y siguen el camino de restored
+        missing = [email for email in emails if email not in existing]
+        restored = restore_archived_many(db, Users, "email", missing)
+        for email, id in restored.items():
+            existing[email] = SimpleNamespace(id=id, soft_deleted=True)
+
+        now = datetime.now()
+        results = []
+        to_hash = []
+        seen = set()
+        for index, user in enumerate(users):
+            result = {"index": index, "email": user.email, "id": None}
+            results.append(result)
+            found = existing.get(user.email)
+            if user.email in seen:
+                result["status"] = "duplicated"
+            elif user.role_id not in valid_roles:
+                result["status"] = "invalid_role"
+            elif found is not None and not found.soft_deleted:
+                result["status"] = "exists"
+                result["id"] = found.id
+            else:
+                result["status"] = "restored" if found is not None else "created"
+                result["id"] = found.id if found is not None else uuid4()
+                to_hash.append((result, user))
+            seen.add(user.email)
+
+        passwords = Hash.bcrypt_many([user.password for _, user in to_hash])
+        inserts = []
+        restores = []
+        for (result, user), password in zip(to_hash, passwords):
+            values = {
+                "id": result["id"],
+                "password": password,
+                "role_id": user.role_id,
+                "created_on": now,
+                "created_by": current_user,
+            }
+            if result["status"] == "created":
+                inserts.append({**values, "email": user.email})
+            else:
+                restores.append(
+                    {**values, **Users.restored_values(), "is_active": True}
+                )
+                publish_user_change(db, result["id"])
+
+        for i in range(0, len(inserts), BULK_CHUNK_SIZE):
+            db.bulk_insert_mappings(Users, inserts[i : i + BULK_CHUNK_SIZE])
+        for i in range(0, len(restores), BULK_CHUNK_SIZE):
+            db.bulk_update_mappings(Users, restores[i : i + BULK_CHUNK_SIZE])
+        db.commit()
+        for values in restores:
+            invalidate_user(values["id"])
+
+        main.logger.info(
+            msg=f"Bulk users: {len(inserts)} created, {len(restores)} restored!",
+            extra=extra,
+        )
+        res = {
+            "success": True,
+            "created": len(inserts),
+            "restored": len(restores),
+            "skipped": len(users) - len(to_hash),
+            "results": results,
+        }
+        return jsonable_encoder(res)
+
     def get_all_users(
         self,
         db: Session,
         current_user: str,
         start: Optional[int] = None,
         limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        approximate: bool = False,
     ) -> JSONResponse:
         """Este metodo cuenta todos los registros y paginar el listado de la informacion.
 
@@ -171,15 +304,20 @@ class UsersActions:
             indicar el inicio de nuestro paginador. Defaults to None.
             limit (int, optional): Este argumento sirve para
             indicar el limite de nuestro paginador. Defaults to None.
+            cursor (str, optional): Cursor de la respuesta anterior para
+            paginar por (created_on, id) en lugar de offset. Defaults to None.
+            approximate (bool, optional): Usar el estimado de la tabla para
+            numRows en lugar de COUNT. Defaults to False.
 
         Returns:
             JSONResponse: Nos devuelve una respuesta en JSON con la propiedad success
                 en caso de tener exito nos mostarara la propiedad numRows con la cantidad de todos
                 los registros y data con la informacion solicitada.
         """
-        show_users = (
+        query = (
             db.query(
                 Users.id,
+                Users.created_on,
                 Users.email,
                 Users.is_active,
                 Users.role_id,
@@ -188,17 +326,50 @@ class UsersActions:
             .join(Role, isouter=True)
             .filter(Role.name != "super admin")
             .filter(Users.id != current_user)
-            .filter(Users.is_deleted == false())
-            .filter(Role.is_deleted == false())
-            .offset(start)
-            .limit(limit)
-            .all()
+            .filter(Users.not_deleted())
+            .filter(Role.not_deleted())
         )
+        page = paginate(query, Users.created_on, Users.id, start, limit, cursor)
+        show_users = page.rows
 
-        total = len(show_users)
+        total = count_rows(query, Users.id, approximate)
         main.logger.info(msg="List of Users is display!", extra=extra)
-        res = {"success": True, "numRows": total, "data": show_users}
-        return jsonable_encoder(res)
+        res = {
+            "success": True,
+            "numRows": total,
+            "data": show_users,
+            "next_cursor": page.next_cursor,
+            "prev_cursor": page.prev_cursor,
+        }
+        return list_response(res, user_schemas.ShowInfoUser)
+
+    def export_users(self, current_user: str) -> Select:
+        """Consulta para exportar los usuarios con los filtros del listado.
+
+        #? ENDPOINT /users/export GET
+
+        Args:
+            current_user (str): Id del usuario en sesion, no se exporta.
+
+        Returns:
+            Select: Consulta ordenada por (created_on, id) para stream_with_db
+        """
+        main.logger.info(msg="Users export started!", extra=extra)
+        return (
+            select(
+                Users.id,
+                Users.email,
+                Users.is_active,
+                Users.role_id,
+                Role.name.label("role_name"),
+            )
+            .join(Role, isouter=True)
+            .where(Role.name != "super admin")
+            .where(Users.id != current_user)
+            .where(Users.not_deleted())
+            .where(Role.not_deleted())
+            .order_by(Users.created_on, Users.id)
+        )
 
     def get_one_user(self, db: Session, id: UUID) -> JSONResponse:
         """Realizar la busqueda de un registro por su id.
@@ -225,8 +396,8 @@ class UsersActions:
             .join(Role, isouter=True)
             .filter(Users.id == id)
             .filter(Role.name != "super admin")
-            .filter(Users.is_deleted == false())
-            .filter(Role.is_deleted == false())
+            .filter(Users.not_deleted())
+            .filter(Role.not_deleted())
             .first()
         )
         if not user:
@@ -271,7 +442,7 @@ class UsersActions:
         """
         # Buscamos a un user por su id, este no debe de estar marcado como eliminado
         user = (
-            db.query(Users).filter(Users.id == id).filter_by(is_deleted=False).first()
+            db.query(Users).filter(Users.id == id).filter(Users.not_deleted()).first()
         )
         # Si no existe el user, devolvemos un error
         if not user:
@@ -285,7 +456,7 @@ class UsersActions:
         role_search = (
             db.query(Role)
             .filter(Role.id == request.role_id)
-            .filter(Role.is_deleted == false())
+            .filter(Role.not_deleted())
             .first()
         )
         if not role_search:
@@ -315,7 +486,9 @@ class UsersActions:
         user.updated_by = current_user
         user.updated_on = datetime.now()
         db.add(user)
+        publish_user_change(db, id)
         db.commit()
+        invalidate_user(id)
         main.logger.info(msg=f"User {id} is updated!", extra=extra)
         return JSONResponse(
             status_code=202,
@@ -347,7 +520,7 @@ class UsersActions:
         """
         is_d = True
 
-        user = db.query(Users).filter(Users.id == id).filter_by(is_deleted=False)
+        user = db.query(Users).filter(Users.id == id).filter(Users.not_deleted())
 
         if is_d is False:
             main.logger.info(
@@ -374,8 +547,10 @@ class UsersActions:
                 content={"success": False, "msg": "Not Found"},
             )
 
-        user.update({Users.is_deleted: is_d, Users.is_active: False})
+        user.update({**Users.deleted_values(), "is_active": False})
+        publish_user_change(db, id)
         db.commit()
+        invalidate_user(id)
         main.logger.info(msg=f"User {id} it's deleted!", extra=extra)
         return None
 
@@ -409,7 +584,7 @@ class UsersActions:
             En caso contrario nos mostrara la propiedad success y la propiedad msg.
         """
         # We need validate if the user exist
-        user = db.query(Users).filter(Users.id == id).filter_by(is_deleted=False)
+        user = db.query(Users).filter(Users.id == id).filter(Users.not_deleted())
 
         # If the user is a current user, return error
         if current_user == id.__str__():
@@ -440,6 +615,37 @@ class UsersActions:
             content={"success": True, "msg": "Updated password successfully"},
         )
 
+    def revoke_user_tokens(self, db: Session, id: UUID) -> JSONResponse:
+        """Revoca todos los tokens emitidos hasta ahora a un usuario.
+
+        Los tokens de acceso y de refresh anteriores dejan de aceptarse en
+        todos los workers, el usuario tiene que volver a hacer login.
+
+        #? ENDPOINT /users/{id}/revoke-tokens POST
+
+        Args:
+            db (Session): Session para realizar acciones con SQLALCHEMY.
+            id (UUID v4): ID del usuario.
+
+        Returns:
+            JSONResponse: Nos devuelve una respuesta en JSON con la propiedad success
+            y la propiedad msg con sus respectivos valores.
+        """
+        user = db.query(Users.id).filter(Users.id == id).first()
+        if not user:
+            main.logger.info(msg=f"User {id} not found!", extra=extra)
+            return JSONResponse(
+                status_code=status.HTTP_404_NOT_FOUND,
+                content={"success": False, "msg": "Not Found"},
+            )
+
+        token_revocations.revoke_user(db, id)
+        main.logger.info(msg=f"Tokens from user {id} revoked!", extra=extra)
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"success": True, "msg": "Tokens revoked successfully"},
+        )
+
     def update_my_password(
         self, db: Session, request: user_schemas.UpdatePassMe, current_user: str
     ) -> JSONResponse:
@@ -466,7 +672,7 @@ class UsersActions:
         user = (
             db.query(Users)
             .filter(Users.id == current_user)
-            .filter_by(is_deleted=False)
+            .filter(Users.not_deleted())
             .first()
         )
         if not user:
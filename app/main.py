@@ -1,30 +1,46 @@
+import atexit
 import logging
-
-from logging.handlers import RotatingFileHandler
+import queue
 
 from fastapi import FastAPI, Request
 from fastapi_another_jwt_auth import AuthJWT
 from fastapi_another_jwt_auth.exceptions import AuthJWTException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from decouple import config
 
 from app import models
-from app.database.main import engine
+from app.database.main import SessionLocal, engine
 from app.extras.custom_doc_openapi import custom_openapi
-from app.extras.custom_json_format import CustomJsonFormatter
+from app.extras.custom_json_format import CustomJsonFormatter, OrjsonEcsFormatter
+from app.extras.hashing import HashingPoolSaturated
+from app.extras.log_queue import (
+    BatchQueueListener,
+    BufferedRotatingFileHandler,
+    DroppingQueueHandler,
+)
+from app.extras.pagination import InvalidCursor
+from app.extras.prometheus import PrometheusMiddleware
+from app.internal.permission_version import permission_versions
+from app.internal.token_revocation import token_is_revoked, token_revocations
 from app.routers import auth, role_actions, users, roles, module, actions, profile
+from app.routers import metrics
 from app.schemas import schemas_config
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 ch = logging.StreamHandler()
 
-formatter = CustomJsonFormatter(
-    "%(@timestamp)s %(log.level)s %(log.logger)s %(message)s"
-)
+# LOG_FORMATTER=orjson genera los mismos campos que python-json-logger
+if config("LOG_FORMATTER", default="json") == "orjson":
+    formatter = OrjsonEcsFormatter()
+else:
+    formatter = CustomJsonFormatter(
+        "%(@timestamp)s %(log.level)s %(log.logger)s %(message)s"
+    )
 
 
-fh = RotatingFileHandler(
+fh = BufferedRotatingFileHandler(
     "log_app/log.json",
     mode="a",
     maxBytes=50 * 1024 * 1024,
@@ -35,7 +51,19 @@ fh = RotatingFileHandler(
 
 ch.setFormatter(formatter)
 fh.setFormatter(formatter)
-logger.addHandler(fh)  # Exporting logs to a file
+
+# Las peticiones solo encolan el registro, un hilo aparte escribe el archivo
+# en lotes. Si la cola se llena los registros se descartan y se cuentan.
+log_queue: queue.Queue = queue.Queue(
+    maxsize=config("LOG_QUEUE_SIZE", default=10000, cast=int)
+)
+qh = DroppingQueueHandler(log_queue)
+logger.addHandler(qh)  # Exporting logs to a file
+log_listener = BatchQueueListener(
+    log_queue, fh, batch_size=config("LOG_BATCH_SIZE", default=256, cast=int)
+)
+log_listener.start()
+atexit.register(log_listener.stop)
 
 settings = schemas_config.SettingsDoc()
 
@@ -64,6 +92,9 @@ def get_config():
     """Se obtiene la configuracion para JWT Auth la cual debe de regresar un objeto de tipo AuthJWTConfig"""
     return schemas_config.Settings()
 
+# Se revisa si el token fue revocado (logout) antes de aceptarlo
+AuthJWT.token_in_denylist_loader(token_is_revoked)
+
 
 @app.exception_handler(AuthJWTException)
 def authjwt_exception_handler(request: Request, exc: AuthJWTException):
@@ -79,9 +110,63 @@ def authjwt_exception_handler(request: Request, exc: AuthJWTException):
             }
     )
 
+@app.exception_handler(HashingPoolSaturated)
+def hashing_pool_saturated_handler(request: Request, exc: HashingPoolSaturated):
+    """
+    El pool de bcrypt esta lleno, se pide al cliente que reintente
+    Retorna un objeto JSON con el error y el header Retry-After
+    """
+    logger.warning(msg="Hashing pool is saturated")
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after)},
+        content={
+            "success": False,
+            "msg": "Service busy, try again later"
+            }
+    )
+
+@app.exception_handler(InvalidCursor)
+def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    """
+    El cursor de paginacion no es valido
+    Retorna un objeto JSON con el error
+    """
+    return JSONResponse(
+        status_code=400,
+        content={
+            "success": False,
+            "msg": "Invalid cursor"
+            }
+    )
+
 # Se genera la bd
 models.Base.metadata.create_all(bind=engine)
 
+@app.on_event("startup")
+def load_permission_versions():
+    """
+    Se carga la version de permisos de cada rol
+    Asi RoleChecker detecta tokens viejos sin consultar la BD
+    """
+    db = SessionLocal()
+    try:
+        permission_versions.load(db)
+    finally:
+        db.close()
+
+@app.on_event("startup")
+def load_token_revocations():
+    """
+    Se cargan los tokens revocados que no han expirado
+    Asi un token valido se acepta sin consultar la BD
+    """
+    db = SessionLocal()
+    try:
+        token_revocations.load(db)
+    finally:
+        db.close()
+
 # Se manean las rutas de cada modulo
 app.include_router(auth.router)
 app.include_router(profile.router)
@@ -90,3 +175,8 @@ app.include_router(roles.router)
 app.include_router(module.router)
 app.include_router(actions.router)
 app.include_router(role_actions.router)
+
+# Metricas del proceso, desactivalas con METRICS_ENABLED=False
+if config("METRICS_ENABLED", default=True, cast=bool):
+    app.add_middleware(PrometheusMiddleware)
+    app.include_router(metrics.router)
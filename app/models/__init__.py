@@ -5,3 +5,7 @@ from .module import *  # noqa
 from .role_actions import *  # noqa
 from .enable_uuid import *  # noqa
 from .actions_enum import *  # noqa
+from .cache_events import *  # noqa
+from .archive import *  # noqa
+from .revoked_tokens import *  # noqa
+from .token_watermarks import *  # noqa
@@ -1,12 +1,13 @@
 import datetime
 from uuid import uuid4
-from sqlalchemy import Column, ForeignKey, String, Boolean, DateTime
+from sqlalchemy import Column, Index, ForeignKey, String, Boolean, DateTime
 from sqlalchemy.orm import relationship
 from app.database.main import Base
 from app.models.enable_uuid import BinaryUUID
+from app.models.soft_delete import SoftDeleteMixin, deleted_at_default
 
 
-class Actions(Base):
+class Actions(Base, SoftDeleteMixin):
     """Declaracion de la tabla Actions.
 
     Args:
@@ -17,14 +18,26 @@ class Actions(Base):
     """
 
     __tablename__ = "actions"
+    __table_args__ = (
+        # Para paginar por cursor (created_on, id) solo sobre registros vivos
+        Index("ix_actions_deleted_at_created_on_id", "deleted_at", "created_on", "id"),
+        # Filtros por llave foranea + deleted_at
+        Index(
+            "ix_actions_module_id_deleted_at_is_active",
+            "module_id",
+            "deleted_at",
+            "is_active",
+        ),
+    )
 
-    id = Column(BinaryUUID, primary_key=True, default=uuid4, index=True)
+    id = Column(BinaryUUID, primary_key=True, default=uuid4)
     action_name = Column(String(200), nullable=False)
     is_active = Column(Boolean, nullable=False)
     description = Column(String(250), nullable=True)
     module_id = Column(BinaryUUID, ForeignKey("modules.id", onupdate="CASCADE"))
     actions_module = relationship("Module", back_populates="actions")
     is_deleted = Column(Boolean, nullable=True, default=False)
+    deleted_at = Column(DateTime, nullable=True, default=deleted_at_default)
     created_on = Column(DateTime, default=datetime.datetime.now, nullable=False)
     created_by = Column(BinaryUUID, nullable=True)
     updated_on = Column(DateTime, onupdate=datetime.datetime.now, nullable=True)
@@ -0,0 +1,54 @@
+import datetime
+from typing import Any, Dict
+
+from sqlalchemy import Column, DateTime, Index, Table
+
+from app.database.main import Base
+from app.models.actions import Actions
+from app.models.role_actions import Role_Actions
+from app.models.users import Users
+
+
+def archive_table(model: Any, *lookup: str) -> Table:
+    """Tabla historica con las mismas columnas que la tabla del modelo.
+
+    No lleva llaves foraneas ni unique para que los padres puedan seguir
+    cambiando y el mismo registro se pueda archivar mas de una vez. Se indexan
+    las columnas con las que los create_* buscan registros para restaurar.
+
+    Args:
+        model (Any): Modelo de SQLAlchemy
+        lookup (str): Columnas de busqueda para restaurar
+
+    Returns:
+        Table: Tabla <tabla>_archive
+    """
+    name = f"{model.__tablename__}_archive"
+    columns = [
+        Column(
+            column.name,
+            column.type,
+            primary_key=column.primary_key,
+            nullable=column.nullable,
+        )
+        for column in model.__table__.columns
+    ]
+    return Table(
+        name,
+        Base.metadata,
+        *columns,
+        Column("archived_on", DateTime, default=datetime.datetime.now, nullable=False),
+        Index(f"ix_{name}_{'_'.join(lookup)}", *lookup),
+    )
+
+
+users_archive = archive_table(Users, "email")
+actions_archive = archive_table(Actions, "module_id", "action_name")
+role_actions_archive = archive_table(Role_Actions, "role_id", "actions_id")
+
+# Modelo vivo -> tabla historica
+ARCHIVES: Dict[Any, Table] = {
+    Users: users_archive,
+    Actions: actions_archive,
+    Role_Actions: role_actions_archive,
+}
@@ -0,0 +1,36 @@
+import datetime
+from sqlalchemy import Column, Integer, String, DateTime
+from app.database.main import Base
+
+
+class Cache_Events(Base):
+    """Declaracion de la tabla Cache_Events.
+
+    Cada fila indica que una llave de un cache en memoria debe
+    invalidarse, asi todos los workers se enteran aunque el cambio
+    se haya hecho en otro proceso.
+
+    Args:
+        Base (_DeclarativeBase): Objeto de SQLalchemy
+
+    Returns:
+        str: Nos regresa string con la data
+    """
+
+    __tablename__ = "cache_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    cache = Column(String(50), nullable=False)
+    key = Column(String(200), nullable=False)
+    created_on = Column(
+        DateTime, default=datetime.datetime.now, nullable=False, index=True
+    )
+
+    def __repr__(self) -> str:
+        """Metodo representativo.
+
+        Returns:
+            str: String de la data que hemos filtrado
+        """
+        return f"<Cache_Events Info> | {self.id} | {self.cache} \
+            | {self.key} | {self.created_on}"
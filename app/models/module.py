@@ -1,12 +1,13 @@
 import datetime
 from uuid import uuid4
-from sqlalchemy import Column, String, Boolean, DateTime
+from sqlalchemy import Column, Index, String, Boolean, DateTime
 from sqlalchemy.orm import relationship
 from app.database.main import Base
 from app.models.enable_uuid import BinaryUUID
+from app.models.soft_delete import SoftDeleteMixin, deleted_at_default
 
 
-class Module(Base):
+class Module(Base, SoftDeleteMixin):
     """Declaracion de la tabla Module.
 
     Args:
@@ -17,12 +18,17 @@ class Module(Base):
     """
 
     __tablename__ = "modules"
+    # Para paginar por cursor (created_on, id)
+    __table_args__ = (
+        Index("ix_modules_deleted_at_created_on_id", "deleted_at", "created_on", "id"),
+    )
 
-    id = Column(BinaryUUID, primary_key=True, default=uuid4, index=True)
+    id = Column(BinaryUUID, primary_key=True, default=uuid4)
     name = Column(String(200), nullable=False, unique=True)
     description = Column(String(250), nullable=True)
     actions = relationship("Actions", back_populates="actions_module")
     is_deleted = Column(Boolean, nullable=True, default=False)
+    deleted_at = Column(DateTime, nullable=True, default=deleted_at_default)
     created_on = Column(DateTime, default=datetime.datetime.now, nullable=False)
     created_by = Column(BinaryUUID, nullable=True)
     updated_on = Column(DateTime, onupdate=datetime.datetime.now, nullable=True)
@@ -0,0 +1,35 @@
+import datetime
+from sqlalchemy import Column, String, DateTime
+from app.database.main import Base
+from app.models.enable_uuid import BinaryUUID
+
+
+class Revoked_Tokens(Base):
+    """Declaracion de la tabla Revoked_Tokens.
+
+    Cada fila es un token revocado por su jti. La fila solo se necesita
+    hasta expires_on, despues el token ya no pasa la validacion de exp
+    y se borra con la limpieza por TTL.
+
+    Args:
+        Base (_DeclarativeBase): Objeto de SQLalchemy
+
+    Returns:
+        str: Nos regresa string con la data
+    """
+
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(64), primary_key=True)
+    user_id = Column(BinaryUUID, nullable=True)
+    expires_on = Column(DateTime, nullable=False, index=True)
+    created_on = Column(DateTime, default=datetime.datetime.now, nullable=False)
+
+    def __repr__(self) -> str:
+        """Metodo representativo.
+
+        Returns:
+            str: String de la data que hemos filtrado
+        """
+        return f"<Revoked_Tokens Info> | {self.jti} | {self.user_id} \
+            | {self.expires_on} | {self.created_on}"
@@ -1,11 +1,12 @@
 import datetime
 from uuid import uuid4
-from sqlalchemy import Column, ForeignKey, Boolean, DateTime, String
+from sqlalchemy import Column, Index, ForeignKey, Boolean, DateTime, String
 from app.database.main import Base
 from app.models.enable_uuid import BinaryUUID
+from app.models.soft_delete import SoftDeleteMixin, deleted_at_default
 
 
-class Role_Actions(Base):
+class Role_Actions(Base, SoftDeleteMixin):
     """Declaracion de la tabla Role_Actions.
 
     Igual conocida como permisos.
@@ -18,12 +19,32 @@ class Role_Actions(Base):
     """
 
     __tablename__ = "role_actions"
-
-    id = Column(BinaryUUID, primary_key=True, default=uuid4, index=True)
+    __table_args__ = (
+        # Para paginar por cursor (created_on, id) solo sobre registros vivos
+        Index(
+            "ix_role_actions_deleted_at_created_on_id", "deleted_at", "created_on", "id"
+        ),
+        # Filtros por llave foranea + deleted_at
+        Index(
+            "ix_role_actions_role_id_deleted_at_actions_id",
+            "role_id",
+            "deleted_at",
+            "actions_id",
+        ),
+        Index(
+            "ix_role_actions_actions_id_deleted_at_role_id",
+            "actions_id",
+            "deleted_at",
+            "role_id",
+        ),
+    )
+
+    id = Column(BinaryUUID, primary_key=True, default=uuid4)
     role_id = Column(BinaryUUID, ForeignKey("roles.id", onupdate="CASCADE"))
     actions_id = Column(BinaryUUID, ForeignKey("actions.id", onupdate="CASCADE"))
     description = Column(String(250), nullable=True)
     is_deleted = Column(Boolean, nullable=True, default=False)
+    deleted_at = Column(DateTime, nullable=True, default=deleted_at_default)
     created_on = Column(DateTime, default=datetime.datetime.now, nullable=False)
     created_by = Column(BinaryUUID, nullable=True)
     updated_on = Column(DateTime, onupdate=datetime.datetime.now, nullable=True)
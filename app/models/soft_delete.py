@@ -0,0 +1,83 @@
+import datetime
+from typing import Any, Dict
+
+from decouple import config
+from sqlalchemy import event
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import attributes
+from sqlalchemy.sql.expression import false, true
+
+# timestamp: los registros vivos son los que tienen deleted_at en NULL, es la
+# columna que llevan los indices. flag: usa is_deleted como antes. En ambos
+# casos la columna deleted_at debe existir (migracion 09), flag solo cambia
+# la columna con la que se filtra.
+SOFT_DELETE_STRATEGY = config("SOFT_DELETE_STRATEGY", default="timestamp")
+
+
+class SoftDeleteMixin:
+    """Filtros del borrado logico para modelos con is_deleted y deleted_at.
+
+    Las dos columnas siempre se escriben juntas con deleted_values() y
+    restored_values(); las consultas usan not_deleted() y los registros ya
+    leidos soft_deleted, asi la estrategia se elige en un solo lugar.
+    """
+
+    @classmethod
+    def not_deleted(cls) -> Any:
+        """Filtro de los registros que no estan eliminados."""
+        if SOFT_DELETE_STRATEGY == "flag":
+            return cls.is_deleted == false()
+        return cls.deleted_at.is_(None)
+
+    @hybrid_property
+    def soft_deleted(self) -> bool:
+        """Indica si el registro esta eliminado, lo contrario de not_deleted().
+
+        En una consulta se selecciona como columna, por ejemplo
+        db.query(Users.id, Users.soft_deleted.label("soft_deleted")).
+        """
+        if SOFT_DELETE_STRATEGY == "flag":
+            return bool(self.is_deleted)
+        return self.deleted_at is not None
+
+    @soft_deleted.expression
+    def soft_deleted(cls) -> Any:
+        if SOFT_DELETE_STRATEGY == "flag":
+            return cls.is_deleted == true()
+        return cls.deleted_at.isnot(None)
+
+    @staticmethod
+    def deleted_values() -> Dict[str, Any]:
+        """Valores para marcar un registro como eliminado."""
+        return {"is_deleted": True, "deleted_at": datetime.datetime.now()}
+
+    @staticmethod
+    def restored_values() -> Dict[str, Any]:
+        """Valores para restaurar un registro eliminado."""
+        return {"is_deleted": False, "deleted_at": None}
+
+
+def deleted_at_default(context: Any) -> Any:
+    """Default de deleted_at: la fecha actual si el insert marca is_deleted.
+
+    Los seeds y el codigo anterior a la migracion 09 marcan is_deleted sin
+    deleted_at; sin esto el registro seria eliminado con flag y vivo con
+    timestamp. Es un default de columna y no un evento del mapper para que
+    tambien aplique a bulk_save_objects.
+    """
+    if context.get_current_parameters().get("is_deleted"):
+        return datetime.datetime.now()
+    return None
+
+
+@event.listens_for(SoftDeleteMixin, "before_update", propagate=True)
+def _sync_deleted_at(mapper: Any, connection: Any, target: Any) -> None:
+    """Sincroniza deleted_at cuando un update solo cambia is_deleted."""
+    if not attributes.get_history(target, "is_deleted")[0]:
+        return
+    if attributes.get_history(target, "deleted_at")[0]:
+        return
+    if target.is_deleted and target.deleted_at is None:
+        target.deleted_at = datetime.datetime.now()
+    elif not target.is_deleted and target.deleted_at is not None:
+        target.deleted_at = None
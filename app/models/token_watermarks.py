@@ -0,0 +1,35 @@
+import datetime
+from sqlalchemy import Column, DateTime
+from app.database.main import Base
+from app.models.enable_uuid import BinaryUUID
+
+
+class Token_Watermarks(Base):
+    """Declaracion de la tabla Token_Watermarks.
+
+    Los tokens de user_id emitidos antes de revoked_before se consideran
+    revocados, asi se cierran todas las sesiones de un usuario con una
+    sola fila. Despues de expires_on ya no queda ningun token afectado.
+
+    Args:
+        Base (_DeclarativeBase): Objeto de SQLalchemy
+
+    Returns:
+        str: Nos regresa string con la data
+    """
+
+    __tablename__ = "token_watermarks"
+
+    user_id = Column(BinaryUUID, primary_key=True)
+    revoked_before = Column(DateTime, nullable=False)
+    expires_on = Column(DateTime, nullable=False, index=True)
+    created_on = Column(DateTime, default=datetime.datetime.now, nullable=False)
+
+    def __repr__(self) -> str:
+        """Metodo representativo.
+
+        Returns:
+            str: String de la data que hemos filtrado
+        """
+        return f"<Token_Watermarks Info> | {self.user_id} \
+            | {self.revoked_before} | {self.expires_on}"
@@ -1,12 +1,13 @@
 import datetime
 from uuid import uuid4
-from sqlalchemy import Column, ForeignKey, String, Boolean, DateTime
+from sqlalchemy import Column, Index, ForeignKey, String, Boolean, DateTime
 from sqlalchemy.orm import relationship
 from app.database.main import Base
 from app.models.enable_uuid import BinaryUUID
+from app.models.soft_delete import SoftDeleteMixin, deleted_at_default
 
 
-class Users(Base):
+class Users(Base, SoftDeleteMixin):
     """Declaracion de la tabla Users.
 
     Args:
@@ -17,8 +18,14 @@ class Users(Base):
     """
 
     __tablename__ = "users"
+    __table_args__ = (
+        # Para paginar por cursor (created_on, id) solo sobre registros vivos
+        Index("ix_users_deleted_at_created_on_id", "deleted_at", "created_on", "id"),
+        # Filtros por llave foranea + deleted_at
+        Index("ix_users_role_id_deleted_at", "role_id", "deleted_at"),
+    )
 
-    id = Column(BinaryUUID, primary_key=True, default=uuid4, index=True)
+    id = Column(BinaryUUID, primary_key=True, default=uuid4)
     email = Column(String(200), nullable=False, unique=True)
     password = Column(String(200), nullable=False)
     is_active = Column(Boolean, nullable=False, default=True)
@@ -30,6 +37,7 @@ class Users(Base):
     role_assigned = relationship("Role", back_populates="user_assigned")
 
     is_deleted = Column(Boolean, nullable=True, default=False)
+    deleted_at = Column(DateTime, nullable=True, default=deleted_at_default)
     created_on = Column(DateTime, default=datetime.datetime.now, nullable=False)
     created_by = Column(BinaryUUID, nullable=True)
     updated_on = Column(DateTime, onupdate=datetime.datetime.now, nullable=True)
@@ -1,18 +1,19 @@
 from typing import Optional, Union
 from uuid import UUID
 
-from fastapi import APIRouter, status, Depends, Response
-from fastapi.responses import JSONResponse
-from fastapi_another_jwt_auth import AuthJWT
+from fastapi import APIRouter, status, Depends, Query, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.dependencies.data_conexion import get_db
+from app.dependencies.data_conexion import get_db, run_with_db, stream_with_db
 from app.dependencies.permissions_policy import (
     actions_create,
     actions_read,
     actions_update,
     actions_delete,
 )
+from app.dependencies.token_claims import TokenClaims, get_token_claims
+from app.extras.export import EXPORT_BATCH_SIZE, ExportFormat, export_response
 from app.internal.actions import ActionsOperations
 from app.schemas import action_schemas
 from app.schemas import schemas_config
@@ -36,7 +37,7 @@ router = APIRouter(
 async def create_action(
     request: action_schemas.ActionCreate,
     db: Session = Depends(get_db),
-    Authorize: AuthJWT = Depends(),
+    claims: TokenClaims = Depends(get_token_claims),
 ) -> JSONResponse:
     """**Create Action Role**.
 
@@ -66,9 +67,10 @@ async def create_action(
     - **status code** -> 201
 
     """
-    Authorize.jwt_required()
-    current_user = Authorize.get_jwt_subject()
-    return ActionsOperations().create_new_action(db, current_user, request)
+    current_user = claims.subject
+    return await run_with_db(
+        db, ActionsOperations().create_new_action, current_user, request
+    )
 
 
 @router.get(
@@ -79,10 +81,12 @@ async def create_action(
     summary="Get All Actions",
 )
 async def all_actions(
-    Authorize: AuthJWT = Depends(),
+    claims: TokenClaims = Depends(get_token_claims),
     db: Session = Depends(get_db),
     start: Union[int, None] = None,
     limit: Union[int, None] = None,
+    cursor: Union[str, None] = None,
+    approximate: bool = False,
 ) -> JSONResponse:
     """**Get a list of Actions**.
 
@@ -99,6 +103,10 @@ async def all_actions(
     **Query Parameters**:
     - ***start*** is a initial value from start to show
     - ***limit*** is the end of the values to show
+    - ***cursor*** next_cursor or prev_cursor from a previous response,
+     paginates by (created_on, id) instead of start
+    - ***approximate*** numRows from table statistics instead of COUNT,
+     faster on big tables but ignores filters
 
 
     *Returns*
@@ -107,8 +115,45 @@ async def all_actions(
     - **status code** -> 200
 
     """
-    Authorize.jwt_required()
-    return ActionsOperations().get_all_actions(db, start, limit)
+    return await run_with_db(
+        db, ActionsOperations().get_all_actions, start, limit, cursor, approximate
+    )
+
+
+@router.get(
+    "/export",
+    dependencies=[Depends(actions_read)],
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    summary="Export Actions",
+)
+async def export_actions(
+    db: Session = Depends(get_db),
+    fmt: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+) -> StreamingResponse:
+    """**Export Actions**.
+
+    Download all the actions as NDJSON or CSV
+
+    - This Endpoint streams the records in blocks read with a
+     server side cursor, memory does not grow with the number of rows.
+    - Users can access when the role is assigned
+     permission **read** to the module **actions**.
+
+    **Parameters** :
+    - Access Token
+
+    **Query Parameters**:
+    - ***format*** ndjson (default) or csv (Optional)
+
+    *Return*
+    - file: one record per line with: id (UUDI Format), action_name, description, is_active, module_id, module_name.
+    - **status code** -> 200
+
+    """
+    statement = ActionsOperations().export_actions()
+    partitions = stream_with_db(db, statement, EXPORT_BATCH_SIZE)
+    return export_response(partitions, action_schemas.ShowActionInfo, fmt, "actions")
 
 
 @router.get(
@@ -119,7 +164,9 @@ async def all_actions(
     summary="Get Specific Action by id",
 )
 async def get_action(
-    id: UUID, db: Session = Depends(get_db), Authorize: AuthJWT = Depends()
+    id: UUID,
+    db: Session = Depends(get_db),
+    claims: TokenClaims = Depends(get_token_claims),
 ) -> JSONResponse:
     """**Get One Action**.
 
@@ -142,8 +189,7 @@ async def get_action(
     - **status code** -> 200
 
     """
-    Authorize.jwt_required()
-    return ActionsOperations().get_one_action(db, id)
+    return await run_with_db(db, ActionsOperations().get_one_action, id)
 
 
 @router.put(
@@ -157,7 +203,7 @@ async def update_action(
     request: action_schemas.UpdateAction,
     id: UUID,
     db: Session = Depends(get_db),
-    Authorize: AuthJWT = Depends(),
+    claims: TokenClaims = Depends(get_token_claims),
 ) -> JSONResponse:
     """***Update Action***.
 
@@ -187,9 +233,10 @@ async def update_action(
     - **status code** -> 202
 
     """
-    Authorize.jwt_required()
-    current_user = Authorize.get_jwt_subject()
-    return ActionsOperations().update_action_info(db, id, request, current_user)
+    current_user = claims.subject
+    return await run_with_db(
+        db, ActionsOperations().update_action_info, id, request, current_user
+    )
 
 
 @router.delete(
@@ -200,7 +247,9 @@ async def update_action(
     summary="Delete specific Action using user id",
 )
 async def delete_action(
-    id: UUID, db: Session = Depends(get_db), Authorize: AuthJWT = Depends()
+    id: UUID,
+    db: Session = Depends(get_db),
+    claims: TokenClaims = Depends(get_token_claims),
 ) -> Optional[JSONResponse]:
     """***Delete Action***.
 
@@ -220,5 +269,4 @@ async def delete_action(
     - **status code** -> 204
 
     """
-    Authorize.jwt_required()
-    return ActionsOperations().delete_one_action(db, id)
+    return await run_with_db(db, ActionsOperations().delete_one_action, id)
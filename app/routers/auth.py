@@ -4,7 +4,8 @@ from fastapi_another_jwt_auth import AuthJWT
 from sqlalchemy.orm import Session
 
 
-from app.dependencies.data_conexion import get_db
+from app.dependencies.data_conexion import get_db, run_with_db
+from app.dependencies.token_claims import TokenClaims, get_token_claims
 from app.internal.auth import AuthActions
 from app.schemas import auth_schemas, schemas_config, responses_schemas
 
@@ -55,7 +56,9 @@ async def user_login(
     - **status code** -> 200
 
     """
-    return AuthActions().user_login(request, db, Authorize)
+    return await run_with_db(
+        db, lambda session: AuthActions().user_login(request, session, Authorize)
+    )
 
 
 @router.get(
@@ -94,4 +97,60 @@ async def refresh_token(
     - **status code** -> 200
 
     """
-    return AuthActions().refresh_token(db, Authorize)
+    return await run_with_db(db, AuthActions().refresh_token, Authorize)
+
+
+@router.post(
+    "/logout",
+    status_code=status.HTTP_200_OK,
+    responses={200: {"model": schemas_config.GoodMessage}},
+    response_model=schemas_config.GoodMessage,
+    summary="Revoke the token in session",
+)
+async def logout(
+    db: Session = Depends(get_db), Authorize: AuthJWT = Depends()
+) -> JSONResponse:
+    """**Logout**.
+
+    Revoke the token sent in the header.
+
+    - Accepts the access token or the refresh token, call it
+     with both to close the session completely.
+    - A revoked token is rejected until it expires.
+
+    **Parameters**:
+    - Access token or refresh token
+
+    *Return*:
+    - **JSON Response** -> string message
+    - **status code** -> 200
+
+    """
+    return await run_with_db(db, AuthActions().logout, Authorize)
+
+
+@router.post(
+    "/logout/all",
+    status_code=status.HTTP_200_OK,
+    responses={200: {"model": schemas_config.GoodMessage}},
+    response_model=schemas_config.GoodMessage,
+    summary="Revoke every token of the user in session",
+)
+async def logout_all(
+    db: Session = Depends(get_db),
+    claims: TokenClaims = Depends(get_token_claims),
+) -> JSONResponse:
+    """**Logout from all sessions**.
+
+    Revoke every access and refresh token issued to the user
+     in session until now, in every device.
+
+    **Parameters**:
+    - Access Token
+
+    *Return*:
+    - **JSON Response** -> string message
+    - **status code** -> 200
+
+    """
+    return await run_with_db(db, AuthActions().logout_all, claims.subject)
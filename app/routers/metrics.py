@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from app.dependencies.metrics_access import metrics_access
+from app.internal.metrics import pool_stats, prometheus_text
+
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Metrics"],
+    dependencies=[Depends(metrics_access)],
+)
+
+
+@router.get(
+    "",
+    status_code=status.HTTP_200_OK,
+    response_class=PlainTextResponse,
+    summary="Prometheus metrics",
+)
+async def prometheus_metrics() -> PlainTextResponse:
+    """**Prometheus Metrics**.
+
+    Metrics of this worker process in the Prometheus text format.
+
+    - Per route (method + path template): latency histogram,
+     in-flight requests, responses by status code, DB queries
+     per request and DB time.
+    - Connection pool, bcrypt pool and cache metrics.
+
+    ***Important Note***
+    - With **METRICS_TOKEN** set, send `Authorization: Bearer <token>`.
+    - Without it, only requests from localhost are answered.
+
+    *Return*:
+    - **text/plain** -> metrics
+    - **status code** -> 200
+
+    """
+    return PlainTextResponse(prometheus_text(), media_type="text/plain; version=0.0.4")
+
+
+@router.get(
+    "/pool",
+    status_code=status.HTTP_200_OK,
+    summary="Connection pool and cache metrics",
+)
+async def pool_metrics() -> JSONResponse:
+    """**Pool Metrics**.
+
+    Current state of the pools of this worker process.
+
+    - **database**: size, in_use, idle, overflow, timeouts and
+     a checkout latency histogram (seconds).
+    - **hashing**: bcrypt worker pool.
+    - **caches**: hits, misses and size of the in-memory caches.
+    - **logging**: records waiting in the log queue and dropped records.
+
+    ***Important Note***
+    - Same access rules as **/metrics**.
+
+    *Return*:
+    - **JSON Response** -> metrics
+    - **status code** -> 200
+
+    """
+    return JSONResponse(content={"success": True, "data": pool_stats()})
@@ -4,17 +4,17 @@ from uuid import UUID
 
 from fastapi import APIRouter, status, Depends, Response
 from fastapi.responses import JSONResponse
-from fastapi_another_jwt_auth import AuthJWT
 from sqlalchemy.orm import Session
 
 
-from app.dependencies.data_conexion import get_db
+from app.dependencies.data_conexion import get_db, run_with_db
 from app.dependencies.permissions_policy import (
     modules_create,
     modules_read,
     modules_update,
     modules_delete,
 )
+from app.dependencies.token_claims import TokenClaims, get_token_claims
 from app.internal.module import ModuleActions
 from app.schemas import schemas_config, module_schemas
 from app.schemas.responses_schemas import responses
@@ -37,7 +37,7 @@ router = APIRouter(
 async def create_module(
     request: module_schemas.ModuleCreate,
     db: Session = Depends(get_db),
-    Authorize: AuthJWT = Depends(),
+    claims: TokenClaims = Depends(get_token_claims),
 ) -> JSONResponse:
     """**Create Module**.
 
@@ -63,9 +63,8 @@ async def create_module(
     - **status code** -> 201
 
     """
-    Authorize.jwt_required()
-    current_user = Authorize.get_jwt_subject()
-    return ModuleActions().create_module(db, request, current_user)
+    current_user = claims.subject
+    return await run_with_db(db, ModuleActions().create_module, request, current_user)
 
 
 @router.get(
@@ -76,10 +75,12 @@ async def create_module(
     summary="Get All Modules",
 )
 async def all_modules(
-    Authorize: AuthJWT = Depends(),
+    claims: TokenClaims = Depends(get_token_claims),
     db: Session = Depends(get_db),
     start: Union[int, None] = None,
     limit: Union[int, None] = None,
+    cursor: Union[str, None] = None,
+    approximate: bool = False,
 ) -> JSONResponse:
     """**Get a list of Modules**.
 
@@ -96,6 +97,10 @@ async def all_modules(
     **Query Parameters**:
     - ***start*** is a initial value from start to show
     - ***limit*** is the end of the values to show
+    - ***cursor*** next_cursor or prev_cursor from a previous response,
+     paginates by (created_on, id) instead of start
+    - ***approximate*** numRows from table statistics instead of COUNT,
+     faster on big tables but ignores filters
 
     *Returns*
     - module: **ShowModules**  -> A ShowActions model
@@ -103,8 +108,9 @@ async def all_modules(
     - **status code** -> 200
 
     """
-    Authorize.jwt_required()
-    return ModuleActions().get_all_modules(db, start, limit)
+    return await run_with_db(
+        db, ModuleActions().get_all_modules, start, limit, cursor, approximate
+    )
 
 
 @router.get(
@@ -115,7 +121,9 @@ async def all_modules(
     summary="Get Specific Module by id",
 )
 async def get_module(
-    id: UUID, db: Session = Depends(get_db), Authorize: AuthJWT = Depends()
+    id: UUID,
+    db: Session = Depends(get_db),
+    claims: TokenClaims = Depends(get_token_claims),
 ) -> JSONResponse:
     """**Get one Module**.
 
@@ -138,8 +146,7 @@ async def get_module(
     - **status code** -> 200
 
     """
-    Authorize.jwt_required()
-    return ModuleActions().get_one_module(db, id)
+    return await run_with_db(db, ModuleActions().get_one_module, id)
 
 
 @router.put(
@@ -153,7 +160,7 @@ async def update_module(
     request: module_schemas.UpdateModule,
     id: UUID,
     db: Session = Depends(get_db),
-    Authorize: AuthJWT = Depends(),
+    claims: TokenClaims = Depends(get_token_claims),
 ) -> JSONResponse:
     """***Update Module***.
 
@@ -178,9 +185,10 @@ async def update_module(
     - **status code** -> 202
 
     """
-    Authorize.jwt_required()
-    current_user = Authorize.get_jwt_subject()
-    return ModuleActions().update_module_info(db, id, request, current_user)
+    current_user = claims.subject
+    return await run_with_db(
+        db, ModuleActions().update_module_info, id, request, current_user
+    )
 
 
 @router.delete(
@@ -191,7 +199,9 @@ async def update_module(
     summary="Delete specific Module using user id",
 )
 async def delete_module(
-    id: UUID, db: Session = Depends(get_db), Authorize: AuthJWT = Depends()
+    id: UUID,
+    db: Session = Depends(get_db),
+    claims: TokenClaims = Depends(get_token_claims),
 ) -> Optional[JSONResponse]:
     """***Delete Module***.
 
@@ -215,8 +225,7 @@ async def delete_module(
     - **status code** -> 204
 
     """
-    Authorize.jwt_required()
-    return ModuleActions().deleted_one_module(db, id)
+    return await run_with_db(db, ModuleActions().deleted_one_module, id)
 
 
 @router.get(
@@ -231,7 +240,7 @@ async def show_module_with_actions(
     db: Session = Depends(get_db),
     start: Union[int, None] = None,
     limit: Union[int, None] = None,
-    Authorize: AuthJWT = Depends(),
+    claims: TokenClaims = Depends(get_token_claims),
 ) -> JSONResponse:
     """***Show actions assigned to a module ***.
 
@@ -259,5 +268,6 @@ async def show_module_with_actions(
     - **status code** -> 200
 
     """
-    Authorize.jwt_required()
-    return ModuleActions().show_module_with_action(db, id, start, limit)
+    return await run_with_db(
+        db, ModuleActions().show_module_with_action, id, start, limit
+    )
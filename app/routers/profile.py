@@ -1,10 +1,10 @@
 from fastapi import APIRouter, status, Depends
 from fastapi.responses import JSONResponse
-from fastapi_another_jwt_auth import AuthJWT
 from sqlalchemy.orm import Session
 
-from app.dependencies.data_conexion import get_db
+from app.dependencies.data_conexion import get_db, run_with_db
 from app.dependencies.verify_user import require_user
+from app.dependencies.token_claims import TokenClaims, get_token_claims
 from app.internal.users import UsersActions
 from app.schemas import schemas_config, user_schemas
 from app.schemas.responses_schemas import responses
@@ -26,7 +26,7 @@ router = APIRouter(
 )
 async def get_current_user_profile(
     db: Session = Depends(get_db),
-    Authorize: AuthJWT = Depends(),
+    claims: TokenClaims = Depends(get_token_claims),
 ) -> JSONResponse:
     """**Get Current User Profile**.
 
@@ -49,9 +49,8 @@ async def get_current_user_profile(
     - **status code** -> 200
 
     """
-    Authorize.jwt_required()
-    current_user = Authorize.get_jwt_subject()
-    return UsersActions().current_user_profile(db, current_user)
+    current_user = claims.subject
+    return await run_with_db(db, UsersActions().current_user_profile, current_user)
 
 
 @router.patch(
@@ -63,7 +62,7 @@ async def get_current_user_profile(
 async def update_me_password(
     request: user_schemas.UpdatePassMe,
     db: Session = Depends(get_db),
-    Authorize: AuthJWT = Depends(),
+    claims: TokenClaims = Depends(get_token_claims),
 ) -> JSONResponse:
     """**Update Password**.
 
@@ -86,6 +85,7 @@ async def update_me_password(
     - **status code** -> 202
 
     """
-    Authorize.jwt_required()
-    current_user = Authorize.get_jwt_subject()
-    return UsersActions().update_my_password(db, request, current_user)
+    current_user = claims.subject
+    return await run_with_db(
+        db, UsersActions().update_my_password, request, current_user
+    )
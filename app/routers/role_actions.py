@@ -2,19 +2,20 @@ from typing import Optional, Union
 from uuid import UUID
 
 
-from fastapi import APIRouter, status, Depends, Response
-from fastapi.responses import JSONResponse
-from fastapi_another_jwt_auth import AuthJWT
+from fastapi import APIRouter, status, Depends, Query, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
 
-from app.dependencies.data_conexion import get_db
+from app.dependencies.data_conexion import get_db, run_with_db, stream_with_db
 from app.dependencies.permissions_policy import (
     permissions_create,
     permissions_read,
     permissions_update,
     permissions_delete,
 )
+from app.dependencies.token_claims import TokenClaims, get_token_claims
+from app.extras.export import EXPORT_BATCH_SIZE, ExportFormat, export_response
 from app.internal.role_action import RoleActions
 from app.schemas import schemas_config
 from app.schemas import role_actions_schemas
@@ -37,9 +38,11 @@ router = APIRouter(
 )
 async def show_all(
     db: Session = Depends(get_db),
-    Authorize: AuthJWT = Depends(),
+    claims: TokenClaims = Depends(get_token_claims),
     start: Union[int, None] = None,
     limit: Union[int, None] = None,
+    cursor: Union[str, None] = None,
+    approximate: bool = False,
 ) -> JSONResponse:
     """**Get a list Role Actions**.
 
@@ -56,6 +59,10 @@ async def show_all(
     **Query Parameters**:
     - ***start*** is a initial value from start to show
     - ***limit*** is the end of the values to show
+    - ***cursor*** next_cursor or prev_cursor from a previous response,
+     paginates by (created_on, id) instead of start
+    - ***approximate*** numRows from table statistics instead of COUNT,
+     faster on big tables but ignores filters
 
     *Return*
     - Role-Actions: **ShowRoleActions** -> A ShowRoleActions model
@@ -64,8 +71,47 @@ async def show_all(
     - **status code** -> 200
 
     """
-    Authorize.jwt_required()
-    return RoleActions().show_all_actions_assigned(db, start, limit)
+    return await run_with_db(
+        db, RoleActions().show_all_actions_assigned, start, limit, cursor, approximate
+    )
+
+
+@router.get(
+    "/export",
+    dependencies=[Depends(permissions_read)],
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    summary="Export Role Actions",
+)
+async def export_permissions(
+    db: Session = Depends(get_db),
+    fmt: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+) -> StreamingResponse:
+    """**Export Role Actions**.
+
+    Download all the role actions as NDJSON or CSV
+
+    - This Endpoint streams the records in blocks read with a
+     server side cursor, memory does not grow with the number of rows.
+    - Users can access when the role is assigned
+     permission **read** to the module **permissions**.
+
+    **Parameters** :
+    - Access Token
+
+    **Query Parameters**:
+    - ***format*** ndjson (default) or csv (Optional)
+
+    *Return*
+    - file: one record per line with: id (UUDI Format), actions_id, role_id, description.
+    - **status code** -> 200
+
+    """
+    statement = RoleActions().export_actions_assigned()
+    partitions = stream_with_db(db, statement, EXPORT_BATCH_SIZE)
+    return export_response(
+        partitions, role_actions_schemas.ShowRoleActionInfo, fmt, "permissions"
+    )
 
 
 @router.get(
@@ -76,7 +122,9 @@ async def show_all(
     summary="Show one register filter by ID",
 )
 async def show_one(
-    id: UUID, db: Session = Depends(get_db), Authorize: AuthJWT = Depends()
+    id: UUID,
+    db: Session = Depends(get_db),
+    claims: TokenClaims = Depends(get_token_claims),
 ) -> JSONResponse:
     """**Get one Role Action registry**.
 
@@ -100,8 +148,7 @@ async def show_one(
     - **status code** -> 200
 
     """
-    Authorize.jwt_required()
-    return RoleActions().show_one_role_action(db, id)
+    return await run_with_db(db, RoleActions().show_one_role_action, id)
 
 
 @router.post(
@@ -114,7 +161,7 @@ async def show_one(
 async def assing_actions_to_role(
     request: role_actions_schemas.assigned_action,
     db: Session = Depends(get_db),
-    Authorize: AuthJWT = Depends(),
+    claims: TokenClaims = Depends(get_token_claims),
 ) -> JSONResponse:
     """**Assing Action to a Role**.
 
@@ -143,9 +190,57 @@ async def assing_actions_to_role(
     - **status code** -> 201
 
     """
-    Authorize.jwt_required()
-    current_user = Authorize.get_jwt_subject()
-    return RoleActions().assing_role_and_actions(db, request, current_user)
+    current_user = claims.subject
+    return await run_with_db(
+        db, RoleActions().assing_role_and_actions, request, current_user
+    )
+
+
+@router.post(
+    "/bulk",
+    dependencies=[Depends(permissions_create), Depends(permissions_delete)],
+    status_code=status.HTTP_200_OK,
+    response_model=role_actions_schemas.BulkAssignedReport,
+    summary="Assign and revoke actions of a role in bulk",
+)
+async def assing_actions_bulk(
+    request: role_actions_schemas.bulk_assigned_actions,
+    db: Session = Depends(get_db),
+    claims: TokenClaims = Depends(get_token_claims),
+) -> JSONResponse:
+    """**Assign and revoke actions of a Role in bulk**.
+
+    Assign and revoke many actions of a role in one transaction.
+
+    - This path operation compares the request with the current
+     actions of the role and only inserts, restores or revokes
+     the difference.
+    - Users can access when the role is assigned
+     to permission **create** and **delete** to the module **permissions**.
+
+    ***Important Note***
+    - With replace in true, actions_id is the full set of actions
+     of the role and every other action is revoked.
+    - Deleted or unknown actions are returned in invalid.
+
+    ***Parameters***:
+    - Access Token
+
+    **Request body parameter**:
+    - role-actions: **bulk_assigned_actions** -> A model with
+    role_id (UUDI Format), actions_id (list), revoke_id (list),
+    replace and description (Optional).
+
+    *Return*:
+    - report: **BulkAssignedReport** -> ids of the actions assigned,
+     restored, revoked, unchanged and invalid.
+    - **status code** -> 200
+
+    """
+    current_user = claims.subject
+    return await run_with_db(
+        db, RoleActions().assing_actions_bulk, request, current_user
+    )
 
 
 @router.put(
@@ -159,7 +254,7 @@ async def update_description(
     id: UUID,
     request: role_actions_schemas.update_assigned_action_desc,
     db: Session = Depends(get_db),
-    Authorize: AuthJWT = Depends(),
+    claims: TokenClaims = Depends(get_token_claims),
 ) -> JSONResponse:
     """**Update description in permission**.
 
@@ -181,9 +276,10 @@ async def update_description(
     - **status code** -> 202
 
     """
-    Authorize.jwt_required()
-    current_user = Authorize.get_jwt_subject()
-    return RoleActions().update_description(db, id, request, current_user)
+    current_user = claims.subject
+    return await run_with_db(
+        db, RoleActions().update_description, id, request, current_user
+    )
 
 
 @router.delete(
@@ -194,7 +290,9 @@ async def update_description(
     summary="Delete a action to a role",
 )
 async def unassing_actions_to_role(
-    id: UUID, db: Session = Depends(get_db), Authorize: AuthJWT = Depends()
+    id: UUID,
+    db: Session = Depends(get_db),
+    claims: TokenClaims = Depends(get_token_claims),
 ) -> Optional[JSONResponse]:
     """**Delete actions to role**.
 
@@ -214,6 +312,7 @@ async def unassing_actions_to_role(
     - **status code** -> 204
 
     """
-    Authorize.jwt_required()
-    current_user = Authorize.get_jwt_subject()
-    return RoleActions().deleted_assing_role_and_actions(db, id, current_user)
+    current_user = claims.subject
+    return await run_with_db(
+        db, RoleActions().deleted_assing_role_and_actions, id, current_user
+    )
@@ -2,19 +2,20 @@ from typing import Optional, Union
 from uuid import UUID
 
 
-from fastapi import APIRouter, status, Depends, Response
-from fastapi.responses import JSONResponse
-from fastapi_another_jwt_auth import AuthJWT
+from fastapi import APIRouter, status, Depends, Query, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
 
-from app.dependencies.data_conexion import get_db
+from app.dependencies.data_conexion import get_db, run_with_db, stream_with_db
 from app.dependencies.permissions_policy import (
     roles_create,
     roles_read,
     roles_update,
     roles_delete,
 )
+from app.dependencies.token_claims import TokenClaims, get_token_claims
+from app.extras.export import EXPORT_BATCH_SIZE, ExportFormat, export_response
 from app.internal.roles import RoleActions
 from app.schemas import schemas_config, role_schemas
 from app.schemas.responses_schemas import responses
@@ -37,7 +38,7 @@ router = APIRouter(
 async def create_role(
     request: role_schemas.RoleCreate,
     db: Session = Depends(get_db),
-    Authorize: AuthJWT = Depends(),
+    claims: TokenClaims = Depends(get_token_claims),
 ) -> JSONResponse:
     """**Create new Role**.
 
@@ -63,9 +64,8 @@ async def create_role(
     - **status code** -> 201
 
     """
-    Authorize.jwt_required()
-    current_user = Authorize.get_jwt_subject()
-    return RoleActions().create_new_role(db, request, current_user)
+    current_user = claims.subject
+    return await run_with_db(db, RoleActions().create_new_role, request, current_user)
 
 
 @router.get(
@@ -76,10 +76,12 @@ async def create_role(
     summary="Get All Roles",
 )
 async def all_roles(
-    Authorize: AuthJWT = Depends(),
+    claims: TokenClaims = Depends(get_token_claims),
     db: Session = Depends(get_db),
     start: Union[int, None] = None,
     limit: Union[int, None] = None,
+    cursor: Union[str, None] = None,
+    approximate: bool = False,
 ) -> JSONResponse:
     """**Get a list of Roles**.
 
@@ -96,6 +98,10 @@ async def all_roles(
     **Query Parameters**:
     - ***start*** is a initial value from start to show
     - ***limit*** is the end of the values to show
+    - ***cursor*** next_cursor or prev_cursor from a previous response,
+     paginates by (created_on, id) instead of start
+    - ***approximate*** numRows from table statistics instead of COUNT,
+     faster on big tables but ignores filters
 
     *Returns*
     - role: **ShowRoles**  -> A ShowActions model
@@ -103,8 +109,45 @@ async def all_roles(
     - **status code** -> 200
 
     """
-    Authorize.jwt_required()
-    return RoleActions().get_all_roles(db, start, limit)
+    return await run_with_db(
+        db, RoleActions().get_all_roles, start, limit, cursor, approximate
+    )
+
+
+@router.get(
+    "/export",
+    dependencies=[Depends(roles_read)],
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    summary="Export Roles",
+)
+async def export_roles(
+    db: Session = Depends(get_db),
+    fmt: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+) -> StreamingResponse:
+    """**Export Roles**.
+
+    Download all the roles as NDJSON or CSV
+
+    - This Endpoint streams the records in blocks read with a
+     server side cursor, memory does not grow with the number of rows.
+    - Users can access when the role is assigned
+     permission **read** to the module **roles**.
+
+    **Parameters** :
+    - Access Token
+
+    **Query Parameters**:
+    - ***format*** ndjson (default) or csv (Optional)
+
+    *Return*
+    - file: one record per line with: id (UUDI Format), name, description.
+    - **status code** -> 200
+
+    """
+    statement = RoleActions().export_roles()
+    partitions = stream_with_db(db, statement, EXPORT_BATCH_SIZE)
+    return export_response(partitions, role_schemas.ShowRoleInfo, fmt, "roles")
 
 
 @router.get(
@@ -116,7 +159,9 @@ async def all_roles(
     summary="Get Specific Role by id",
 )
 async def show_role(
-    id: UUID, db: Session = Depends(get_db), Authorize: AuthJWT = Depends()
+    id: UUID,
+    db: Session = Depends(get_db),
+    claims: TokenClaims = Depends(get_token_claims),
 ) -> JSONResponse:
     """**Get one Role**.
 
@@ -137,8 +182,7 @@ async def show_role(
     - **status code** -> 200
 
     """
-    Authorize.jwt_required()
-    return RoleActions().get_one_role(db, id)
+    return await run_with_db(db, RoleActions().get_one_role, id)
 
 
 @router.put(
@@ -152,7 +196,7 @@ async def update_role(
     request: role_schemas.UpdateRole,
     id: UUID,
     db: Session = Depends(get_db),
-    Authorize: AuthJWT = Depends(),
+    claims: TokenClaims = Depends(get_token_claims),
 ) -> JSONResponse:
     """***Update Role***.
 
@@ -178,9 +222,10 @@ async def update_role(
     - **status code** -> 202
 
     """
-    Authorize.jwt_required()
-    current_user = Authorize.get_jwt_subject()
-    return RoleActions().update_role_info(db, id, request, current_user)
+    current_user = claims.subject
+    return await run_with_db(
+        db, RoleActions().update_role_info, id, request, current_user
+    )
 
 
 @router.delete(
@@ -191,7 +236,9 @@ async def update_role(
     summary="Delete specific Role using user id",
 )
 async def delete_role(
-    id: UUID, db: Session = Depends(get_db), Authorize: AuthJWT = Depends()
+    id: UUID,
+    db: Session = Depends(get_db),
+    claims: TokenClaims = Depends(get_token_claims),
 ) -> Optional[JSONResponse]:
     """***Delete Role***.
 
@@ -213,8 +260,7 @@ async def delete_role(
     - **status code** -> 204
 
     """
-    Authorize.jwt_required()
-    return RoleActions().delete_one_role(db, id)
+    return await run_with_db(db, RoleActions().delete_one_role, id)
 
 
 @router.get(
@@ -229,7 +275,7 @@ async def show_role_with_users(
     db: Session = Depends(get_db),
     start: Union[int, None] = None,
     limit: Union[int, None] = None,
-    Authorize: AuthJWT = Depends(),
+    claims: TokenClaims = Depends(get_token_claims),
 ) -> JSONResponse:
     """***Show a role with the users***.
 
@@ -258,8 +304,7 @@ async def show_role_with_users(
     - **status code** -> 200
 
     """
-    Authorize.jwt_required()
-    return RoleActions().show_role_with_users(db, id, start, limit)
+    return await run_with_db(db, RoleActions().show_role_with_users, id, start, limit)
 
 
 @router.get(
@@ -272,7 +317,7 @@ async def show_role_with_users(
 async def permission_query(
     id: UUID,
     db: Session = Depends(get_db),
-    Authorize: AuthJWT = Depends(),
+    claims: TokenClaims = Depends(get_token_claims),
 ) -> JSONResponse:
     """**Get one Role with permissions**.
 
@@ -299,5 +344,4 @@ async def permission_query(
 
 
     """
-    Authorize.jwt_required()
-    return RoleActions().show_actions_and_modules(db, id)
+    return await run_with_db(db, RoleActions().show_actions_and_modules, id)
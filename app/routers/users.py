@@ -1,18 +1,19 @@
 from typing import Optional, Union
 from uuid import UUID
 
-from fastapi import APIRouter, status, Depends, Response
-from fastapi.responses import JSONResponse
-from fastapi_another_jwt_auth import AuthJWT
+from fastapi import APIRouter, status, Depends, Query, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.dependencies.data_conexion import get_db
+from app.dependencies.data_conexion import get_db, run_with_db, stream_with_db
 from app.dependencies.permissions_policy import (
     users_create,
     users_read,
     users_update,
     users_delete,
 )
+from app.dependencies.token_claims import TokenClaims, get_token_claims
+from app.extras.export import EXPORT_BATCH_SIZE, ExportFormat, export_response
 from app.internal.users import UsersActions
 from app.schemas import schemas_config
 from app.schemas import user_schemas
@@ -36,7 +37,7 @@ router = APIRouter(
 async def create_user(
     request: user_schemas.UserCreate,
     db: Session = Depends(get_db),
-    Authorize: AuthJWT = Depends(),
+    claims: TokenClaims = Depends(get_token_claims),
 ) -> JSONResponse:
     """**Create new User**.
 
@@ -65,9 +66,54 @@ async def create_user(
     - **status code** -> 201
 
     """
-    Authorize.jwt_required()
-    current_user = Authorize.get_jwt_subject()
-    return UsersActions().create_new_user(db, current_user, request)
+    current_user = claims.subject
+    return await run_with_db(db, UsersActions().create_new_user, current_user, request)
+
+
+@router.post(
+    "/bulk",
+    dependencies=[Depends(users_create)],
+    status_code=status.HTTP_200_OK,
+    response_model=user_schemas.BulkUsersReport,
+    summary="Create Users in bulk",
+)
+async def create_users_bulk(
+    request: user_schemas.UsersBulkCreate,
+    db: Session = Depends(get_db),
+    claims: TokenClaims = Depends(get_token_claims),
+) -> JSONResponse:
+    """**Create Users in bulk**.
+
+    Create up to 10000 users in a single request.
+
+    - This Endpoint validates the roles once, looks up the existing
+     emails in blocks, hashes the passwords in parallel and inserts
+     all the users in one transaction.
+    - Users can access when the role is assigned
+     permission **create** to the module **users**.
+
+    ***Important Note***
+    - A deleted user with the same email is restored, like in /users/create.
+    - Existing emails, repeated emails and invalid roles are skipped.
+
+    ***Parameters***:
+    - Access Token
+
+    **Request body parameter**:
+     - users: **UsersBulkCreate** -> A list of UserCreate models with
+      email, password and role
+
+    *Return*:
+    - report: **BulkUsersReport** -> created, restored and skipped counts
+     and the status of each user: created, restored, exists,
+     duplicated or invalid_role.
+    - **status code** -> 200
+
+    """
+    current_user = claims.subject
+    return await run_with_db(
+        db, UsersActions().create_users_bulk, current_user, request
+    )
 
 
 @router.get(
@@ -78,10 +124,12 @@ async def create_user(
     summary="Get All Users",
 )
 async def all_users(
-    Authorize: AuthJWT = Depends(),
+    claims: TokenClaims = Depends(get_token_claims),
     db: Session = Depends(get_db),
     start: Union[int, None] = None,
     limit: Union[int, None] = None,
+    cursor: Union[str, None] = None,
+    approximate: bool = False,
 ) -> JSONResponse:
     """**Get a list of Users**.
 
@@ -98,6 +146,10 @@ async def all_users(
     **Query Parameters**:
     - ***start*** is a initial value from start to show (Optional)
     - ***limit*** is the end of the values to show (Optional)
+    - ***cursor*** next_cursor or prev_cursor from a previous response,
+     paginates by (created_on, id) instead of start (Optional)
+    - ***approximate*** numRows from table statistics instead of COUNT,
+     faster on big tables but ignores filters (Optional)
 
     *Returns*
     - user: **ShowUser** -> A ShowUser model
@@ -106,9 +158,54 @@ async def all_users(
     - **status code** -> 200
 
     """
-    Authorize.jwt_required()
-    current_user = Authorize.get_jwt_subject()
-    return UsersActions().get_all_users(db, current_user, start, limit)
+    current_user = claims.subject
+    return await run_with_db(
+        db,
+        UsersActions().get_all_users,
+        current_user,
+        start,
+        limit,
+        cursor,
+        approximate,
+    )
+
+
+@router.get(
+    "/export",
+    dependencies=[Depends(users_read)],
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    summary="Export Users",
+)
+async def export_users(
+    claims: TokenClaims = Depends(get_token_claims),
+    db: Session = Depends(get_db),
+    fmt: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+) -> StreamingResponse:
+    """**Export Users**.
+
+    Download all the users as NDJSON or CSV
+
+    - This Endpoint streams the records in blocks read with a
+     server side cursor, memory does not grow with the number of rows.
+    - Users can access when the role is assigned
+     permission **read** to the module **users**.
+
+    **Parameters** :
+    - Access Token
+
+    **Query Parameters**:
+    - ***format*** ndjson (default) or csv (Optional)
+
+    *Return*
+    - file: one record per line with: id (UUDI Format), email, is_active, role_id, role_name.
+    - **status code** -> 200
+
+    """
+    current_user = claims.subject
+    statement = UsersActions().export_users(current_user)
+    partitions = stream_with_db(db, statement, EXPORT_BATCH_SIZE)
+    return export_response(partitions, user_schemas.ShowInfoUser, fmt, "users")
 
 
 @router.get(
@@ -119,7 +216,9 @@ async def all_users(
     summary="Get Specific User by id",
 )
 async def get_user(
-    id: UUID, db: Session = Depends(get_db), Authorize: AuthJWT = Depends()
+    id: UUID,
+    db: Session = Depends(get_db),
+    claims: TokenClaims = Depends(get_token_claims),
 ) -> JSONResponse:
     """**Get One User**.
 
@@ -143,8 +242,7 @@ async def get_user(
     - **status code** -> 200
 
     """
-    Authorize.jwt_required()
-    return UsersActions().get_one_user(db, id)
+    return await run_with_db(db, UsersActions().get_one_user, id)
 
 
 @router.put(
@@ -158,7 +256,7 @@ async def update_user(
     request: user_schemas.UpdateUser,
     id: UUID,
     db: Session = Depends(get_db),
-    Authorize: AuthJWT = Depends(),
+    claims: TokenClaims = Depends(get_token_claims),
 ) -> JSONResponse:
     """***Update User***.
 
@@ -189,9 +287,10 @@ async def update_user(
     - **status code** -> 202
 
     """
-    Authorize.jwt_required()
-    current_user = Authorize.get_jwt_subject()
-    return UsersActions().update_user_info(db, id, request, current_user)
+    current_user = claims.subject
+    return await run_with_db(
+        db, UsersActions().update_user_info, id, request, current_user
+    )
 
 
 @router.patch(
@@ -205,7 +304,7 @@ async def update_password(
     request: user_schemas.UpdatePass,
     id: UUID,
     db: Session = Depends(get_db),
-    Authorize: AuthJWT = Depends(),
+    claims: TokenClaims = Depends(get_token_claims),
 ) -> JSONResponse:
     """***Update Password***.
 
@@ -235,9 +334,45 @@ async def update_password(
     - **status code** -> 202
 
     """
-    Authorize.jwt_required()
-    current_user = Authorize.get_jwt_subject()
-    return UsersActions().update_password_user(db, id, request, current_user)
+    current_user = claims.subject
+    return await run_with_db(
+        db, UsersActions().update_password_user, id, request, current_user
+    )
+
+
+@router.post(
+    "/{id}/revoke-tokens",
+    dependencies=[Depends(users_update)],
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={202: {"model": schemas_config.GoodMessage}},
+    summary="Revoke every token of a specific user",
+)
+async def revoke_user_tokens(
+    id: UUID,
+    db: Session = Depends(get_db),
+) -> JSONResponse:
+    """***Revoke User Tokens***.
+
+    Sign out a user from every session by selecting it by ID.
+
+    - Every access and refresh token issued to the user
+     until now stops being accepted.
+    - The user has to log in again to get new tokens.
+    - Users can access when the role is assigned
+     to permission **update** to the module **users**.
+
+    **Parameters**:
+    - Access Token
+
+    **Path Parameter**:
+    - **User ID** -> (UUDI Format).
+
+    *Return*:
+    - **JSON Response** -> string message
+    - **status code** -> 202
+
+    """
+    return await run_with_db(db, UsersActions().revoke_user_tokens, id)
 
 
 @router.delete(
@@ -248,7 +383,9 @@ async def update_password(
     summary="Delete specific user using user id",
 )
 async def delete_user(
-    id: UUID, db: Session = Depends(get_db), Authorize: AuthJWT = Depends()
+    id: UUID,
+    db: Session = Depends(get_db),
+    claims: TokenClaims = Depends(get_token_claims),
 ) -> Optional[JSONResponse]:
     """***Delete User***.
 
@@ -268,6 +405,5 @@ async def delete_user(
     - **status code** -> 204
 
     """
-    Authorize.jwt_required()
-    current_user = Authorize.get_jwt_subject()
-    return UsersActions().delete_one_user(db, id, current_user)
+    current_user = claims.subject
+    return await run_with_db(db, UsersActions().delete_one_user, id, current_user)
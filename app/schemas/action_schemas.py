@@ -129,6 +129,8 @@ class ShowActions(BaseModel):
     success: bool = True
     numRows: int
     data: List[ShowActionInfo]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
     class Config:
         """Habilitamos el modo orm.
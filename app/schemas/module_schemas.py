@@ -115,6 +115,8 @@ class ShowModules(BaseModel):
     success: bool = True
     numRows: int
     data: List[ShowModuleInfo]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
     class Config:
         """Habilitamos el modo orm.
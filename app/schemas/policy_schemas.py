@@ -0,0 +1,86 @@
+from typing import Dict, List, Optional, Union
+
+from pydantic import BaseModel, Field, root_validator
+from typing_extensions import Literal
+
+
+class PolicyModule(BaseModel):
+    """Modulo de la politica con sus acciones.
+
+    Args:
+        BaseModel (BaseModel): Pydantic BaseModel
+    """
+
+    description: Optional[str] = Field(None, max_length=250)
+    actions: List[str] = Field([], description="Names of the actions")
+
+    class Config:
+        """Config class.
+
+        Configuramos que todos los str sean en minusculas.
+        """
+
+        anystr_lower = True
+
+
+class PolicyRole(BaseModel):
+    """Rol de la politica con sus permisos por modulo.
+
+    "*" en lugar de la lista da todas las acciones del modulo.
+
+    Args:
+        BaseModel (BaseModel): Pydantic BaseModel
+    """
+
+    description: Optional[str] = Field(None, max_length=250)
+    grants: Dict[str, Union[Literal["*"], List[str]]] = Field(
+        {}, description="Actions by module name"
+    )
+
+    class Config:
+        """Config class.
+
+        Configuramos que todos los str sean en minusculas.
+        """
+
+        anystr_lower = True
+
+
+class Policy(BaseModel):
+    """Politica RBAC declarativa: modulos, acciones, roles y permisos.
+
+    Args:
+        BaseModel (BaseModel): Pydantic BaseModel
+    """
+
+    modules: Dict[str, PolicyModule] = {}
+    roles: Dict[str, PolicyRole] = {}
+
+    @root_validator(skip_on_failure=True)
+    def check_grants(cls, values: dict) -> dict:
+        """Los permisos solo pueden usar modulos y acciones declarados."""
+        modules = values["modules"]
+        for role_name, role in values["roles"].items():
+            for module_name, actions in role.grants.items():
+                if module_name not in modules:
+                    raise ValueError(
+                        f"role {role_name}: module {module_name} is not declared"
+                    )
+                if actions == "*":
+                    continue
+                unknown = set(actions) - set(modules[module_name].actions)
+                if unknown:
+                    raise ValueError(
+                        f"role {role_name}: actions {sorted(unknown)} "
+                        f"are not declared in module {module_name}"
+                    )
+        return values
+
+    def grant_pairs(self, role_name: str) -> List[tuple]:
+        """Pares (modulo, accion) que debe tener el rol."""
+        pairs = []
+        for module_name, actions in self.roles[role_name].grants.items():
+            if actions == "*":
+                actions = self.modules[module_name].actions
+            pairs.extend((module_name, action) for action in actions)
+        return pairs
@@ -34,6 +34,56 @@ class assigned_action(BaseModel):
         anystr_lower = True
 
 
+class bulk_assigned_actions(BaseModel):
+    """Modelo de validacion para asignar y revocar permissions en lote.
+
+    Con replace en True actions_id es el conjunto completo de acciones del
+    rol y se revocan las que no esten en la lista.
+
+    Args:
+        BaseModel (BaseModel): Pydantic BaseModel
+    """
+
+    role_id: UUID = Field(
+        ..., example="dff942ee-1f41-11ed-861d-0242ac120002", description="Id from role"
+    )
+    actions_id: List[UUID] = Field(
+        [], max_items=1000, description="Ids from actions to assign"
+    )
+    revoke_id: List[UUID] = Field(
+        [], max_items=1000, description="Ids from actions to revoke"
+    )
+    replace: bool = Field(
+        False, description="actions_id is the full set of actions of the role"
+    )
+    description: Optional[str] = Field(
+        max_length=250, description="Optional text to explain a role in your app :D"
+    )
+
+    class Config:
+        """Config class.
+
+        Configuramos que todos los str sean en minusculas.
+        """
+
+        anystr_lower = True
+
+
+class BulkAssignedReport(BaseModel):
+    """Modelo de validacion al mostrar el resultado del lote.
+
+    Args:
+        BaseModel (BaseModel): Pydantic BaseModel
+    """
+
+    success: bool = True
+    assigned: List[UUID]
+    restored: List[UUID]
+    revoked: List[UUID]
+    unchanged: List[UUID]
+    invalid: List[UUID]
+
+
 class update_assigned_action_desc(BaseModel):
     """Modelo de validacion para actualizar permissions.
 
@@ -118,6 +168,8 @@ class ShowRoleActions(BaseModel):
     success: bool = True
     numRows: int
     data: List[ShowRoleActionInfo]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
     class Config:
         """Habilitamos el modo orm.
@@ -172,6 +172,8 @@ class ShowRoles(BaseModel):
     success: bool = True
     numRows: int
     data: List[ShowRoleInfo]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
     class Config:
         """Habilitamos el modo orm.
@@ -14,6 +14,9 @@ class Settings(BaseModel):
     """
 
     authjwt_secret_key: str = config("secret")  # type: ignore
+    # La denylist revisa jti y marcas por usuario, ver token_revocation.py
+    authjwt_denylist_enabled: bool = config("TOKEN_REVOCATION", default=True, cast=bool)
+    authjwt_denylist_token_checks: set = {"access", "refresh"}
 
 
 class SettingsDoc(BaseSettings):
@@ -205,6 +205,8 @@ class ShowUsers(BaseModel):
     success: bool = True
     numRows: int
     data: List[ShowInfoUser]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
     class Config:
         """Habilitamos el modo orm.
@@ -251,3 +253,42 @@ class ShowUserWithRole(BaseModel):
         """
 
         orm_mode = True
+
+
+class UsersBulkCreate(BaseModel):
+    """Modelo de validacion para crear users en lote.
+
+    Args:
+        BaseModel (BaseModel): Pydantic BaseModel
+    """
+
+    users: List[UserCreate] = Field(..., min_items=1, max_items=10000)
+
+
+class BulkUserResult(BaseModel):
+    """Resultado de un user del lote.
+
+    status puede ser created, restored, exists, duplicated o invalid_role.
+
+    Args:
+        BaseModel (BaseModel): Pydantic BaseModel
+    """
+
+    index: int
+    email: EmailStr
+    status: str
+    id: Optional[UUID] = None
+
+
+class BulkUsersReport(BaseModel):
+    """Reporte del alta de users en lote.
+
+    Args:
+        BaseModel (BaseModel): Pydantic BaseModel
+    """
+
+    success: bool = True
+    created: int
+    restored: int
+    skipped: int
+    results: List[BulkUserResult]
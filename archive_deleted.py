@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Mueve los usuarios, acciones y permisos eliminados a las tablas *_archive.
+
+    python archive_deleted.py --days 90 --batch-size 500 --sleep 0.1
+"""
+import argparse
+import sys
+import time
+
+from app import main  # noqa
+from app.database.main import SessionLocal
+from app.internal.archive import (
+    ARCHIVE_AFTER_DAYS,
+    ARCHIVE_BATCH_SIZE,
+    ARCHIVE_SLEEP,
+    archive_deleted,
+)
+
+
+def main_archive(args: argparse.Namespace) -> int:
+    """Archiva por bloques y muestra cuantos registros se movieron por tabla."""
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        archived = archive_deleted(
+            db, args.days, args.batch_size, args.sleep, args.limit
+        )
+    finally:
+        db.close()
+    done = time.perf_counter()
+
+    for table, total in archived.items():
+        print(f"{table}: {total} rows archived")
+    print(f"archive {(done - start) * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=ARCHIVE_AFTER_DAYS,
+        help="archive rows deleted more than N days ago",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=ARCHIVE_BATCH_SIZE,
+        help="rows moved per transaction",
+    )
+    parser.add_argument(
+        "--sleep",
+        type=float,
+        default=ARCHIVE_SLEEP,
+        help="seconds to wait between transactions",
+    )
+    parser.add_argument(
+        "--limit", type=int, default=None, help="max rows per table in this run"
+    )
+    sys.exit(main_archive(parser.parse_args()))
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Compara el tiempo de serializar un listado de 10k usuarios.
+
+Antes: jsonable_encoder sobre las filas, validacion con el response_model,
+jsonable_encoder otra vez y JSONResponse, como lo hace FastAPI. Ahora:
+list_response con ORJSONResponse.
+
+    python -m benchmarks.list_response --rows 10000 --number 20
+"""
+import argparse
+import timeit
+from datetime import datetime
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.extras import responses
+from app.schemas import user_schemas
+
+
+class Row:
+    """Fila con las columnas de get_all_users, como un objeto del modelo."""
+
+    def __init__(self, i: int) -> None:
+        self.id = uuid4()
+        self.created_on = datetime.now()
+        self.email = f"user{i}@example.com"
+        self.is_active = True
+        self.role_id = uuid4()
+        self.role_name = "admin"
+
+
+def make_rows(total: int) -> list:
+    """Filas para el listado."""
+    return [Row(i) for i in range(total)]
+
+
+def validated(rows: list) -> bytes:
+    """Camino con jsonable_encoder y response_model."""
+    res = jsonable_encoder({"success": True, "numRows": len(rows), "data": rows})
+    model = user_schemas.ShowUsers(**res)
+    return JSONResponse(content=jsonable_encoder(model)).body
+
+
+def trusted(rows: list) -> bytes:
+    """Camino con ORJSONResponse."""
+    res = {"success": True, "numRows": len(rows), "data": rows}
+    return responses.list_response(res, user_schemas.ShowInfoUser).body
+
+
+def main(args: argparse.Namespace) -> None:
+    """Serializa las mismas filas con ambos caminos."""
+    responses.RESPONSE_VALIDATION = False
+    rows = make_rows(args.rows)
+    results = {}
+    for name, func in (("validated", validated), ("orjson", trusted)):
+        seconds = timeit.timeit(lambda: func(rows), number=args.number)
+        results[name] = seconds / args.number
+    for name, seconds in results.items():
+        print(f"{name:9} {seconds * 1000:10.2f} ms per response")
+    print(f"speedup {results['validated'] / results['orjson']:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--number", type=int, default=20)
+    main(parser.parse_args())
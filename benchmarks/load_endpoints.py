@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Carga concurrente sobre un endpoint protegido.
+
+Sirve para comparar dos instancias del API, por ejemplo una con
+DATABASE_ASYNC=False y otra con DATABASE_ASYNC=True:
+
+    python benchmarks/load_endpoints.py --url https://127.0.0.1:8080 \
+        --email admin@mail.com --password secret --path /users/ \
+        --requests 2000 --concurrency 100
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+import httpx
+
+
+async def _login(client: httpx.AsyncClient, email: str, password: str) -> str:
+    """Obtiene un access token con las credenciales indicadas."""
+    response = await client.post(
+        "/auth/signing", json={"email": email, "password": password}
+    )
+    response.raise_for_status()
+    return response.json()["data"]["access_token"]
+
+
+async def _worker(
+    client: httpx.AsyncClient,
+    path: str,
+    headers: dict,
+    pending: asyncio.Queue,
+    latencies: List[float],
+    errors: List[int],
+) -> None:
+    """Consume peticiones de la cola y guarda la latencia de cada una."""
+    while True:
+        try:
+            pending.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        start = time.perf_counter()
+        response = await client.get(path, headers=headers)
+        latencies.append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            errors.append(response.status_code)
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    """Percentil por rango mas cercano."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Lanza la carga y muestra el resumen."""
+    async with httpx.AsyncClient(
+        base_url=args.url, verify=False, timeout=args.timeout
+    ) as client:
+        token = await _login(client, args.email, args.password)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        pending: asyncio.Queue = asyncio.Queue()
+        for _ in range(args.requests):
+            pending.put_nowait(None)
+
+        latencies: List[float] = []
+        errors: List[int] = []
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(
+                _worker(client, args.path, headers, pending, latencies, errors)
+                for _ in range(args.concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - start
+
+    print(f"requests:    {len(latencies)} ({len(errors)} errors)")
+    print(f"throughput:  {len(latencies) / elapsed:.1f} req/s")
+    print(f"mean:        {statistics.mean(latencies) * 1000:.2f} ms")
+    for percent in (50, 95, 99):
+        value = _percentile(latencies, percent) * 1000
+        print(f"p{percent}:         {value:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="https://127.0.0.1:8080")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--path", default="/users/")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Compara registros por segundo de CustomJsonFormatter y OrjsonEcsFormatter.
+
+    python -m benchmarks.log_formatter --number 200000
+"""
+import argparse
+import logging
+import timeit
+
+from app.extras.custom_json_format import CustomJsonFormatter, OrjsonEcsFormatter
+
+
+def make_record() -> logging.LogRecord:
+    """Registro como los de app/internal, con el extra event.category."""
+    record = logging.LogRecord(
+        "root", logging.INFO, __file__, 1, "List of Users is display!", None, None
+    )
+    record.__dict__["event.category"] = "app_log"
+    return record
+
+
+def main(args: argparse.Namespace) -> None:
+    """Formatea el mismo registro con ambos formatters."""
+    formatters = {
+        "json": CustomJsonFormatter(
+            "%(@timestamp)s %(log.level)s %(log.logger)s %(message)s"
+        ),
+        "orjson": OrjsonEcsFormatter(),
+    }
+    record = make_record()
+    results = {}
+    for name, formatter in formatters.items():
+        print(f"{name:7} {formatter.format(record)}")
+        results[name] = timeit.timeit(
+            lambda: formatter.format(record), number=args.number
+        )
+    for name, seconds in results.items():
+        print(f"{name:7} {args.number / seconds:12,.0f} records/s")
+    print(f"speedup {results['json'] / results['orjson']:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=200_000)
+    main(parser.parse_args())
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Compara la lectura de usuario y permisos en login/refresh.
+
+Antes: la consulta del usuario con su rol y despues el join de 4 tablas
+con los permisos (cuando el rol no esta en permission_cache). Ahora: una
+sola consulta con permission_pairs_of. Se usa una BD sqlite en memoria con
+--users usuarios y un rol con --modules modulos de todas las acciones;
+--rtt agrega una espera por consulta para simular la red hasta la BD.
+No incluye bcrypt, que es igual en ambos casos.
+
+    python -m benchmarks.login_fetch --modules 40 --rtt 0.5 --number 500
+"""
+import argparse
+import time
+import timeit
+from uuid import uuid4
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.sql.expression import true
+
+import app.main  # noqa: F401
+from app.database.main import Base
+from app.internal.permission_map import (
+    _query_permission_map,
+    parse_permission_pairs,
+    permission_pairs_of,
+)
+from app.models.actions import Actions
+from app.models.actions_enum import ActionName
+from app.models.module import Module
+from app.models.role_actions import Role_Actions
+from app.models.roles import Role
+from app.models.users import Users
+
+COLUMNS = (
+    Users.id,
+    Users.email,
+    Users.role_id,
+    Users.is_active,
+    Users.password,
+    Users.soft_deleted.label("soft_deleted"),
+    Role.name.label("role_name"),
+    Role.perm_version,
+)
+
+
+def seed(db, users: int, modules: int) -> str:
+    """Crea los usuarios y regresa el email de uno con el rol de prueba."""
+    role_id = uuid4()
+    db.add(Role(id=role_id, name="bench", description="bench"))
+    for i in range(modules):
+        module_id = uuid4()
+        db.add(Module(id=module_id, name=f"module_{i}", description="bench"))
+        for action in ActionName:
+            action_id = uuid4()
+            db.add(
+                Actions(
+                    id=action_id,
+                    action_name=action.value,
+                    is_active=True,
+                    module_id=module_id,
+                )
+            )
+            db.add(Role_Actions(id=uuid4(), role_id=role_id, actions_id=action_id))
+    db.add_all(
+        Users(
+            id=uuid4(),
+            email=f"user{i}@example.com",
+            password="x" * 60,
+            role_id=role_id,
+        )
+        for i in range(users)
+    )
+    db.commit()
+    return f"user{users // 2}@example.com"
+
+
+def user_query(db, email: str, *columns):
+    return (
+        db.query(*COLUMNS, *columns)
+        .join(Role)
+        .filter(Users.email == email)
+        .filter(Users.is_active == true())
+        .filter(Users.not_deleted())
+    )
+
+
+def before(db, email: str) -> dict:
+    """Usuario y despues el join de permisos."""
+    user = user_query(db, email).first()
+    return _query_permission_map(db, str(user.role_id))
+
+
+def after(db, email: str) -> dict:
+    """Usuario y permisos en la misma consulta."""
+    user = user_query(
+        db, email, permission_pairs_of(Users.role_id).label("permission_pairs")
+    ).first()
+    return parse_permission_pairs(user.permission_pairs)
+
+
+def main(args: argparse.Namespace) -> None:
+    """Mide consultas y milisegundos por login de cada forma."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    email = seed(db, args.users, args.modules)
+
+    statements = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def round_trip(*_) -> None:
+        statements[0] += 1
+        if args.rtt:
+            time.sleep(args.rtt / 1000)
+
+    assert before(db, email) == after(db, email)
+    print(
+        f"users={args.users} modules={args.modules} "
+        f"actions={args.modules * len(ActionName)} rtt={args.rtt} ms"
+    )
+    for name, fetch in (("before", before), ("after", after)):
+        statements[0] = 0
+        seconds = timeit.timeit(lambda: fetch(db, email), number=args.number)
+        print(
+            f"{name:6} {statements[0] / args.number:.0f} queries/login "
+            f"{seconds / args.number * 1000:8.3f} ms/login"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--modules", type=int, default=40)
+    parser.add_argument("--rtt", type=float, default=0.0)
+    parser.add_argument("--number", type=int, default=500)
+    main(parser.parse_args())
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Compara el costo de RoleChecker con el diccionario y con perm_bits.
+
+    python -m benchmarks.permission_check --number 1000000
+"""
+import argparse
+import timeit
+
+import app.main  # noqa: F401
+from app.dependencies.permissions import RoleChecker
+from app.extras.permission_bits import POLICY_MODULES, permission_vocabulary
+from app.models.actions_enum import ActionName
+
+
+def main(args: argparse.Namespace) -> None:
+    """Mide ambas rutas de validacion para un rol con todos los permisos."""
+    permissions = {
+        module: [action.value for action in ActionName] for module in POLICY_MODULES
+    }
+    dict_claims = {"permissions": permissions}
+    bits_claims = {
+        "permissions": permissions,
+        **permission_vocabulary.claims(permissions),
+    }
+    # El peor caso del diccionario es la ultima accion del ultimo modulo
+    checker = RoleChecker({"module": POLICY_MODULES[-1], "permission": "update"})
+
+    results = {
+        "dict": timeit.timeit(
+            lambda: checker.is_allowed(dict_claims), number=args.number
+        ),
+        "bits": timeit.timeit(
+            lambda: checker.is_allowed(bits_claims), number=args.number
+        ),
+    }
+    for name, seconds in results.items():
+        print(f"{name:5} {seconds / args.number * 1e9:8.1f} ns/check")
+    print(f"speedup {results['dict'] / results['bits']:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=1_000_000)
+    main(parser.parse_args())
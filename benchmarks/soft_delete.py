@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Compara la primera pagina de un listado con muchos registros eliminados.
+
+Antes: is_deleted = false con el indice (created_on, id), la BD recorre el
+indice en orden y descarta las filas eliminadas una por una. Ahora:
+deleted_at IS NULL con el indice (deleted_at, created_on, id), que solo
+contiene las filas vivas al inicio del rango.
+
+    python -m benchmarks.soft_delete --rows 200000 --deleted 0.9 --number 200
+"""
+import argparse
+import random
+import sqlite3
+import timeit
+from datetime import datetime, timedelta
+
+QUERIES = {
+    "flag": (
+        "CREATE INDEX ix_items_created_on_id ON items (created_on, id)",
+        "SELECT id FROM items WHERE is_deleted = 0 "
+        "ORDER BY created_on, id LIMIT ?",
+    ),
+    "timestamp": (
+        "CREATE INDEX ix_items_deleted_at_created_on_id "
+        "ON items (deleted_at, created_on, id)",
+        "SELECT id FROM items WHERE deleted_at IS NULL "
+        "ORDER BY created_on, id LIMIT ?",
+    ),
+}
+
+
+def make_db(rows: int, deleted: float) -> sqlite3.Connection:
+    """Tabla con las columnas del borrado logico, las eliminadas primero.
+
+    Los registros mas viejos son los que se eliminan, asi que el listado
+    por created_on los encuentra antes que a los vivos.
+    """
+    db = sqlite3.connect(":memory:")
+    db.execute(
+        "CREATE TABLE items (id INTEGER PRIMARY KEY, created_on TIMESTAMP, "
+        "is_deleted BOOLEAN, deleted_at TIMESTAMP)"
+    )
+    start = datetime(2022, 1, 1)
+    cut = int(rows * deleted)
+    data = []
+    for i in range(rows):
+        created_on = start + timedelta(seconds=i)
+        is_deleted = i < cut or random.random() < 0.01
+        deleted_at = created_on + timedelta(days=1) if is_deleted else None
+        data.append((i, created_on, is_deleted, deleted_at))
+    db.executemany("INSERT INTO items VALUES (?, ?, ?, ?)", data)
+    for create_index, _ in QUERIES.values():
+        db.execute(create_index)
+    db.execute("ANALYZE")
+    return db
+
+
+def main(args: argparse.Namespace) -> None:
+    """Mide cada consulta con su indice."""
+    db = make_db(args.rows, args.deleted)
+    print(f"rows={args.rows} deleted={args.deleted:.0%} limit={args.limit}")
+    for name, (_, query) in QUERIES.items():
+        plan = db.execute("EXPLAIN QUERY PLAN " + query, (args.limit,)).fetchall()
+        seconds = timeit.timeit(
+            lambda: db.execute(query, (args.limit,)).fetchall(), number=args.number
+        )
+        print(f"{name:10} {seconds / args.number * 1000:8.3f} ms  {plan[-1][-1]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--deleted", type=float, default=0.9)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--number", type=int, default=200)
+    main(parser.parse_args())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Compara cuantas veces se decodifica el JWT por peticion.
+
+Simula una ruta protegida como /users/create: RoleChecker mas el cuerpo
+del endpoint, antes con jwt_required()/get_raw_jwt()/get_jwt_subject() y
+ahora con get_token_claims, la primera vez que llega el token (once) y las
+siguientes, con los claims en verified_tokens (cached).
+
+    python -m benchmarks.token_decode --number 20000
+"""
+import argparse
+import timeit
+
+import jwt
+from fastapi_another_jwt_auth import AuthJWT
+from starlette.requests import Request
+
+import app.main  # noqa: F401
+from app.dependencies.token_claims import get_token_claims, verified_tokens
+from app.extras.permission_bits import POLICY_MODULES, permission_vocabulary
+from app.models.actions_enum import ActionName
+
+
+class DecodeCounter:
+    """Envuelve jwt.decode para contar las llamadas."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self._decode = jwt.decode
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return self._decode(*args, **kwargs)
+
+
+def build_request(token: str) -> Request:
+    """Peticion minima con el header Authorization."""
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/users/create",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+    }
+    return Request(scope)
+
+
+def before(request: Request) -> None:
+    """Flujo anterior, cada llamada vuelve a decodificar."""
+    Authorize = AuthJWT(request)
+    # RoleChecker
+    Authorize.jwt_required()
+    Authorize.get_raw_jwt()
+    # Endpoint
+    Authorize.jwt_required()
+    Authorize.get_jwt_subject()
+
+
+def after(request: Request) -> None:
+    """Flujo actual, los claims se comparten en la peticion."""
+    claims = get_token_claims(AuthJWT(request))
+    # RoleChecker y endpoint usan el mismo objeto
+    claims.raw
+    claims.subject
+
+
+def once(request: Request) -> None:
+    """Flujo actual con un token que no esta en verified_tokens."""
+    verified_tokens.clear()
+    after(request)
+
+
+def main(args: argparse.Namespace) -> None:
+    """Mide el tiempo y cuenta las llamadas a jwt.decode en ambos flujos."""
+    permissions = {
+        module: [action.value for action in ActionName] for module in POLICY_MODULES
+    }
+    token = AuthJWT().create_access_token(
+        subject="00000000-0000-0000-0000-000000000000",
+        user_claims={
+            "role": "00000000-0000-0000-0000-000000000000",
+            "permissions": permissions,
+            **permission_vocabulary.claims(permissions),
+        },
+    )
+    request = build_request(token)
+
+    counter = DecodeCounter()
+    jwt.decode = counter
+    try:
+        for name, flow in (("before", before), ("once", once), ("cached", after)):
+            counter.calls = 0
+            flow(request)
+            decodes = counter.calls
+            seconds = timeit.timeit(lambda: flow(request), number=args.number)
+            print(
+                f"{name:6} {decodes} decode/request "
+                f"{seconds / args.number * 1e6:8.1f} us/request"
+            )
+    finally:
+        jwt.decode = counter._decode
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20_000)
+    main(parser.parse_args())
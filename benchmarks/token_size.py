@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Compara el tamaño y el costo por peticion del token embedded y compact.
+
+Simula un rol con acceso amplio: los modulos de permissions_policy.py mas
+--modules modulos propios, cada uno con todas las acciones. Por peticion se
+mide get_token_claims (firma y JSON, sin verified_tokens) mas RoleChecker,
+con un permiso del vocabulario (perm_bits) y uno propio (diccionario o mapa
+en memoria).
+
+    python -m benchmarks.token_size --modules 40 --number 5000
+"""
+import argparse
+import asyncio
+import timeit
+from uuid import uuid4
+
+from fastapi_another_jwt_auth import AuthJWT
+
+import app.main  # noqa: F401
+from app.dependencies.permissions import RoleChecker
+from app.dependencies.token_claims import get_token_claims, verified_tokens
+from app.extras.permission_bits import POLICY_MODULES
+from app.internal import auth
+from app.internal.permission_map import permission_cache
+from app.models.actions_enum import ActionName
+from benchmarks.token_decode import build_request
+
+
+def make_token(role_id: str, permissions: dict, token_format: str) -> str:
+    """Access token como lo genera user_login."""
+    auth.TOKEN_PERMISSIONS = token_format
+    return AuthJWT().create_access_token(
+        subject=str(uuid4()),
+        user_claims={
+            "role": role_id,
+            "is_active": True,
+            **auth.permission_claims(1, permissions),
+        },
+    )
+
+
+def main(args: argparse.Namespace) -> None:
+    """Imprime bytes del header y microsegundos por peticion de cada formato."""
+    actions = [action.value for action in ActionName]
+    modules = list(POLICY_MODULES) + [f"module_{i}" for i in range(args.modules)]
+    permissions = {module: actions for module in modules}
+    role_id = str(uuid4())
+    # Lo que dejan login o refresh en el mapa en memoria
+    permission_cache.set(role_id, (1, permissions))
+
+    policy = RoleChecker({"module": "users", "permission": "delete"})
+    custom = RoleChecker({"module": modules[-1], "permission": "update"})
+
+    async def check(request) -> None:
+        # El tamaño importa al verificar, no con los claims ya en el cache
+        verified_tokens.clear()
+        claims = get_token_claims(AuthJWT(request))
+        await policy(claims, None)
+        await custom(claims, None)
+
+    loop = asyncio.new_event_loop()
+    for token_format in ("embedded", "compact"):
+        token = make_token(role_id, permissions, token_format)
+        request = build_request(token)
+        seconds = timeit.timeit(
+            lambda: loop.run_until_complete(check(request)), number=args.number
+        )
+        print(
+            f"{token_format:8} {len('Bearer ' + token):6} bytes "
+            f"{seconds / args.number * 1e6:8.1f} us/request"
+        )
+    loop.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", type=int, default=40)
+    parser.add_argument("--number", type=int, default=5_000)
+    main(parser.parse_args())
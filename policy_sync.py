@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Sincroniza modulos, acciones, roles y permisos con un archivo de politica.
+
+    python policy_sync.py policy.yml --dry-run
+    python policy_sync.py policy.yml
+"""
+import argparse
+import sys
+import time
+
+from app import main  # noqa
+from app.database.main import SessionLocal
+from app.internal.policy_sync import load_policy, plan_policy, sync_policy
+
+
+def main_sync(args: argparse.Namespace) -> int:
+    """Carga la politica, muestra los cambios y los aplica si no es dry-run."""
+    start = time.perf_counter()
+    policy = load_policy(args.policy)
+    loaded = time.perf_counter()
+
+    db = SessionLocal()
+    try:
+        if args.dry_run:
+            plan = plan_policy(db, policy)
+            db.rollback()
+        else:
+            plan = sync_policy(db, policy)
+    finally:
+        db.close()
+    done = time.perf_counter()
+
+    for line in plan.lines():
+        print(line)
+    action = "would apply" if args.dry_run else "applied"
+    print(f"\n{plan.total} changes {action}")
+    print(
+        f"load {(loaded - start) * 1000:.1f} ms, sync {(done - loaded) * 1000:.1f} ms"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("policy", help="YAML or JSON policy file")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="show the changes without applying"
+    )
+    sys.exit(main_sync(parser.parse_args()))
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import delete, select
+
+from app import main  # noqa
+from app.database.main import SessionLocal
+from app.extras.hashing import Hash
+from app.internal.actions import ActionsOperations
+from app.internal.archive import archive_deleted
+from app.internal.role_action import RoleActions
+from app.internal.users import UsersActions
+from app.models.actions import Actions
+from app.models.archive import ARCHIVES
+from app.models.module import Module
+from app.models.role_actions import Role_Actions
+from app.models.roles import Role
+from app.models.users import Users
+from app.schemas.action_schemas import ActionCreate
+from app.schemas.role_actions_schemas import assigned_action
+from app.schemas.user_schemas import UserCreate, UsersBulkCreate
+
+OLD = datetime.now() - timedelta(days=100)
+
+
+@pytest.fixture()
+def rows():
+    """Rol, modulo y permiso, accion y usuario eliminados hace 100 dias."""
+    db = SessionLocal()
+    tag = uuid4().hex[:8]
+    ids = SimpleNamespace(
+        role=uuid4(),
+        module=uuid4(),
+        action=uuid4(),
+        permission=uuid4(),
+        user=uuid4(),
+        email=f"archive-{tag}@example.com",
+    )
+    db.add(Role(id=ids.role, name=f"archive-{tag}", description="archive"))
+    db.add(Module(id=ids.module, name=f"archive-{tag}", description="archive"))
+    db.flush()
+    db.add(
+        Actions(
+            id=ids.action,
+            action_name="read",
+            is_active=False,
+            module_id=ids.module,
+            is_deleted=True,
+            deleted_at=OLD,
+        )
+    )
+    db.flush()
+    db.add(
+        Role_Actions(
+            id=ids.permission,
+            role_id=ids.role,
+            actions_id=ids.action,
+            is_deleted=True,
+            deleted_at=OLD,
+        )
+    )
+    db.add(
+        Users(
+            id=ids.user,
+            email=ids.email,
+            password=Hash().bcrypt("test_password"),
+            is_active=False,
+            role_id=ids.role,
+            is_deleted=True,
+            deleted_at=OLD,
+        )
+    )
+    db.commit()
+    db.expunge_all()
+    yield db, ids
+
+    db.rollback()
+    for model, id in (
+        (Role_Actions, ids.permission),
+        (Users, ids.user),
+        (Actions, ids.action),
+    ):
+        db.execute(delete(ARCHIVES[model]).where(ARCHIVES[model].c.id == id))
+        db.query(model).filter(model.id == id).delete()
+    db.query(Role).filter(Role.id == ids.role).delete()
+    db.query(Module).filter(Module.id == ids.module).delete()
+    db.commit()
+    db.close()
+
+
+def archived_ids(db, model) -> set:
+    """IDs en la tabla historica del modelo."""
+    return set(db.execute(select(ARCHIVES[model].c.id)).scalars())
+
+
+def test_archive_moves_old_tombstones(rows) -> None:
+    """Permisos, acciones y usuarios eliminados pasan a *_archive."""
+    db, ids = rows
+    recent = uuid4()
+    db.add(Role_Actions(id=recent, role_id=ids.role, **Role_Actions.deleted_values()))
+    db.commit()
+
+    archive_deleted(db, older_than_days=90, batch_size=1, sleep=0)
+
+    assert ids.permission in archived_ids(db, Role_Actions)
+    assert ids.action in archived_ids(db, Actions)
+    assert ids.user in archived_ids(db, Users)
+    assert db.query(Users).filter(Users.id == ids.user).first() is None
+    # Eliminado hace menos de 90 dias, se queda en la tabla
+    assert db.query(Role_Actions).filter(Role_Actions.id == recent).delete() == 1
+    db.commit()
+
+
+def test_create_restores_from_archive(rows) -> None:
+    """Los create_* restauran el registro archivado con su ID original."""
+    db, ids = rows
+    archive_deleted(db, older_than_days=90, sleep=0)
+
+    ActionsOperations().create_new_action(
+        db,
+        str(uuid4()),
+        ActionCreate(action_name="read", is_active=True, module_id=ids.module),
+    )
+    RoleActions().assing_role_and_actions(
+        db, assigned_action(role_id=ids.role, actions_id=ids.action), str(uuid4())
+    )
+    UsersActions().create_new_user(
+        db,
+        str(uuid4()),
+        UserCreate(email=ids.email, password="test_password", role_id=ids.role),
+    )
+
+    restored = (
+        (Actions, ids.action),
+        (Role_Actions, ids.permission),
+        (Users, ids.user),
+    )
+    for model, id in restored:
+        row = db.query(model).filter(model.id == id).first()
+        assert row is not None and row.deleted_at is None
+        assert id not in archived_ids(db, model)
+
+
+def test_bulk_create_restores_from_archive(rows) -> None:
+    """/users/bulk restaura el usuario archivado, activo y con su ID original."""
+    db, ids = rows
+    archive_deleted(db, older_than_days=90, sleep=0)
+
+    res = UsersActions().create_users_bulk(
+        db,
+        str(uuid4()),
+        UsersBulkCreate(
+            users=[
+                {"email": ids.email, "password": "bulk_password", "role_id": ids.role}
+            ]
+        ),
+    )
+
+    assert res["restored"] == 1 and res["created"] == 0
+    assert res["results"][0]["status"] == "restored"
+    assert res["results"][0]["id"] == str(ids.user)
+    user = db.query(Users).filter(Users.id == ids.user).one()
+    assert user.deleted_at is None and user.is_deleted is False
+    assert user.is_active is True
+    assert ids.user not in archived_ids(db, Users)
+
+
+def test_create_restores_deleted_user_as_active(rows) -> None:
+    """create_new_user restaura igual que /users/bulk, tambien is_active."""
+    db, ids = rows
+
+    res = UsersActions().create_new_user(
+        db,
+        str(uuid4()),
+        UserCreate(email=ids.email, password="new_password", role_id=ids.role),
+    )
+
+    assert res.status_code == 201
+    user = db.query(Users).filter(Users.id == ids.user).one()
+    assert user.deleted_at is None and user.is_deleted is False
+    assert user.is_active is True
+    assert Hash().verify(user.password, "new_password")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from uuid import uuid4
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from fastapi_another_jwt_auth import AuthJWT
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app import main
+from app.database.main import SQLALCHEMY_DATABASE_URL, SessionLocal
+from app.dependencies import data_conexion
+from app.dependencies.data_conexion import get_db
+from app.models.module import Module
+
+pytest.importorskip("aiosqlite")
+
+client = TestClient(app=main.app)
+
+
+@pytest.fixture()
+def async_db(monkeypatch):
+    """Las rutas reciben una AsyncSession de aiosqlite como con DATABASE_ASYNC.
+
+    Los metodos de app/internal siguen siendo sincronos, run_with_db los
+    ejecuta con run_sync sobre la AsyncSession.
+    """
+    if not SQLALCHEMY_DATABASE_URL.startswith("sqlite://"):
+        pytest.skip("La prueba usa aiosqlite sobre la misma BD sqlite")
+    engine = create_async_engine(
+        SQLALCHEMY_DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1),
+        connect_args={"check_same_thread": False},
+        # Cada peticion de TestClient corre en su propio event loop
+        poolclass=NullPool,
+    )
+    AsyncSessionLocal = sessionmaker(
+        engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+    sessions = []
+
+    async def get_async_db():
+        async with AsyncSessionLocal() as db:
+            sessions.append(db)
+            yield db
+
+    monkeypatch.setattr(data_conexion, "DATABASE_ASYNC", True)
+    monkeypatch.setitem(main.app.dependency_overrides, get_db, get_async_db)
+    yield sessions
+
+    db = SessionLocal()
+    db.query(Module).filter(Module.name.like("async-%")).delete(
+        synchronize_session=False
+    )
+    db.commit()
+    db.close()
+
+
+def test_module_router_with_async_session(async_db) -> None:
+    """Crear y listar modulos funciona con la AsyncSession."""
+    token = AuthJWT().create_access_token(
+        subject=str(uuid4()),
+        user_claims={"permissions": {"modules": ["create", "read"]}},
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+    name = f"async-{uuid4().hex[:8]}"
+
+    response = client.post(
+        "/modules/create",
+        headers=headers,
+        json={"name": name, "description": "async session"},
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+
+    response = client.get("/modules/", headers=headers, params={"limit": 1000})
+    assert response.status_code == status.HTTP_200_OK
+    assert name in {module["name"] for module in response.json()["data"]}
+    assert async_db and all(isinstance(db, AsyncSession) for db in async_db)
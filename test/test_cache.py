@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import asyncio
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app import main  # noqa
+from app.database.main import SessionLocal
+from app.dependencies import data_conexion
+from app.dependencies.token_claims import TokenClaims
+from app.dependencies.verify_user import require_user
+from app.extras.cache import TTLCache
+from app.internal.cache_events import CacheInvalidationChannel
+from app.internal.user_validity import user_validity_cache
+from app.models.cache_events import Cache_Events
+
+
+class FakeClock:
+    """Reloj manual para controlar la expiracion."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_expiration() -> None:
+    """Las entradas expiran al pasar el TTL."""
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+    cache.set("role", {"users": ["read"]})
+    assert cache.get("role") == {"users": ["read"]}
+
+    clock.now = 6
+    assert cache.get("role") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction() -> None:
+    """Al llenarse se saca la entrada menos usada."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_get_or_load_and_invalidate() -> None:
+    """get_or_load solo llama al loader en un miss."""
+    cache = TTLCache(maxsize=10, ttl=60)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_load("role", loader) == 1
+    assert cache.get_or_load("role", loader) == 1
+    cache.invalidate("role")
+    assert cache.get_or_load("role", loader) == 2
+
+
+def test_stale_load_is_discarded() -> None:
+    """Si se invalida mientras se carga, no se guarda el valor viejo."""
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    def loader():
+        cache.invalidate("role")
+        return "stale"
+
+    assert cache.get_or_load("role", loader) == "stale"
+    assert cache.get("role") is None
+
+
+def test_invalidation_channel_between_workers() -> None:
+    """Un worker publica y otro aplica la invalidacion al consultar."""
+    db = SessionLocal()
+    try:
+        publisher = CacheInvalidationChannel(interval=1, retention=3600)
+        subscriber = CacheInvalidationChannel(interval=1, retention=3600)
+        cache = TTLCache(maxsize=10, ttl=60)
+        subscriber.register("users", cache)
+        cache.set("user-id", True)
+
+        # La primera consulta solo toma el ultimo id existente
+        assert subscriber.poll(db) == 0
+
+        publisher.publish(db, "users", "user-id")
+        db.commit()
+
+        assert subscriber.poll(db) == 1
+        assert cache.get("user-id") is None
+    finally:
+        db.query(Cache_Events).delete()
+        db.commit()
+        db.close()
+
+
+def test_require_user_counts_one_miss(monkeypatch) -> None:
+    """Un miss de require_user lee el cache una vez y el siguiente es hit."""
+    # Se le pasa una Session sincrona tambien cuando la app usa DATABASE_ASYNC
+    monkeypatch.setattr(data_conexion, "DATABASE_ASYNC", False)
+    db = SessionLocal()
+    claims = TokenClaims({"sub": str(uuid4())})
+    misses, hits = user_validity_cache.misses, user_validity_cache.hits
+    try:
+        for _ in range(2):
+            with pytest.raises(HTTPException):
+                asyncio.run(require_user(db=db, claims=claims))
+    finally:
+        db.close()
+
+    assert user_validity_cache.misses - misses == 1
+    assert user_validity_cache.hits - hits == 1
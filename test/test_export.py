@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import json
+from uuid import uuid4
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from fastapi_another_jwt_auth import AuthJWT
+
+from app import main
+from app.database.main import SessionLocal
+from app.extras.hashing import Hash
+from app.models.actions import Actions
+from app.models.module import Module
+from app.models.role_actions import Role_Actions
+from app.models.roles import Role
+from app.models.users import Users
+
+client = TestClient(app=main.app)
+
+
+@pytest.fixture(scope="module")
+def header():
+    """Un registro de cada tabla exportada y un token que puede leerlas."""
+    db = SessionLocal()
+    tag = uuid4().hex[:8]
+    role = Role(id=uuid4(), name=f"export-{tag}", description="export")
+    module = Module(id=uuid4(), name=f"export-{tag}", description="export")
+    action = Actions(
+        id=uuid4(), action_name="read", is_active=True, module_id=module.id
+    )
+    permission = Role_Actions(id=uuid4(), role_id=role.id, actions_id=action.id)
+    user = Users(
+        id=uuid4(),
+        email=f"export-{tag}@example.com",
+        password=Hash().bcrypt("test_password"),
+        role_id=role.id,
+    )
+    rows = [role, module, action, permission, user]
+    keys = [(type(row), row.id) for row in rows]
+    for row in rows:
+        db.add(row)
+        db.flush()
+    db.commit()
+
+    # El usuario en sesion no se exporta, el token es de otro usuario
+    token = AuthJWT().create_access_token(
+        subject=str(uuid4()),
+        user_claims={
+            "permissions": {
+                name: ["read"] for name in ("users", "roles", "actions", "permissions")
+            }
+        },
+    )
+    yield {"Authorization": f"Bearer {token}"}
+
+    for model, id in keys[::-1]:
+        db.query(model).filter(model.id == id).delete()
+    db.commit()
+    db.close()
+
+
+@pytest.mark.parametrize(
+    "endpoint, fields",
+    [
+        ("/users/export", ["id", "email", "is_active", "role_id", "role_name"]),
+        ("/roles/export", ["id", "name", "description"]),
+        (
+            "/actions/export",
+            [
+                "id",
+                "action_name",
+                "description",
+                "is_active",
+                "module_id",
+                "module_name",
+            ],
+        ),
+        ("/permissions/export", ["id", "actions_id", "role_id", "description"]),
+    ],
+)
+def test_export_items(header, endpoint, fields) -> None:
+    """Verificamos la exportacion en NDJSON y CSV.
+
+    Args:
+        header (dict): Header con el token
+        endpoint (str): ruta a la cual se ejecutara el test.
+        fields (list): columnas exportadas.
+    """
+    response = client.get(endpoint, headers=header)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows and all(list(row) == fields for row in rows)
+
+    response = client.get(endpoint + "?format=csv", headers=header)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+    lines = response.text.splitlines()
+    assert lines[0] == ",".join(fields)
+    assert len(lines) == len(rows) + 1
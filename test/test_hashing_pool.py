@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import threading
+
+import pytest
+from fastapi import status
+
+from app import main
+from app.extras import hashing
+from app.extras.hashing import HashingPool, HashingPoolSaturated
+
+
+def test_pool_hash_and_verify() -> None:
+    """El pool regresa el mismo resultado que passlib."""
+    pool = HashingPool(workers=2, max_queue=2, retry_after=1)
+    hashed = pool.run(hashing.pwd_context.hash, "test_password")
+    assert pool.run(hashing.pwd_context.verify, "test_password", hashed)
+    assert pool.stats()["completed"] == 2
+    assert pool.stats()["in_flight"] == 0
+
+
+def test_pool_rejects_when_saturated() -> None:
+    """Con la cola llena se levanta HashingPoolSaturated."""
+    pool = HashingPool(workers=1, max_queue=1, retry_after=3)
+    release = threading.Event()
+    pending = [pool.submit(release.wait) for _ in range(2)]
+
+    with pytest.raises(HashingPoolSaturated) as exc:
+        pool.submit(release.wait)
+    assert exc.value.retry_after == 3
+    assert pool.stats()["rejected"] == 1
+    assert pool.stats()["queued"] == 1
+
+    release.set()
+    for future in pending:
+        future.result()
+    assert pool.stats()["in_flight"] == 0
+
+
+def test_saturated_handler_returns_503() -> None:
+    """El handler responde 503 con el header Retry-After."""
+    response = main.hashing_pool_saturated_handler(
+        None, HashingPoolSaturated(retry_after=5)  # type: ignore
+    )
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "5"
+
+
+def test_pool_map_keeps_order() -> None:
+    """map regresa los resultados en orden aunque la cola sea pequeña."""
+    pool = HashingPool(workers=2, max_queue=0, retry_after=1)
+    assert pool.map(str.upper, ["a", "b", "c", "d", "e"]) == list("ABCDE")
+    assert pool.stats()["completed"] == 5
+    assert pool.stats()["rejected"] == 0
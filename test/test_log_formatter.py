@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import json
+import logging
+import sys
+
+from app.extras.custom_json_format import CustomJsonFormatter, OrjsonEcsFormatter
+
+
+def make_record(**kwargs) -> logging.LogRecord:
+    """Registro con el extra event.category como en app/internal."""
+    record = logging.LogRecord(
+        "root", logging.INFO, __file__, 1, "User %s created", ("john",), None
+    )
+    record.__dict__["event.category"] = "app_log"
+    record.__dict__.update(kwargs)
+    return record
+
+
+def test_same_fields_as_json_formatter() -> None:
+    """Los campos ECS son los mismos que con python-json-logger."""
+    record = make_record()
+    old = json.loads(
+        CustomJsonFormatter(
+            "%(@timestamp)s %(log.level)s %(log.logger)s %(message)s"
+        ).format(record)
+    )
+    new = json.loads(OrjsonEcsFormatter().format(record))
+
+    assert list(new) == list(old)
+    old.pop("@timestamp")
+    assert {k: v for k, v in new.items() if k != "@timestamp"} == old
+
+
+def test_timestamp_prefix_per_second() -> None:
+    """El prefijo se reutiliza dentro del mismo segundo."""
+    formatter = OrjsonEcsFormatter()
+    assert formatter.timestamp(0.5) == "1970-01-01T00:00:00.500000Z"
+    assert formatter.timestamp(0.25) == "1970-01-01T00:00:00.250000Z"
+    assert formatter.timestamp(61.125) == "1970-01-01T00:01:01.125000Z"
+
+
+def test_exception_is_included() -> None:
+    """La traza de la excepcion se agrega como exc_info."""
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = make_record(exc_info=sys.exc_info())
+
+    data = json.loads(OrjsonEcsFormatter().format(record))
+    assert "ValueError: boom" in data["exc_info"]
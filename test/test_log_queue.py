@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import json
+import logging
+import queue
+
+from app.extras.custom_json_format import CustomJsonFormatter, OrjsonEcsFormatter
+from app.extras.log_queue import (
+    BatchQueueListener,
+    BufferedRotatingFileHandler,
+    DroppingQueueHandler,
+)
+
+
+def make_logger(name: str, handler: logging.Handler) -> logging.Logger:
+    """Logger aislado para no tocar el root logger de la app."""
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.handlers = [handler]
+    return logger
+
+
+def test_full_queue_drops_and_counts() -> None:
+    """Con la cola llena el registro se descarta sin bloquear."""
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    logger = make_logger("test.log_queue.drop", handler)
+
+    for i in range(5):
+        logger.info("record %s", i)
+
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_listener_writes_batches(tmp_path) -> None:
+    """El listener escribe todos los registros con el formato JSON."""
+    path = tmp_path / "log.json"
+    file_handler = BufferedRotatingFileHandler(path, encoding="UTF-8")
+    file_handler.setFormatter(
+        CustomJsonFormatter("%(@timestamp)s %(log.level)s %(log.logger)s %(message)s")
+    )
+    log_queue: queue.Queue = queue.Queue(maxsize=100)
+    listener = BatchQueueListener(log_queue, file_handler, batch_size=10)
+    logger = make_logger("test.log_queue.write", DroppingQueueHandler(log_queue))
+
+    listener.start()
+    for i in range(25):
+        logger.info("record %s", i, extra={"event.category": "app_log"})
+    listener.stop()
+    file_handler.close()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["message"] for line in lines] == [f"record {i}" for i in range(25)]
+    assert lines[0]["log.level"] == "INFO"
+    assert lines[0]["event.category"] == "app_log"
+
+
+def test_exception_survives_the_queue(tmp_path) -> None:
+    """logger.exception conserva la traza al pasar por la cola."""
+    path = tmp_path / "log.json"
+    file_handler = BufferedRotatingFileHandler(path, encoding="UTF-8")
+    file_handler.setFormatter(OrjsonEcsFormatter())
+    log_queue: queue.Queue = queue.Queue(maxsize=100)
+    listener = BatchQueueListener(log_queue, file_handler, batch_size=10)
+    logger = make_logger("test.log_queue.exception", DroppingQueueHandler(log_queue))
+
+    listener.start()
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("failed %s", "job", extra={"event.category": "app_log"})
+    listener.stop()
+    file_handler.close()
+
+    (line,) = [json.loads(line) for line in path.read_text().splitlines()]
+    assert line["message"] == "failed job"
+    assert line["log.level"] == "ERROR"
+    assert "Traceback" in line["exc_info"]
+    assert "ValueError: boom" in line["exc_info"]
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import datetime
+
+import pytest
+
+from app import main  # noqa
+from app.database.main import SessionLocal
+from app.extras.pagination import (
+    InvalidCursor,
+    count_cache,
+    count_rows,
+    decode_cursor,
+    paginate,
+)
+from app.models.module import Module
+
+
+@pytest.fixture()
+def modules():
+    """Cinco modulos, dos con el mismo created_on para probar el desempate."""
+    db = SessionLocal()
+    created = datetime.datetime(2022, 1, 1)
+    items = [
+        Module(name=f"pagination-{i}", created_on=created + datetime.timedelta(i // 2))
+        for i in range(5)
+    ]
+    db.add_all(items)
+    db.commit()
+    yield db
+    db.query(Module).filter(Module.name.like("pagination-%")).delete(
+        synchronize_session=False
+    )
+    db.commit()
+    db.close()
+
+
+def test_cursor_walks_forward_and_back(modules) -> None:
+    """Con next_cursor se recorre todo y con prev_cursor se regresa."""
+    db = modules
+    query = db.query(Module).filter(Module.name.like("pagination-%"))
+    expected = [m.id for m in query.order_by(Module.created_on, Module.id).all()]
+
+    first = paginate(query, Module.created_on, Module.id, limit=2)
+    assert first.prev_cursor is None
+    second = paginate(
+        query, Module.created_on, Module.id, limit=2, cursor=first.next_cursor
+    )
+    third = paginate(
+        query, Module.created_on, Module.id, limit=2, cursor=second.next_cursor
+    )
+    assert third.next_cursor is None
+
+    seen = [m.id for page in (first, second, third) for m in page.rows]
+    assert seen == expected
+
+    back = paginate(
+        query, Module.created_on, Module.id, limit=2, cursor=third.prev_cursor
+    )
+    assert [m.id for m in back.rows] == [m.id for m in second.rows]
+
+    # El offset sigue funcionando y da el mismo orden
+    offset = paginate(query, Module.created_on, Module.id, start=2, limit=2)
+    assert [m.id for m in offset.rows] == expected[2:4]
+
+
+def test_count_rows_is_cached(modules) -> None:
+    """El total respeta los filtros y se reutiliza mientras no expire."""
+    db = modules
+    query = db.query(Module).filter(Module.name.like("pagination-%"))
+    count_cache.clear()
+
+    assert count_rows(query, Module.id) == 5
+    hits = count_cache.stats()["hits"]
+    assert count_rows(query, Module.id) == 5
+    assert count_cache.stats()["hits"] == hits + 1
+
+    # Otro filtro es otra llave
+    assert count_rows(query.filter(Module.name == "pagination-0"), Module.id) == 1
+    # En sqlite no hay estadisticas, se hace el COUNT
+    assert count_rows(query, Module.id, approximate=True) == 5
+
+
+def test_invalid_cursor() -> None:
+    """Un cursor alterado levanta InvalidCursor."""
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not-a-cursor")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import asyncio
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app import main  # noqa
+from app.dependencies.permissions import RoleChecker
+from app.dependencies.token_claims import TokenClaims
+from app.extras.permission_bits import PermissionVocabulary, permission_vocabulary
+from app.internal import auth
+from app.internal.permission_map import permission_cache
+
+
+def test_encode_and_decode() -> None:
+    """Los permisos se recuperan igual despues de convertirlos en bits."""
+    vocabulary = PermissionVocabulary(["users", "roles"], ["create", "read"])
+    permissions = {"users": ["read"], "roles": ["create", "read"]}
+    bits = vocabulary.encode(permissions)
+
+    assert bits == 0b1110
+    assert vocabulary.decode(bits) == {"users": ["read"], "roles": ["create", "read"]}
+    # Lo que no esta en el vocabulario se ignora
+    assert vocabulary.encode({"searches": ["read"]}) == 0
+
+
+def test_fingerprint_changes_with_vocabulary() -> None:
+    """Agregar un modulo cambia el fingerprint."""
+    before = PermissionVocabulary(["users"], ["create"])
+    after = PermissionVocabulary(["users", "roles"], ["create"])
+    assert before.fingerprint != after.fingerprint
+
+
+def test_role_checker_uses_bits_and_dict() -> None:
+    """Ambas formas del token dan el mismo resultado."""
+    checker = RoleChecker({"module": "users", "permission": "delete"})
+    allowed = {"users": ["read", "delete"]}
+    denied = {"users": ["read"]}
+
+    for permissions, expected in ((allowed, True), (denied, False)):
+        bits_claims = {
+            "permissions": permissions,
+            **permission_vocabulary.claims(permissions),
+        }
+        assert checker.is_allowed({"permissions": permissions}) is expected
+        assert checker.is_allowed(bits_claims) is expected
+
+
+def test_role_checker_ignores_other_vocabulary() -> None:
+    """Con otro fingerprint se usa el diccionario."""
+    checker = RoleChecker({"module": "users", "permission": "read"})
+    claims = {"permissions": {"users": ["read"]}, "perm_bits": 0, "perm_v": "old"}
+    assert checker.is_allowed(claims) is True
+
+
+def test_compact_claims_leave_out_permissions(monkeypatch) -> None:
+    """El formato compact solo lleva perm_bits y perm_ver."""
+    permissions = {"users": ["read"], "reports": ["read"]}
+    monkeypatch.setattr(auth, "TOKEN_PERMISSIONS", "compact")
+    claims = auth.permission_claims(3, permissions)
+    assert "permissions" not in claims
+    assert claims["perm_ver"] == 3
+    assert claims["perm_bits"] == permission_vocabulary.encode(permissions)
+
+    monkeypatch.setattr(auth, "TOKEN_PERMISSIONS", "embedded")
+    assert auth.permission_claims(3, permissions)["permissions"] == permissions
+
+
+def test_role_checker_resolves_compact_token() -> None:
+    """Un permiso fuera del vocabulario se busca en el mapa en memoria."""
+    role_id = str(uuid4())
+    permission_cache.set(role_id, (3, {"reports": ["read"]}))
+    claims = {"role": role_id, "perm_ver": 3, "perm_bits": 0, "perm_v": "x"}
+
+    reports = RoleChecker({"module": "reports", "permission": "read"})
+    assert asyncio.run(reports(TokenClaims(claims), None)) is None
+
+    users = RoleChecker({"module": "users", "permission": "read"})
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(users(TokenClaims(claims), None))
+    assert error.value.status_code == 403
+    permission_cache.invalidate(role_id)
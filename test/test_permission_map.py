@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from types import SimpleNamespace
+from uuid import uuid4
+
+import orjson
+import pytest
+from fastapi_another_jwt_auth import AuthJWT
+from sqlalchemy import event
+
+from app import main  # noqa
+from app.database.main import SessionLocal, engine
+from app.extras.hashing import Hash
+from app.internal.auth import AuthActions
+from app.internal.permission_map import (
+    _query_permission_map,
+    group_permissions,
+    permission_cache,
+)
+from app.models.actions import Actions
+from app.models.module import Module
+from app.models.role_actions import Role_Actions
+from app.models.roles import Role
+from app.models.users import Users
+from app.schemas.schemas_config import Login
+
+
+def test_group_permissions() -> None:
+    """Agrupa por modulo ordenado y sin acciones repetidas."""
+    pairs = [("users", "read"), ("roles", "read"), ("users", "read")]
+    assert group_permissions(pairs) == {"roles": ["read"], "users": ["read"]}
+    assert group_permissions([]) == {}
+
+
+@pytest.fixture()
+def user():
+    """Usuario con un rol que tiene dos acciones en dos modulos."""
+    db = SessionLocal()
+    tag = uuid4().hex[:8]
+    ids = SimpleNamespace(role=uuid4(), user=uuid4(), email=f"fetch-{tag}@example.com")
+    db.add(Role(id=ids.role, name=f"fetch-{tag}", description="fetch"))
+    rows = []
+    for module_name, action_name in (("zeta", "read"), ("alpha", "update")):
+        module = Module(id=uuid4(), name=f"{module_name}-{tag}", description="fetch")
+        action = Actions(
+            id=uuid4(), action_name=action_name, is_active=True, module_id=module.id
+        )
+        rows += [
+            module,
+            action,
+            Role_Actions(id=uuid4(), role_id=ids.role, actions_id=action.id),
+        ]
+    db.add_all(rows)
+    keys = [(type(row), row.id) for row in rows]
+    db.add(
+        Users(
+            id=ids.user,
+            email=ids.email,
+            password=Hash().bcrypt("test_password"),
+            role_id=ids.role,
+        )
+    )
+    db.commit()
+    db.expunge_all()
+    yield db, ids
+
+    db.rollback()
+    db.query(Users).filter(Users.id == ids.user).delete()
+    for model, id in keys[::-1]:
+        db.query(model).filter(model.id == id).delete()
+    db.query(Role).filter(Role.id == ids.role).delete()
+    db.commit()
+    db.close()
+
+
+def test_login_fetches_user_and_permissions_once(user) -> None:
+    """user_login trae el usuario y sus permisos con una sola consulta."""
+    db, ids = user
+    permission_cache.clear()
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        response = AuthActions().user_login(
+            Login(email=ids.email, password="test_password"), db, AuthJWT()
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert response.status_code == 200
+    permissions = orjson.loads(response.body)["data"]["permissions"]
+    assert permissions == _query_permission_map(db, str(ids.role))
+    assert list(permissions) == sorted(permissions)
+    assert len(statements) == 1
+    # El mapa leido en el login queda en el cache para RoleChecker
+    assert permission_cache.get(str(ids.role))[1] == permissions
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import asyncio
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from fastapi_another_jwt_auth import AuthJWT
+
+from app import main  # noqa
+from app.database.main import SessionLocal
+from app.dependencies.permissions import RoleChecker
+from app.dependencies.token_claims import TokenClaims
+from app.internal.actions import ActionsOperations
+from app.internal.cache_events import cache_channel
+from app.internal.module import ModuleActions
+from app.internal.permission_version import (
+    PermissionVersions,
+    bump_permission_version,
+    permission_versions,
+)
+from app.models.actions import Actions
+from app.models.cache_events import Cache_Events
+from app.models.module import Module
+from app.models.role_actions import Role_Actions
+from app.models.roles import Role
+from app.schemas.action_schemas import ActionCreate
+from app.schemas.module_schemas import ModuleCreate
+
+
+def test_versions_only_go_up() -> None:
+    """Una version vieja no reemplaza a la conocida."""
+    versions = PermissionVersions()
+    versions.update({"a": 3})
+    versions.update({"a": 2})
+    versions.invalidate("a:1")
+    assert versions.get("a") == 3
+    versions.invalidate("a:4")
+    assert versions.get("a") == 4
+
+    assert versions.is_stale("a", 3) is True
+    assert versions.is_stale("a", 4) is False
+    # Tokens sin perm_ver y roles que nunca cambiaron
+    assert versions.is_stale("a", None) is False
+    assert versions.is_stale("b", 0) is False
+
+
+@pytest.fixture()
+def role():
+    """Rol temporal."""
+    db = SessionLocal()
+    role = Role(id=uuid4(), name=f"version-{uuid4().hex[:8]}", description="version")
+    db.add(role)
+    db.commit()
+    role_id = role.id
+    yield db, role_id
+    db.rollback()
+    db.query(Role).filter(Role.id == role_id).delete()
+    db.commit()
+    db.close()
+
+
+def test_bump_applies_on_commit_only(role) -> None:
+    """La version en memoria cambia con el commit, no con el rollback."""
+    db, role_id = role
+    bump_permission_version(db, [role_id])
+    db.rollback()
+    assert permission_versions.get(role_id) == 0
+
+    bump_permission_version(db, [role_id, str(role_id)])
+    assert permission_versions.get(role_id) == 0
+    db.commit()
+    assert permission_versions.get(role_id) == 1
+    assert db.query(Role.perm_version).filter(Role.id == role_id).scalar() == 1
+
+
+def test_role_checker_rejects_stale_token(role) -> None:
+    """Un token con una version vieja pide refresh, sin importar los permisos."""
+    db, role_id = role
+    checker = RoleChecker({"module": "users", "permission": "read"})
+    claims = {
+        "role": str(role_id),
+        "perm_ver": 0,
+        "permissions": {"users": ["read"]},
+    }
+    assert asyncio.run(checker(TokenClaims(claims), db)) is None
+
+    bump_permission_version(db, [role_id])
+    db.commit()
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(checker(TokenClaims(claims), db))
+    assert error.value.status_code == 401
+    assert error.value.detail["refresh_required"] is True
+
+    assert asyncio.run(checker(TokenClaims({**claims, "perm_ver": 1}), db)) is None
+
+
+def test_restore_bumps_roles_with_grants(role) -> None:
+    """Restaurar un modulo o una accion sube la version de sus roles."""
+    db, role_id = role
+    module = Module(id=uuid4(), name=f"version-{uuid4().hex[:8]}", description="v")
+    action = Actions(
+        id=uuid4(), action_name="read", is_active=True, module_id=module.id
+    )
+    grant = Role_Actions(id=uuid4(), role_id=role_id, actions_id=action.id)
+    db.add_all([module, action, grant])
+    db.commit()
+    ids = (grant.id, action.id, module.id)
+    try:
+        # Eliminados fuera de la API, el permiso sigue asignado
+        for model, id in ((Actions, action.id), (Module, module.id)):
+            db.query(model).filter(model.id == id).update(model.deleted_values())
+        db.commit()
+
+        ModuleActions().create_module(
+            db, ModuleCreate(name=module.name, description="v"), str(uuid4())
+        )
+        assert permission_versions.get(role_id) == 1
+        ActionsOperations().create_new_action(
+            db,
+            str(uuid4()),
+            ActionCreate(action_name="read", is_active=True, module_id=module.id),
+        )
+        assert permission_versions.get(role_id) == 2
+        assert db.query(Actions.is_active).filter(Actions.id == action.id).scalar()
+    finally:
+        db.rollback()
+        for model, id in zip((Role_Actions, Actions, Module), ids):
+            db.query(model).filter(model.id == id).delete()
+        db.commit()
+
+
+def test_remote_bump_reaches_role_checker(role, monkeypatch) -> None:
+    """Una version que sube otro worker rechaza el token viejo en RoleChecker."""
+    db, role_id = role
+    client = TestClient(app=main.app)
+    token = AuthJWT().create_access_token(
+        subject=str(uuid4()),
+        user_claims={
+            "role": str(role_id),
+            "perm_ver": 0,
+            "permissions": {"modules": ["read"]},
+        },
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+    monkeypatch.setattr(cache_channel, "interval", 1)
+    # La primera consulta toma el id mas alto actual como punto de partida
+    monkeypatch.setattr(cache_channel, "_last_id", None)
+    # Cada peticion encuentra el canal listo para consultar
+    monkeypatch.setattr(cache_channel, "_last_poll", float("-inf"))
+    assert client.get("/modules/", headers=headers).status_code == 200
+
+    # Otro worker: cambia la BD y publica el evento, sin tocar esta memoria
+    db.query(Role).filter(Role.id == role_id).update({Role.perm_version: 1})
+    db.add(Cache_Events(cache="permission_versions", key=f"{role_id}:1"))
+    db.commit()
+    assert permission_versions.get(role_id) == 0
+    try:
+        monkeypatch.setattr(cache_channel, "_last_poll", float("-inf"))
+        response = client.get("/modules/", headers=headers)
+        assert response.status_code == 401
+        assert response.json()["detail"]["refresh_required"] is True
+    finally:
+        db.query(Cache_Events).delete()
+        db.commit()
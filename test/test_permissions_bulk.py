@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from fastapi_another_jwt_auth import AuthJWT
+
+from app import main
+from app.database.main import SessionLocal
+from app.models.actions import Actions
+from app.models.module import Module
+from app.models.role_actions import Role_Actions
+from app.models.roles import Role
+
+client = TestClient(app=main.app)
+
+
+@pytest.fixture()
+def bulk():
+    """Rol sin permisos, un modulo con tres acciones y un token de permissions."""
+    db = SessionLocal()
+    tag = uuid4().hex[:8]
+    ids = SimpleNamespace(
+        role=uuid4(),
+        module=uuid4(),
+        create=uuid4(),
+        read=uuid4(),
+        update=uuid4(),
+    )
+    db.add(Role(id=ids.role, name=f"bulk-{tag}", description="bulk"))
+    db.add(Module(id=ids.module, name=f"bulk-{tag}", description="bulk"))
+    db.flush()
+    for action in ("create", "read", "update"):
+        db.add(
+            Actions(
+                id=getattr(ids, action),
+                action_name=action,
+                is_active=True,
+                module_id=ids.module,
+            )
+        )
+    db.commit()
+    token = AuthJWT().create_access_token(
+        subject=str(uuid4()),
+        user_claims={"permissions": {"permissions": ["create", "delete"]}},
+    )
+    yield {"Authorization": f"Bearer {token}"}, ids
+
+    db.query(Role_Actions).filter(Role_Actions.role_id == ids.role).delete()
+    db.query(Actions).filter(Actions.module_id == ids.module).delete()
+    db.query(Module).filter(Module.id == ids.module).delete()
+    db.query(Role).filter(Role.id == ids.role).delete()
+    db.commit()
+    db.close()
+
+
+def test_assing_actions_bulk(bulk):
+    """Validando la diferencia entre los permisos actuales y los pedidos.
+
+    Args:
+        bulk (Yield): Header con el token y los IDs del rol y las acciones
+    """
+    header, ids = bulk
+    role_id = str(ids.role)
+    create, read, update = str(ids.create), str(ids.read), str(ids.update)
+    unknown = str(uuid4())
+
+    request = {"role_id": role_id, "actions_id": [create, read, update, unknown]}
+    response = client.post("/permissions/bulk", headers=header, json=request)
+    assert response.status_code == status.HTTP_200_OK
+    report = response.json()
+    assert sorted(report["assigned"]) == sorted([create, read, update])
+    assert report["invalid"] == [unknown]
+
+    request = {"role_id": role_id, "actions_id": [create, read], "replace": True}
+    report = client.post("/permissions/bulk", headers=header, json=request).json()
+    assert report["revoked"] == [update]
+    assert sorted(report["unchanged"]) == sorted([create, read])
+
+    request = {"role_id": role_id, "actions_id": [update], "revoke_id": [create]}
+    report = client.post("/permissions/bulk", headers=header, json=request).json()
+    assert (report["restored"], report["revoked"], report["assigned"]) == (
+        [update],
+        [create],
+        [],
+    )
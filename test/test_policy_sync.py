@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import pytest
+from pydantic import ValidationError
+
+from uuid import uuid4
+
+from app import main  # noqa
+from app.database.main import SessionLocal
+from app.internal.policy_sync import load_policy, sync_policy
+from app.models.actions import Actions
+from app.models.module import Module
+from app.models.role_actions import Role_Actions
+from app.models.roles import Role
+from app.schemas.policy_schemas import Policy
+
+POLICY = {
+    "modules": {
+        "policy-reports": {"actions": ["create", "read", "delete"]},
+        "policy-audit": {"description": "Audit", "actions": ["read"]},
+    },
+    "roles": {
+        "policy-editor": {"grants": {"policy-reports": "*", "policy-audit": ["read"]}},
+        "policy-viewer": {"grants": {"policy-reports": ["read"]}},
+    },
+}
+
+
+@pytest.fixture()
+def db():
+    """Session que borra lo creado por la politica al final."""
+    db = SessionLocal()
+    yield db
+    roles = db.query(Role.id).filter(Role.name.like("policy-%"))
+    modules = db.query(Module.id).filter(Module.name.like("policy-%"))
+    db.query(Role_Actions).filter(
+        Role_Actions.role_id.in_(roles.scalar_subquery())
+    ).delete(synchronize_session=False)
+    db.query(Actions).filter(Actions.module_id.in_(modules.scalar_subquery())).delete(
+        synchronize_session=False
+    )
+    db.query(Role).filter(Role.name.like("policy-%")).delete(synchronize_session=False)
+    db.query(Module).filter(Module.name.like("policy-%")).delete(
+        synchronize_session=False
+    )
+    db.commit()
+    db.close()
+
+
+def active_grants(db, role_name: str) -> set:
+    """Acciones activas del rol como modulo.accion."""
+    rows = (
+        db.query(Module.name, Actions.action_name)
+        .join(Actions, Actions.module_id == Module.id)
+        .join(Role_Actions, Role_Actions.actions_id == Actions.id)
+        .join(Role, Role.id == Role_Actions.role_id)
+        .filter(Role.name == role_name)
+        .filter(Role_Actions.is_deleted.is_(False))
+    )
+    return {f"{module}.{action}" for module, action in rows}
+
+
+def test_dry_run_then_sync_is_idempotent(db) -> None:
+    """dry-run no escribe, sync aplica y una segunda vez no hay cambios."""
+    policy = Policy.parse_obj(POLICY)
+
+    plan = sync_policy(db, policy, dry_run=True)
+    assert [len(plan.changes[kind]) for kind in plan.changes] == [2, 4, 2, 5]
+    assert db.query(Module).filter(Module.name.like("policy-%")).count() == 0
+
+    sync_policy(db, policy)
+    assert active_grants(db, "policy-viewer") == {"policy-reports.read"}
+    assert len(active_grants(db, "policy-editor")) == 4
+    assert sync_policy(db, policy).total == 0
+
+
+def test_sync_revokes_and_restores(db) -> None:
+    """Los grants de un rol declarado son el conjunto completo."""
+    sync_policy(db, Policy.parse_obj(POLICY))
+
+    changed = {**POLICY, "roles": {"policy-viewer": {"grants": {}}}}
+    plan = sync_policy(db, Policy.parse_obj(changed))
+    assert plan.changes["grants"] == ["- policy-viewer: policy-reports.read"]
+    assert active_grants(db, "policy-viewer") == set()
+
+    plan = sync_policy(db, Policy.parse_obj(POLICY))
+    assert plan.changes["grants"] == ["~ policy-viewer: policy-reports.read (restore)"]
+    assert active_grants(db, "policy-viewer") == {"policy-reports.read"}
+
+
+def test_live_grant_wins_over_deleted_duplicate(db) -> None:
+    """Un duplicado borrado junto al grant vivo no se restaura ni se revoca."""
+    sync_policy(db, Policy.parse_obj(POLICY))
+    grant = (
+        db.query(Role_Actions)
+        .join(Role, Role.id == Role_Actions.role_id)
+        .filter(Role.name == "policy-viewer")
+        .one()
+    )
+    db.add(
+        Role_Actions(
+            id=uuid4(),
+            role_id=grant.role_id,
+            actions_id=grant.actions_id,
+            is_deleted=True,
+        )
+    )
+    db.commit()
+
+    assert sync_policy(db, Policy.parse_obj(POLICY)).total == 0
+
+    changed = {**POLICY, "roles": {"policy-viewer": {"grants": {}}}}
+    plan = sync_policy(db, Policy.parse_obj(changed))
+    assert plan.changes["grants"] == ["- policy-viewer: policy-reports.read"]
+    assert active_grants(db, "policy-viewer") == set()
+
+
+def test_restore_marks_undeclared_roles(db) -> None:
+    """Restaurar un modulo cambia los roles fuera de la politica que lo usan."""
+    sync_policy(db, Policy.parse_obj(POLICY))
+    module = db.query(Module).filter(Module.name == "policy-audit").one()
+    action = db.query(Actions).filter(Actions.module_id == module.id).one()
+    other = Role(id=uuid4(), name="policy-other", description="not declared")
+    db.add(other)
+    db.add(Role_Actions(id=uuid4(), role_id=other.id, actions_id=action.id))
+    db.query(Module).filter(Module.id == module.id).update(Module.deleted_values())
+    db.commit()
+
+    plan = sync_policy(db, Policy.parse_obj(POLICY))
+    assert plan.changes["modules"] == ["~ policy-audit (restore)"]
+    assert other.id in plan.roles_changed
+    assert db.query(Role.perm_version).filter(Role.id == other.id).scalar() == 1
+
+
+def test_policy_rejects_undeclared_grants(tmp_path) -> None:
+    """Los grants solo pueden usar modulos y acciones declarados."""
+    with pytest.raises(ValidationError):
+        Policy.parse_obj({"roles": {"policy-x": {"grants": {"nope": "*"}}}})
+
+    policy_file = tmp_path / "policy.json"
+    policy_file.write_text(
+        '{"modules": {"policy-a": {"actions": ["read"]}},'
+        ' "roles": {"policy-x": {"grants": {"policy-a": ["update"]}}}}'
+    )
+    with pytest.raises(ValidationError):
+        load_policy(str(policy_file))
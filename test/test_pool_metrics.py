@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc
+from sqlalchemy.pool import QueuePool
+
+from app import main
+from app.database.pool_metrics import PoolMetrics, instrumented_pool
+from app.dependencies import metrics_access
+from app.extras.metrics import Histogram
+
+
+client = TestClient(app=main.app)
+
+
+def test_histogram_buckets() -> None:
+    """Cada valor cae en el primer limite mayor o igual."""
+    histogram = Histogram(buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"0.1": 2, "1": 3, "+Inf": 4}
+    assert snapshot["count"] == 4
+
+
+def test_pool_checkout_and_timeout() -> None:
+    """Se registran las conexiones en uso y los timeouts del pool."""
+    metrics = PoolMetrics()
+    engine = create_engine(
+        "sqlite://",
+        poolclass=instrumented_pool(QueuePool, metrics),
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.01,
+    )
+    metrics.attach(engine)
+
+    connection = engine.connect()
+    try:
+        assert metrics.stats()["in_use"] == 1
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    finally:
+        connection.close()
+
+    stats = metrics.stats()
+    assert stats["pool"] == "QueuePool"
+    assert stats["in_use"] == 0
+    assert stats["timeouts"] == 1
+    assert stats["connects"] == 1
+    assert stats["checkout_latency"]["count"] == 2
+
+
+def test_pool_metrics_endpoint(monkeypatch) -> None:
+    """El endpoint regresa las metricas de los pools y caches."""
+    monkeypatch.setattr(metrics_access, "METRICS_TOKEN", "test-metrics-token")
+    response = client.get(
+        "/metrics/pool", headers={"Authorization": "Bearer test-metrics-token"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()["data"]
+    assert {"database", "hashing", "caches"} <= set(data)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app import main
+from app.database.main import engine
+from app.dependencies import metrics_access
+from app.extras import prometheus
+
+
+client = TestClient(app=main.app)
+
+SIGNING = 'method="POST",route="/auth/signing"'
+METRICS_TOKEN = "test-metrics-token"
+
+
+@pytest.fixture(autouse=True)
+def metrics_token(monkeypatch) -> None:
+    """Las metricas piden el token Bearer configurado."""
+    monkeypatch.setattr(metrics_access, "METRICS_TOKEN", METRICS_TOKEN)
+
+
+def scrape() -> dict:
+    """Lee /metrics y regresa {serie: valor}."""
+    response = client.get(
+        "/metrics", headers={"Authorization": f"Bearer {METRICS_TOKEN}"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    samples = {}
+    for line in response.text.splitlines():
+        if not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_metrics_per_route_template() -> None:
+    """Las metricas se agrupan por plantilla de ruta y cuentan las consultas."""
+    before = scrape()
+    user = {"email": "nobody@example.com", "password": "8uscX&6gQEs4!cLU#"}
+    response = client.post("/auth/signing", json=user)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    client.get("/users/3520c0d0-35a3-4caf-803f-0e162ba1ef8e")
+    after = scrape()
+
+    def delta(name: str) -> float:
+        return after[name] - before.get(name, 0)
+
+    assert delta(f'http_requests_total{{{SIGNING},status="400"}}') == 1
+    assert delta(f"http_request_duration_seconds_count{{{SIGNING}}}") == 1
+    assert after[f"http_requests_in_flight{{{SIGNING}}}"] == 0
+    # El login consulta la tabla users, no cae en el bucket de 0 consultas
+    assert delta(f'http_request_db_queries_bucket{{{SIGNING},le="0"}}') == 0
+    assert delta(f"http_request_db_queries_count{{{SIGNING}}}") == 1
+
+    # Un id en la ruta no crea una serie nueva
+    assert any('route="/users/{id}"' in name for name in after)
+    assert not any("3520c0d0" in name for name in after)
+
+
+def test_failed_query_leaves_nothing_behind() -> None:
+    """Una consulta que falla no deja su inicio pendiente en la conexion."""
+    stats = prometheus.RequestStats()
+    token = prometheus._current_request.set(stats)
+    try:
+        with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing_table"))
+            conn.execute(text("SELECT 1"))
+            assert "query_start" not in conn.info
+    finally:
+        prometheus._current_request.reset(token)
+    assert stats.queries == 1
+
+
+def test_route_template_is_cached() -> None:
+    """La plantilla se busca una vez por metodo y path."""
+    path = "/users/9d1f3c52-8e0b-4f7e-a5a1-2f0f3a7c1e11"
+    client.get(path)
+    assert prometheus.route_templates.get(("GET", path)) == "/users/{id}"
+    hits = prometheus.route_templates.hits
+    client.get(path)
+    assert prometheus.route_templates.hits == hits + 1
+
+
+def test_metrics_require_token_or_localhost(monkeypatch) -> None:
+    """Sin el token se rechaza y sin token configurado solo responde a localhost."""
+    for path in ("/metrics", "/metrics/pool"):
+        response = client.get(path)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        response = client.get(path, headers={"Authorization": "Bearer wrong"})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    monkeypatch.setattr(metrics_access, "METRICS_TOKEN", "")
+    # TestClient se presenta como el host "testclient"
+    assert client.get("/metrics").status_code == status.HTTP_403_FORBIDDEN
+    monkeypatch.setattr(metrics_access, "LOCAL_HOSTS", frozenset({"testclient"}))
+    assert client.get("/metrics").status_code == status.HTTP_200_OK
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from typing import Callable, List, Tuple
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import main  # noqa
+from app.database.main import SessionLocal, engine
+from app.internal.auth import user_with_permissions
+from app.internal.module import ModuleActions
+from app.internal.permission_map import (
+    _query_permission_map,
+    roles_with_action,
+    roles_with_module,
+)
+from app.internal.roles import RoleActions
+from app.internal.user_validity import user_exists
+from app.models.users import Users
+
+# Consultas frecuentes de app/internal, cada una debe usar un indice. Los
+# listados no se incluyen, su COUNT recorre por definicion todos los registros.
+HOT_QUERIES: List[Tuple[str, Callable[[Session], object]]] = [
+    ("user_exists", lambda db: user_exists(db, uuid4())),
+    (
+        "login",
+        lambda db: user_with_permissions(db, Users.email == "login@example.com"),
+    ),
+    ("refresh", lambda db: user_with_permissions(db, Users.id == uuid4())),
+    ("permission_map", lambda db: _query_permission_map(db, str(uuid4()))),
+    ("roles_with_action", lambda db: roles_with_action(db, uuid4())),
+    ("roles_with_module", lambda db: roles_with_module(db, uuid4())),
+    ("role_users", lambda db: RoleActions().show_role_with_users(db, uuid4())),
+    ("module_actions", lambda db: ModuleActions().show_module_with_action(db, uuid4())),
+]
+
+
+def capture_selects(db: Session, run: Callable[[Session], object]) -> list:
+    """Ejecuta run y regresa los SELECT que mando a la BD."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        run(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def full_scans(db: Session, statement: str, parameters) -> List[str]:
+    """Tablas que el plan recorre completas, sin indice."""
+    cursor = db.connection().connection.cursor()
+    if engine.dialect.name == "sqlite":
+        cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+        return [
+            row[-1]
+            for row in cursor.fetchall()
+            if row[-1].startswith("SCAN") and "USING" not in row[-1]
+        ]
+
+    cursor.execute("EXPLAIN " + statement, parameters)
+    keys = [column[0] for column in cursor.description]
+    rows = [dict(zip(keys, row)) for row in cursor.fetchall()]
+    return [row["table"] for row in rows if row["type"] == "ALL"]
+
+
+@pytest.mark.parametrize("name, run", HOT_QUERIES, ids=[q[0] for q in HOT_QUERIES])
+def test_hot_queries_use_indexes(name, run) -> None:
+    """EXPLAIN de cada consulta no debe tener recorridos completos."""
+    db = SessionLocal()
+    try:
+        statements = capture_selects(db, run)
+        assert statements, name
+        for statement, parameters in statements:
+            assert full_scans(db, statement, parameters) == [], statement
+    finally:
+        db.close()
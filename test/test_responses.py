@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from collections import namedtuple
+from datetime import datetime
+from uuid import uuid4
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+from app.extras import responses
+from app.schemas import user_schemas
+
+
+Row = namedtuple("Row", "id created_on email is_active role_id role_name is_deleted")
+
+
+def make_rows(total: int) -> list:
+    """Filas como las de get_all_users con columnas de mas."""
+    return [
+        Row(
+            uuid4(),
+            datetime(2022, 8, 17, 12, 30, 15, 125000),
+            f"user{i}@example.com",
+            True,
+            uuid4(),
+            "admin",
+            False,
+        )
+        for i in range(total)
+    ]
+
+
+def test_rows_to_dicts_only_schema_fields() -> None:
+    """Solo se regresan los campos del schema."""
+    row = make_rows(1)[0]
+    data = responses.rows_to_dicts([row], user_schemas.ShowInfoUser)
+    assert data == [
+        {
+            "id": row.id,
+            "email": row.email,
+            "is_active": True,
+            "role_id": row.role_id,
+            "role_name": "admin",
+        }
+    ]
+
+
+def test_list_response_matches_jsonable_encoder(monkeypatch) -> None:
+    """El JSON de orjson es igual al de jsonable_encoder y pasa el schema."""
+    rows = make_rows(3)
+    monkeypatch.setattr(responses, "RESPONSE_VALIDATION", False)
+    response = responses.list_response(
+        {"success": True, "numRows": 3, "data": rows}, user_schemas.ShowInfoUser
+    )
+    assert isinstance(response, ORJSONResponse)
+
+    monkeypatch.setattr(responses, "RESPONSE_VALIDATION", True)
+    encoded = responses.list_response(
+        {"success": True, "numRows": 3, "data": rows}, user_schemas.ShowInfoUser
+    )
+    body = orjson.loads(response.body)
+    assert body == encoded
+    assert body["data"][0]["id"] == str(rows[0].id)
+    user_schemas.ShowUsers(**body)
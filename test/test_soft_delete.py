@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from uuid import uuid4
+
+from app import main  # noqa
+from app.database.main import SessionLocal
+from app.internal.role_action import RoleActions as PermissionActions
+from app.internal.roles import RoleActions
+from app.models import soft_delete
+from app.models.actions import Actions
+from app.models.module import Module
+from app.models.role_actions import Role_Actions
+from app.models.roles import Role
+from app.schemas.role_actions_schemas import bulk_assigned_actions
+
+
+def test_not_deleted_follows_strategy(monkeypatch) -> None:
+    """El filtro usa deleted_at por default y is_deleted con flag."""
+    assert str(Role.not_deleted()) == "roles.deleted_at IS NULL"
+    monkeypatch.setattr(soft_delete, "SOFT_DELETE_STRATEGY", "flag")
+    assert str(Role.not_deleted()) == "roles.is_deleted = false"
+
+
+def test_delete_sets_deleted_at() -> None:
+    """Eliminar un rol escribe is_deleted y deleted_at juntos."""
+    db = SessionLocal()
+    role = Role(id=uuid4(), name=f"soft-{uuid4().hex[:8]}", description="soft")
+    db.add(role)
+    db.commit()
+    try:
+        assert RoleActions().delete_one_role(db, role.id) is None
+        db.refresh(role)
+        assert role.is_deleted is True
+        assert role.deleted_at is not None
+        assert (
+            db.query(Role).filter(Role.id == role.id).filter(Role.not_deleted()).first()
+            is None
+        )
+    finally:
+        db.delete(role)
+        db.commit()
+        db.close()
+
+
+def test_soft_deleted_syncs_is_deleted_only_writes() -> None:
+    """Un registro creado solo con is_deleted queda eliminado en ambas columnas."""
+    db = SessionLocal()
+    role = Role(
+        id=uuid4(), name=f"soft-{uuid4().hex[:8]}", description="soft", is_deleted=True
+    )
+    db.add(role)
+    db.commit()
+    try:
+        assert role.deleted_at is not None
+        assert role.soft_deleted is True
+        row = (
+            db.query(Role.soft_deleted.label("soft_deleted"))
+            .filter(Role.id == role.id)
+            .one()
+        )
+        assert row.soft_deleted is True
+        role.is_deleted = False
+        db.commit()
+        assert role.deleted_at is None
+        assert role.soft_deleted is False
+    finally:
+        db.delete(role)
+        db.commit()
+        db.close()
+
+
+def test_bulk_permissions_prefer_live_duplicate() -> None:
+    """Con filas repetidas del mismo permiso cuenta la viva y no se duplica."""
+    db = SessionLocal()
+    role = Role(id=uuid4(), name=f"soft-{uuid4().hex[:8]}", description="soft")
+    module = Module(id=uuid4(), name=f"soft-{uuid4().hex[:8]}", description="soft")
+    action = Actions(
+        id=uuid4(), action_name="read", is_active=True, module_id=module.id
+    )
+    other = Actions(
+        id=uuid4(), action_name="update", is_active=True, module_id=module.id
+    )
+    live = Role_Actions(id=uuid4(), role_id=role.id, actions_id=action.id)
+    tombstones = [
+        Role_Actions(
+            id=uuid4(), role_id=role.id, actions_id=action.id, is_deleted=True
+        ),
+        Role_Actions(id=uuid4(), role_id=role.id, actions_id=other.id, is_deleted=True),
+        Role_Actions(id=uuid4(), role_id=role.id, actions_id=other.id, is_deleted=True),
+    ]
+    db.add_all([role, module, action, other, live, *tombstones])
+    db.commit()
+    try:
+        res = PermissionActions().assing_actions_bulk(
+            db,
+            bulk_assigned_actions(role_id=role.id, actions_id=[action.id, other.id]),
+            str(uuid4()),
+        )
+        assert res["unchanged"] == [str(action.id)]
+        assert res["restored"] == [str(other.id)]
+        live_rows = (
+            db.query(Role_Actions.actions_id)
+            .filter(Role_Actions.role_id == role.id)
+            .filter(Role_Actions.not_deleted())
+            .all()
+        )
+        assert sorted(row.actions_id for row in live_rows) == sorted(
+            [action.id, other.id]
+        )
+    finally:
+        db.rollback()
+        db.query(Role_Actions).filter(Role_Actions.role_id == role.id).delete()
+        db.query(Actions).filter(Actions.module_id == module.id).delete()
+        db.query(Module).filter(Module.id == module.id).delete()
+        db.query(Role).filter(Role.id == role.id).delete()
+        db.commit()
+        db.close()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import jwt
+import pytest
+from fastapi import Request
+from fastapi_another_jwt_auth import AuthJWT
+from fastapi_another_jwt_auth.exceptions import AccessTokenRequired, MissingTokenError
+
+from app import main  # noqa
+from app.dependencies import token_claims
+from app.dependencies.token_claims import TokenClaims, get_token_claims, token_digest
+from app.extras.cache import TTLCache
+from benchmarks.token_decode import DecodeCounter, build_request
+
+
+def test_token_is_decoded_once(monkeypatch) -> None:
+    """get_token_claims solo decodifica el token una vez."""
+    token = AuthJWT().create_access_token(subject="user-id")
+    counter = DecodeCounter()
+    monkeypatch.setattr(jwt, "decode", counter)
+
+    claims = get_token_claims(AuthJWT(build_request(token)))
+
+    assert claims.subject == "user-id"
+    assert claims.get("type") == "access"
+    assert counter.calls == 1
+
+
+def test_missing_and_refresh_token() -> None:
+    """Se levantan las mismas excepciones que jwt_required()."""
+    with pytest.raises(MissingTokenError):
+        get_token_claims(AuthJWT())
+
+    refresh = AuthJWT().create_refresh_token(subject="user-id")
+    with pytest.raises(AccessTokenRequired):
+        get_token_claims(AuthJWT(build_request(refresh)))
+
+
+def test_verified_token_is_cached(monkeypatch) -> None:
+    """El mismo token en otra peticion no vuelve a validar la firma."""
+    token = AuthJWT().create_access_token(subject="user-id")
+    counter = DecodeCounter()
+    monkeypatch.setattr(jwt, "decode", counter)
+    hits = token_claims.verified_tokens.hits
+
+    first = get_token_claims(AuthJWT(build_request(token)))
+    second = get_token_claims(AuthJWT(build_request(token)))
+
+    assert second is first
+    assert counter.calls == 1
+    assert token_claims.verified_tokens.hits == hits + 1
+
+
+def test_cached_claims_expire_with_token(monkeypatch) -> None:
+    """La entrada del cache vive hasta el exp del token."""
+    now = [0.0]
+    cache = TTLCache(maxsize=10, ttl=0, clock=lambda: now[0])
+    monkeypatch.setattr(token_claims, "verified_tokens", cache)
+    token = AuthJWT().create_access_token(subject="user-id", expires_time=60)
+
+    get_token_claims(AuthJWT(build_request(token)))
+    now[0] = 50
+    assert cache.get(token_digest(token)) is not None
+    now[0] = 61
+    assert cache.get(token_digest(token)) is None
+
+
+def test_claims_are_read_only() -> None:
+    """Los claims compartidos entre peticiones no se pueden modificar."""
+    claims = TokenClaims({"sub": "user-id", "permissions": {"users": ["read"]}})
+
+    assert claims.permissions["users"] == frozenset({"read"})
+    with pytest.raises(TypeError):
+        claims.raw["sub"] = "other"
+    with pytest.raises(AttributeError):
+        claims.raw = {}
+
+
+def test_authjwt_private_api_is_available() -> None:
+    """Falla si una version nueva de la libreria quita lo que usa el camino rapido."""
+    missing = [
+        name for name in token_claims.AUTHJWT_PRIVATE_API if not hasattr(AuthJWT, name)
+    ]
+    assert missing == []
+    assert token_claims._fast_path is True
+
+
+def test_cookie_location_uses_public_api(monkeypatch) -> None:
+    """Con el token en cookies se valida con jwt_required() y no se cachea."""
+    monkeypatch.setattr(AuthJWT, "_token_location", {"cookies"})
+    monkeypatch.setattr(token_claims, "verified_tokens", TTLCache(10, ttl=0))
+    token = AuthJWT().create_access_token(subject="user-id")
+    request = Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/users/",
+            "headers": [(b"cookie", f"access_token_cookie={token}".encode())],
+        }
+    )
+
+    claims = get_token_claims(AuthJWT(request))
+
+    assert claims.subject == "user-id"
+    assert len(token_claims.verified_tokens) == 0
+    with pytest.raises(MissingTokenError):
+        get_token_claims(AuthJWT(Request({"type": "http", "headers": []})))
@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from fastapi_another_jwt_auth import AuthJWT
+from fastapi_another_jwt_auth.exceptions import RevokedTokenError
+
+from app import main
+from app.database.main import SessionLocal
+from app.dependencies.token_claims import get_token_claims
+from app.internal.cache_events import cache_channel
+from app.extras.bloom_filter import BloomFilter
+from app.internal.token_revocation import TokenRevocations, token_revocations
+from app.models.cache_events import Cache_Events
+from app.models.revoked_tokens import Revoked_Tokens
+from app.models.token_watermarks import Token_Watermarks
+from benchmarks.token_decode import build_request
+
+client = TestClient(app=main.app)
+
+
+def test_bloom_filter_has_no_false_negatives() -> None:
+    """Todo lo agregado se encuentra y los falsos positivos son pocos."""
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    added = [str(uuid4()) for _ in range(1000)]
+    bloom.update(added)
+
+    assert all(bloom.might_contain(value) for value in added)
+    false_positives = sum(bloom.might_contain(str(uuid4())) for _ in range(10000))
+    assert false_positives < 300
+    assert bloom.saturated is False
+    bloom.add("one more")
+    assert bloom.saturated is True
+
+
+@pytest.fixture()
+def db():
+    """Session que borra las revocaciones del usuario de prueba."""
+    db = SessionLocal()
+    user_id = str(uuid4())
+    yield db, user_id
+    db.rollback()
+    db.query(Revoked_Tokens).filter(Revoked_Tokens.user_id == user_id).delete()
+    db.query(Token_Watermarks).filter(Token_Watermarks.user_id == user_id).delete()
+    db.commit()
+    db.close()
+
+
+def claims_of(token: str):
+    """Claims como los valida la dependencia compartida."""
+    return get_token_claims(AuthJWT(build_request(token)))
+
+
+def test_revoked_jti_is_rejected(db) -> None:
+    """Solo el token revocado se rechaza y los demas no consultan la BD."""
+    db, user_id = db
+    revoked = AuthJWT().create_access_token(subject=user_id)
+    other = AuthJWT().create_access_token(subject=user_id)
+
+    token_revocations.revoke_token(db, claims_of(revoked).raw)
+
+    with pytest.raises(RevokedTokenError):
+        claims_of(revoked)
+    lookups = token_revocations.lookups
+    assert claims_of(other).subject == user_id
+    assert token_revocations.lookups - lookups <= 1
+
+
+def test_watermark_revokes_previous_tokens(db) -> None:
+    """La marca del usuario revoca sus access y refresh tokens anteriores."""
+    db, user_id = db
+    access = AuthJWT().create_access_token(subject=user_id)
+    refresh = AuthJWT().create_refresh_token(subject=user_id)
+    # La marca es en segundos enteros, los tokens del mismo segundo siguen vivos
+    time.sleep(1 - time.time() % 1)
+
+    token_revocations.revoke_user(db, user_id)
+
+    with pytest.raises(RevokedTokenError):
+        claims_of(access)
+    with pytest.raises(RevokedTokenError):
+        AuthJWT(build_request(refresh)).jwt_refresh_token_required()
+    # Otro usuario no se ve afectado
+    assert claims_of(AuthJWT().create_access_token(subject=str(uuid4())))
+
+
+def test_login_right_after_revoke_user(db) -> None:
+    """Un token emitido en el mismo segundo que la marca sigue valido.
+
+    La marca va en segundos enteros como el iat, tambien en el worker que la
+    carga de la BD.
+    """
+    db, user_id = db
+    token_revocations.revoke_user(db, user_id)
+    token = AuthJWT().create_access_token(subject=user_id)
+
+    assert claims_of(token).subject == user_id
+    restarted = TokenRevocations(capacity=100, error_rate=0.01, cleanup_interval=60)
+    restarted.load(db)
+    raw = claims_of(token).raw
+    assert restarted.is_revoked(raw) is False
+    mark = db.query(Token_Watermarks).filter_by(user_id=user_id).one()
+    assert mark.revoked_before.microsecond == 0
+    iat = int(mark.revoked_before.timestamp())
+    assert restarted.is_revoked({**raw, "iat": iat}) is False
+    assert restarted.is_revoked({**raw, "iat": iat - 1}) is True
+
+
+def test_own_event_is_not_added_twice(db) -> None:
+    """El eco de cache_channel no vuelve a contar el jti en el filtro."""
+    db, user_id = db
+    worker = TokenRevocations(capacity=100, error_rate=0.01, cleanup_interval=60)
+    raw = claims_of(AuthJWT().create_access_token(subject=user_id)).raw
+
+    worker.revoke_token(db, raw)
+    worker.invalidate(f"jti:{raw['jti']}")
+
+    assert worker.stats()["tokens"] == 1
+
+
+def test_other_worker_learns_revocations(db) -> None:
+    """Un worker aplica los eventos de cache_channel y carga desde la BD."""
+    db, user_id = db
+    raw = claims_of(AuthJWT().create_access_token(subject=user_id)).raw
+    token_revocations.revoke_token(db, raw)
+
+    worker = TokenRevocations(capacity=100, error_rate=0.01, cleanup_interval=60)
+    assert worker.is_revoked(raw) is False
+    worker.invalidate(f"jti:{raw['jti']}")
+    assert worker.is_revoked(raw) is True
+
+    worker.invalidate(f"user:{user_id}:{raw['iat'] + 1}")
+    assert worker.is_revoked({**raw, "jti": "other"}) is True
+
+    restarted = TokenRevocations(capacity=100, error_rate=0.01, cleanup_interval=60)
+    restarted.load(db)
+    assert restarted.is_revoked(raw) is True
+
+
+def test_cleanup_removes_expired_rows(db) -> None:
+    """La limpieza por TTL borra las revocaciones de tokens ya expirados."""
+    db, user_id = db
+    past = datetime.now() - timedelta(minutes=1)
+    db.add(Revoked_Tokens(jti=str(uuid4()), user_id=user_id, expires_on=past))
+    db.add(Token_Watermarks(user_id=user_id, revoked_before=past, expires_on=past))
+    db.commit()
+
+    assert token_revocations.cleanup(db) >= 2
+    assert db.query(Revoked_Tokens).filter_by(user_id=user_id).count() == 0
+    assert db.query(Token_Watermarks).filter_by(user_id=user_id).count() == 0
+
+
+def test_logout_endpoint(db) -> None:
+    """Despues de /auth/logout el token ya no se acepta."""
+    db, user_id = db
+    token = AuthJWT().create_access_token(subject=user_id)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.post("/auth/logout", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["success"] is True
+
+    response = client.post("/auth/logout/all", headers=headers)
+    assert response.status_code == 421
+    assert response.json()["msg"] == "Token has been revoked"
+
+
+def test_remote_revocation_reaches_denylist(db, monkeypatch) -> None:
+    """Una revocacion que guarda otro worker rechaza el token aqui."""
+    db, user_id = db
+    token = AuthJWT().create_access_token(subject=user_id)
+    monkeypatch.setattr(cache_channel, "interval", 1)
+    # La primera consulta toma el id mas alto actual como punto de partida
+    monkeypatch.setattr(cache_channel, "_last_id", None)
+    monkeypatch.setattr(cache_channel, "_last_poll", float("-inf"))
+    raw = claims_of(token).raw
+
+    # Otro worker: guarda la revocacion y publica el evento en la BD
+    db.add(
+        Revoked_Tokens(
+            jti=raw["jti"],
+            user_id=user_id,
+            expires_on=datetime.fromtimestamp(raw["exp"]),
+        )
+    )
+    db.add(Cache_Events(cache="token_revocations", key=f"jti:{raw['jti']}"))
+    db.commit()
+    try:
+        monkeypatch.setattr(cache_channel, "_last_poll", float("-inf"))
+        with pytest.raises(RevokedTokenError):
+            claims_of(token)
+        with pytest.raises(RevokedTokenError):
+            AuthJWT(build_request(token)).jwt_required()
+    finally:
+        db.query(Cache_Events).delete()
+        db.commit()
+
+
+def test_disabled_channel_checks_database(db, monkeypatch) -> None:
+    """Sin cache_channel cada token se revisa en la BD."""
+    db, user_id = db
+    monkeypatch.setattr(cache_channel, "interval", 0)
+    worker = TokenRevocations(capacity=100, error_rate=0.01, cleanup_interval=60)
+    raw = claims_of(AuthJWT().create_access_token(subject=user_id)).raw
+    assert worker.is_revoked(raw) is False
+
+    # Otro worker revoca, este no recibe ningun evento
+    token_revocations.revoke_token(db, raw)
+    assert worker.is_revoked(raw) is True
+
+    other = {**raw, "jti": "other"}
+    assert worker.is_revoked(other) is False
+    db.add(
+        Token_Watermarks(
+            user_id=user_id,
+            revoked_before=datetime.fromtimestamp(raw["iat"] + 1),
+            expires_on=datetime.now() + timedelta(hours=1),
+        )
+    )
+    db.commit()
+    assert worker.is_revoked(other) is True
+    assert worker.is_revoked({**other, "sub": "not-a-uuid"}) is False
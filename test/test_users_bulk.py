@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from fastapi_another_jwt_auth import AuthJWT
+
+from app import main
+from app.database.main import SessionLocal
+from app.extras.hashing import Hash
+from app.models.roles import Role
+from app.models.users import Users
+
+client = TestClient(app=main.app)
+
+
+@pytest.fixture()
+def bulk():
+    """Rol con un usuario existente y un token que puede crear usuarios."""
+    db = SessionLocal()
+    tag = uuid4().hex[:8]
+    ids = SimpleNamespace(role=uuid4(), tag=tag, existing=f"bulk-{tag}@example.com")
+    db.add(Role(id=ids.role, name=f"bulk-{tag}", description="bulk"))
+    db.flush()
+    db.add(
+        Users(
+            id=uuid4(),
+            email=ids.existing,
+            password=Hash().bcrypt("test_password"),
+            role_id=ids.role,
+        )
+    )
+    db.commit()
+    token = AuthJWT().create_access_token(
+        subject=str(uuid4()), user_claims={"permissions": {"users": ["create"]}}
+    )
+    yield {"Authorization": f"Bearer {token}"}, ids
+
+    db.query(Users).filter(Users.role_id == ids.role).delete()
+    db.query(Role).filter(Role.id == ids.role).delete()
+    db.commit()
+    db.close()
+
+
+def test_create_users_bulk(bulk):
+    """Validando el reporte por usuario del alta en lote.
+
+    Args:
+        bulk (Yield): Header con el token y los IDs del rol
+    """
+    header, ids = bulk
+    role_id = str(ids.role)
+    one, two = f"bulk-one-{ids.tag}@example.com", f"bulk-two-{ids.tag}@example.com"
+    users = [
+        {"email": one, "password": "bulk_password", "role_id": role_id},
+        {"email": two, "password": "bulk_password", "role_id": role_id},
+        {"email": one, "password": "bulk_password", "role_id": role_id},
+        {"email": ids.existing, "password": "bulk_password", "role_id": role_id},
+        {
+            "email": f"bulk-three-{ids.tag}@example.com",
+            "password": "bulk_password",
+            "role_id": str(uuid4()),
+        },
+    ]
+    response = client.post("/users/bulk", headers=header, json={"users": users})
+    assert response.status_code == status.HTTP_200_OK
+    report = response.json()
+    assert (report["created"], report["restored"], report["skipped"]) == (2, 0, 3)
+    assert [r["status"] for r in report["results"]] == [
+        "created",
+        "created",
+        "duplicated",
+        "exists",
+        "invalid_role",
+    ]
+
+    login = {"email": two, "password": "bulk_password"}
+    response = client.post("/auth/signing", json=login)
+    assert response.status_code == status.HTTP_200_OK